@@ -0,0 +1,210 @@
+import ast
+import json
+import os
+import re
+from functools import lru_cache
+
+import numpy as np
+
+# File aturan bawaan (setara aturan sinyal versi awal)
+PATH_ATURAN_DEFAULT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'aturan_sinyal.json')
+
+# Nama kolom yang bukan identifier Python ditulis di antara backtick, mis. `%K` atau `+DI`
+POLA_BACKTICK = re.compile(r'`([^`]+)`')
+
+OPERATOR_BINER = {
+    ast.Add: '+', ast.Sub: '-', ast.Mult: '*', ast.Div: '/',
+    ast.BitAnd: '&', ast.BitOr: '|',
+}
+OPERATOR_BANDING = {
+    ast.Lt: '<', ast.LtE: '<=', ast.Gt: '>', ast.GtE: '>=', ast.Eq: '==', ast.NotEq: '!=',
+}
+
+def geser(nilai, periode):
+    """
+    Menggeser array sejauh periode baris (setara Series.shift), bagian kosong diisi NaN.
+    Array 2 dimensi (mode panel: baris = tanggal, kolom = ticker) digeser per kolom.
+    """
+    hasil = np.full(np.shape(nilai), np.nan)
+    if periode < len(nilai):
+        hasil[periode:] = nilai[:len(nilai) - periode]
+    return hasil
+
+class _Kompilator:
+    """Menerjemahkan AST kondisi yang sudah divalidasi menjadi baris kode numpy (dengan CSE)"""
+
+    def __init__(self, parameter):
+        self.parameter = parameter
+        self.baris = []
+        self.cache = {}
+        self.kolom = []
+        self.riwayat = 1
+        self.alias = {}
+        self.nama_asli = {}
+
+    def _variabel(self, kunci, ekspresi):
+        # Subekspresi identik (mis. Close > SMA_20 di beberapa aturan) hanya dihitung sekali
+        if kunci not in self.cache:
+            nama = f'v{len(self.cache)}'
+            self.baris.append(f'{nama} = {ekspresi}')
+            self.cache[kunci] = nama
+        return self.cache[kunci]
+
+    def kompilasi(self, teks):
+        teks_aman = POLA_BACKTICK.sub(lambda m: self._alias(m.group(1)), teks)
+        try:
+            pohon = ast.parse(teks_aman, mode='eval')
+        except SyntaxError as e:
+            raise ValueError(f"Kondisi tidak valid: {teks!r} ({e.msg})")
+        return self.ekspresi(pohon.body, teks)
+
+    def _alias(self, nama):
+        if nama not in self.alias:
+            self.alias[nama] = f'__kolom{len(self.alias)}__'
+            self.nama_asli[self.alias[nama]] = nama
+        return self.alias[nama]
+
+    def konstanta(self, node):
+        """
+        Nilai numerik tetap dari literal, parameter, atau negasinya; None jika bukan konstanta
+        """
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            return node.value
+        if isinstance(node, ast.Name) and node.id in self.parameter:
+            return self.parameter[node.id]
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            nilai = self.konstanta(node.operand)
+            return -nilai if nilai is not None else None
+        return None
+
+    def ekspresi(self, node, teks):
+        nilai = self.konstanta(node)
+        if nilai is not None:
+            return f'({nilai!r})'
+        if isinstance(node, ast.Name):
+            asli = self.nama_asli.get(node.id, node.id)
+            if asli not in self.kolom:
+                self.kolom.append(asli)
+            return self._variabel(('kolom', asli), f'k[{asli!r}]')
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.Invert, ast.Not)):
+            operand = self.ekspresi(node.operand, teks)
+            simbol = '-' if isinstance(node.op, ast.USub) else '~'
+            return self._variabel(ast.dump(node), f'{simbol}{operand}')
+        if isinstance(node, ast.BinOp) and type(node.op) in OPERATOR_BINER:
+            kiri = self.ekspresi(node.left, teks)
+            kanan = self.ekspresi(node.right, teks)
+            return self._variabel(ast.dump(node), f'{kiri} {OPERATOR_BINER[type(node.op)]} {kanan}')
+        if isinstance(node, ast.BoolOp):
+            operator = ' & ' if isinstance(node.op, ast.And) else ' | '
+            bagian = [self.ekspresi(v, teks) for v in node.values]
+            return self._variabel(ast.dump(node), operator.join(bagian))
+        if isinstance(node, ast.Compare) and all(type(op) in OPERATOR_BANDING for op in node.ops):
+            # Perbandingan berantai (30 < RSI < 70) dipecah menjadi beberapa perbandingan yang di-AND
+            operand = [self.ekspresi(node.left, teks)] + [self.ekspresi(c, teks) for c in node.comparators]
+            bagian = []
+            for i, op in enumerate(node.ops):
+                perbandingan = ast.Compare(left=node.left if i == 0 else node.comparators[i - 1],
+                                           ops=[op], comparators=[node.comparators[i]])
+                bagian.append(self._variabel(ast.dump(perbandingan),
+                                             f'{operand[i]} {OPERATOR_BANDING[type(op)]} {operand[i + 1]}'))
+            return bagian[0] if len(bagian) == 1 else self._variabel(ast.dump(node), ' & '.join(bagian))
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            if node.func.id == 'geser' and len(node.args) == 2:
+                periode = self.konstanta(node.args[1])
+                if periode is None or periode != int(periode) or periode < 0:
+                    raise ValueError(f"Periode geser() harus bilangan bulat tetap: {teks!r}")
+                periode = int(periode)
+                self.riwayat = max(self.riwayat, periode + 1)
+                nilai = self.ekspresi(node.args[0], teks)
+                return self._variabel(ast.dump(node), f'geser({nilai}, {periode})')
+            if node.func.id == 'abs' and len(node.args) == 1:
+                return self._variabel(ast.dump(node), f'np.abs({self.ekspresi(node.args[0], teks)})')
+        raise ValueError(f"Ekspresi tidak didukung dalam kondisi {teks!r}: {ast.unparse(node)}")
+
+class AturanSinyal:
+    """Kelas kumpulan aturan sinyal deklaratif yang dikompilasi menjadi satu fungsi numpy"""
+
+    def __init__(self, aturan, parameter=None, ambang_beli=3, ambang_jual=-3):
+        """
+        aturan    : list dict {'nama', 'skor', 'alasan', 'kondisi'}
+        parameter : dict nama -> nilai yang dapat dipakai di kondisi
+        """
+        if not aturan:
+            raise ValueError("Aturan sinyal kosong: minimal satu aturan diperlukan")
+        if len(aturan) > 63:
+            raise ValueError("Maksimal 63 aturan (satu bit per aturan)")
+        self.aturan = [dict(a) for a in aturan]
+        self.parameter = dict(parameter or {})
+        self.ambang_beli = ambang_beli
+        self.ambang_jual = ambang_jual
+        self.alasan = [a.get('alasan', a.get('nama', '')) for a in self.aturan]
+        self.skor = [a['skor'] for a in self.aturan]
+        self.dtype_kode = np.int32 if len(self.aturan) <= 31 else np.int64
+        self._kompilasi()
+        self.decode = lru_cache(maxsize=None)(self._decode)
+
+    @classmethod
+    def dari_dict(cls, data, **parameter):
+        """
+        Membuat aturan dari dict konfigurasi; parameter tambahan menimpa nilai di konfigurasi
+        """
+        ambang = data.get('ambang', {})
+        return cls(data['aturan'], parameter={**data.get('parameter', {}), **parameter},
+                   ambang_beli=ambang.get('beli', 3), ambang_jual=ambang.get('jual', -3))
+
+    @classmethod
+    def dari_file(cls, path=PATH_ATURAN_DEFAULT, **parameter):
+        """
+        Memuat aturan dari file JSON
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.dari_dict(json.load(f), **parameter)
+
+    def dengan_parameter(self, **parameter):
+        """
+        Mengembalikan salinan aturan dengan parameter (dan ambang_beli/ambang_jual) yang diganti
+        """
+        ambang_beli = parameter.pop('ambang_beli', self.ambang_beli)
+        ambang_jual = parameter.pop('ambang_jual', self.ambang_jual)
+        return AturanSinyal(self.aturan, parameter={**self.parameter, **parameter},
+                            ambang_beli=ambang_beli, ambang_jual=ambang_jual)
+
+    def _kompilasi(self):
+        kompilator = _Kompilator(self.parameter)
+        mask = [kompilator.kompilasi(a['kondisi']) for a in self.aturan]
+        dtype = np.dtype(self.dtype_kode).name
+        baris = list(kompilator.baris)
+        baris.append('kode = ' + ' | '.join(f'({m}.astype(np.{dtype}) << {i})' for i, m in enumerate(mask)))
+        baris.append('skor = ' + ' + '.join(f'{m} * ({s!r})' for m, s in zip(mask, self.skor)))
+        self.sumber = 'def _evaluasi(k):\n' + ''.join(f'    {b}\n' for b in baris) + '    return kode, skor\n'
+        ruang = {'np': np, 'geser': geser, '__builtins__': {}}
+        exec(compile(self.sumber, '<aturan_sinyal>', 'exec'), ruang)
+        self._evaluasi = ruang['_evaluasi']
+        self.kolom = kompilator.kolom
+        # Jumlah bar riwayat yang dibutuhkan (mis. geser(OBV, 5) butuh 6 bar)
+        self.riwayat = kompilator.riwayat
+
+    def evaluasi(self, kolom):
+        """
+        Mengevaluasi semua aturan sekaligus pada dict nama kolom -> array numpy.
+        Mengembalikan (kode_alasan, skor): bitmask aturan yang terpenuhi dan total skornya.
+        """
+        kode, skor = self._evaluasi(kolom)
+        return kode.astype(self.dtype_kode, copy=False), skor.astype(np.int64, copy=False)
+
+    def sinyal(self, skor):
+        """
+        Mengubah array skor menjadi label Beli/Jual/Tahan berdasarkan ambang
+        """
+        return np.where(skor >= self.ambang_beli, 'Beli',
+                        np.where(skor <= self.ambang_jual, 'Jual', 'Tahan')).astype(object)
+
+    def label_sinyal(self, skor):
+        """
+        Label Beli/Jual/Tahan untuk satu skor
+        """
+        return 'Beli' if skor >= self.ambang_beli else 'Jual' if skor <= self.ambang_jual else 'Tahan'
+
+    def _decode(self, kode):
+        kode = int(kode)
+        return ''.join(alasan for i, alasan in enumerate(self.alasan) if kode >> i & 1)
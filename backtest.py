@@ -0,0 +1,317 @@
+"""
+Backtest sinyal: memutar ulang kolom Sinyal hasil generate_sinyal_lengkap sepanjang riwayat
+dan menguji target/stop loss rekomendasi (Beli: +8% / -5%, Jual: -8% / +5%).
+
+Setiap sinyal dibuka di harga Close bar sinyal lalu diselesaikan pada bar pertama yang
+menyentuh target atau stop dalam `horizon` bar berikutnya (jika keduanya tersentuh di bar
+yang sama, stop dianggap lebih dulu). Tanpa sentuhan, posisi ditutup di Close bar ke-horizon.
+
+Contoh:
+    python backtest.py BBCA TLKM BBRI --periode 5y
+    python backtest.py --daftar daftar_idx.txt --workers 8 --simpan-trade trade.csv
+"""
+import argparse
+import contextlib
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+import scanner
+from cache_data import DIREKTORI_CACHE_DEFAULT
+from saham import SAHAM_POPULER, TARGET_PERSEN, STOP_PERSEN
+from sumber_data import SumberCSV
+
+# Jumlah bar maksimum sebuah posisi dibiarkan terbuka
+HORIZON_DEFAULT = 20
+
+# Kolom tabel trade hasil backtest_sinyal
+KOLOM_TRADE = ['Tanggal_Masuk', 'Tanggal_Keluar', 'Arah', 'Harga_Masuk', 'Harga_Keluar', 'Status',
+               'Durasi_Bar', 'Return']
+
+def _bar_pertama(mask, horizon):
+    """
+    Indeks kolom True pertama per baris; `horizon` jika tidak ada
+    """
+    return np.where(mask.any(axis=1), mask.argmax(axis=1), horizon)
+
+def resolusi_trade(arah_bar, open_, high, low, close, target=TARGET_PERSEN, stop=STOP_PERSEN,
+                   horizon=HORIZON_DEFAULT, hanya_sinyal_baru=True, sisa=None):
+    """
+    Inti backtest berbasis array: arah_bar bernilai 1 (Beli), -1 (Jual) atau 0 per bar.
+    `sisa` (opsional) adalah jumlah bar setelah setiap bar yang masih milik ticker yang sama,
+    dipakai saat beberapa ticker digabung dalam satu array (dipisah baris NaN selebar horizon).
+    Mengembalikan dict array per trade.
+    """
+    n = len(close)
+    sisa = np.arange(n - 1, -1, -1) if sisa is None else sisa
+    masuk = arah_bar != 0
+    if hanya_sinyal_baru:
+        masuk[1:] &= arah_bar[1:] != arah_bar[:-1]
+    # Bar terakhir belum punya bar berikutnya untuk diuji
+    masuk &= sisa > 0
+    idx = np.flatnonzero(masuk)
+
+    # Jendela bar i+1 .. i+horizon untuk setiap bar i (view tanpa salinan, diisi NaN di ujung data)
+    kosong = np.full(horizon, np.nan)
+    jendela_high = sliding_window_view(np.concatenate([high[1:], kosong]), horizon)[idx]
+    jendela_low = sliding_window_view(np.concatenate([low[1:], kosong]), horizon)[idx]
+
+    arah = arah_bar[idx]
+    panjang = (arah == 1)[:, None]
+    harga_masuk = close[idx]
+    level_target = harga_masuk * (1 + arah * target)
+    level_stop = harga_masuk * (1 - arah * stop)
+
+    kena_target = np.where(panjang, jendela_high >= level_target[:, None], jendela_low <= level_target[:, None])
+    kena_stop = np.where(panjang, jendela_low <= level_stop[:, None], jendela_high >= level_stop[:, None])
+    bar_target = _bar_pertama(kena_target, horizon)
+    bar_stop = _bar_pertama(kena_stop, horizon)
+    tersedia = np.minimum(horizon, sisa[idx])
+
+    stop_dulu = (bar_stop < horizon) & (bar_stop <= bar_target)
+    status = np.select(
+        [stop_dulu, bar_target < horizon, tersedia == horizon],
+        ['Stop', 'Target', 'Waktu Habis'],
+        default='Terbuka'
+    )
+    bar_keluar = np.select(
+        [status == 'Stop', status == 'Target', status == 'Waktu Habis'],
+        [bar_stop, bar_target, horizon - 1],
+        default=tersedia - 1
+    )
+    posisi_keluar = idx + 1 + bar_keluar
+
+    # Gap melewati level: keluar di harga Open bar tersebut (lebih baik untuk target, lebih buruk untuk stop)
+    open_keluar = open_[posisi_keluar]
+    harga_target = np.where(arah == 1, np.fmax(level_target, open_keluar), np.fmin(level_target, open_keluar))
+    harga_stop = np.where(arah == 1, np.fmin(level_stop, open_keluar), np.fmax(level_stop, open_keluar))
+    harga_keluar = np.select([status == 'Stop', status == 'Target'], [harga_stop, harga_target],
+                             default=close[posisi_keluar])
+
+    return {
+        'idx': idx,
+        'posisi_keluar': posisi_keluar,
+        'arah': arah,
+        'harga_masuk': harga_masuk,
+        'harga_keluar': harga_keluar,
+        'status': status,
+        'durasi': bar_keluar + 1,
+        'return': arah * (harga_keluar / harga_masuk - 1),
+    }
+
+def backtest_sinyal(df_sinyal, target=TARGET_PERSEN, stop=STOP_PERSEN, horizon=HORIZON_DEFAULT,
+                    hanya_sinyal_baru=True):
+    """
+    Mensimulasikan semua sinyal Beli/Jual di df_sinyal dan mengembalikan DataFrame trade.
+    hanya_sinyal_baru=True hanya membuka posisi pada bar pertama dari rangkaian sinyal yang sama.
+    """
+    sinyal = df_sinyal['Sinyal'].to_numpy()
+    arah_bar = np.where(sinyal == 'Beli', 1, np.where(sinyal == 'Jual', -1, 0))
+    hasil = resolusi_trade(
+        arah_bar, *(df_sinyal[k].to_numpy(dtype=float) for k in ('Open', 'High', 'Low', 'Close')),
+        target=target, stop=stop, horizon=horizon, hanya_sinyal_baru=hanya_sinyal_baru
+    )
+    return pd.DataFrame({
+        'Tanggal_Masuk': df_sinyal.index[hasil['idx']],
+        'Tanggal_Keluar': df_sinyal.index[hasil['posisi_keluar']],
+        'Arah': np.where(hasil['arah'] == 1, 'Beli', 'Jual'),
+        'Harga_Masuk': hasil['harga_masuk'],
+        'Harga_Keluar': hasil['harga_keluar'],
+        'Status': hasil['status'],
+        'Durasi_Bar': hasil['durasi'],
+        'Return': hasil['return'],
+    }, columns=KOLOM_TRADE)
+
+def metrik_trade(r, status, arah, urutan_keluar, durasi, jumlah_ticker=1, stop=STOP_PERSEN):
+    """
+    Menghitung metrik dari array trade yang sudah selesai (tanpa status Terbuka).
+    urutan_keluar: kunci pengurutan kronologis (mis. tanggal keluar) untuk kurva ekuitas.
+    """
+    menang = r[r > 0]
+    kalah = r[r <= 0]
+    urutan = np.argsort(urutan_keluar, kind='stable')
+    kurva = np.concatenate([[0.0], np.cumsum(r[urutan]) / jumlah_ticker])
+    drawdown = np.maximum.accumulate(kurva) - kurva
+    return {
+        'Jumlah_Trade': len(r),
+        'Beli': int((arah == 1).sum()),
+        'Jual': int((arah == -1).sum()),
+        'Hit_Rate': float((status == 'Target').mean()),
+        'Stop_Rate': float((status == 'Stop').mean()),
+        'Win_Rate': len(menang) / len(r),
+        'Rata_Menang': float(menang.mean()) if len(menang) else 0.0,
+        'Rata_Kalah': float(kalah.mean()) if len(kalah) else 0.0,
+        'Expectancy': float(r.mean()),
+        'Expectancy_R': float(r.mean() / stop),
+        'Profit_Factor': float(menang.sum() / -kalah.sum()) if kalah.sum() < 0 else np.inf,
+        'Total_Return': float(r.sum()),
+        'Max_Drawdown': float(drawdown.max()),
+        'Rata_Durasi_Bar': float(durasi.mean()),
+    }
+
+def ringkasan_backtest(trade, stop=STOP_PERSEN):
+    """
+    Menghitung hit rate, win rate, expectancy dan drawdown dari tabel trade.
+    Trade berstatus Terbuka (data habis sebelum selesai) tidak ikut dihitung.
+    Drawdown dihitung dari kurva ekuitas non-compounding menurut tanggal keluar, dengan modal
+    dibagi rata per ticker (untuk satu ticker sama dengan jumlah return per trade).
+    """
+    selesai = trade[trade['Status'] != 'Terbuka']
+    if len(selesai) == 0:
+        return {'Jumlah_Trade': 0, 'Terbuka': len(trade)}
+    jumlah_ticker = selesai['Kode'].nunique() if 'Kode' in selesai.columns else 1
+    hasil = metrik_trade(
+        selesai['Return'].to_numpy(dtype=float), selesai['Status'].to_numpy(),
+        np.where(selesai['Arah'].to_numpy() == 'Beli', 1, -1), selesai['Tanggal_Keluar'].to_numpy(),
+        selesai['Durasi_Bar'].to_numpy(), jumlah_ticker=jumlah_ticker, stop=stop
+    )
+    hasil['Terbuka'] = len(trade) - len(selesai)
+    return hasil
+
+def backtest_ticker(kode_saham, periode='5y', data=None, target=TARGET_PERSEN, stop=STOP_PERSEN,
+                    horizon=HORIZON_DEFAULT, hanya_sinyal_baru=True):
+    """
+    Menjalankan pipeline sinyal dan backtest untuk satu ticker di worker scanner.
+    Mengembalikan (kode, tabel trade, pesan error).
+    """
+    try:
+        analyzer = scanner.analyzer_worker()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if data is not None:
+                analyzer.ticker = kode_saham + ".JK"
+                analyzer.data_saham = data
+            elif not analyzer.unduh_data_saham(kode_saham, periode=periode):
+                raise ValueError("data tidak tersedia")
+            # Backtest hanya butuh Sinyal: indikator di luar aturan sinyal tidak dihitung
+            df_sinyal = analyzer.hitung_sinyal_pipeline(kolom=())
+        if df_sinyal is None or df_sinyal.empty:
+            raise ValueError("sinyal tidak dapat dihitung")
+        trade = backtest_sinyal(df_sinyal, target=target, stop=stop, horizon=horizon,
+                                hanya_sinyal_baru=hanya_sinyal_baru)
+        trade.insert(0, 'Kode', kode_saham)
+        return kode_saham, trade, ''
+    except Exception as e:
+        return kode_saham, None, f"{type(e).__name__}: {e}"
+
+def backtest_universe(daftar_kode, workers=None, periode='5y', target=TARGET_PERSEN, stop=STOP_PERSEN,
+                      horizon=HORIZON_DEFAULT, hanya_sinyal_baru=True, gunakan_cache=True,
+                      direktori_cache=DIREKTORI_CACHE_DEFAULT, offline=False, sumber=None,
+                      path_aturan=None):
+    """
+    Backtest banyak ticker di process pool (memakai unduhan massal dan worker scanner).
+    Mengembalikan (ringkasan per ticker, semua trade, ringkasan universe, tabel gagal, statistik).
+    """
+    mulai = time.perf_counter()
+    workers = workers or os.cpu_count()
+    data = scanner.unduh_massal(daftar_kode, periode=periode, gunakan_cache=gunakan_cache,
+                                direktori_cache=direktori_cache, offline=offline, sumber=sumber)
+    waktu_unduh = time.perf_counter() - mulai
+
+    semua_trade, per_ticker, gagal = [], [], []
+    hasil = scanner.jalankan_paralel(
+        backtest_ticker, daftar_kode,
+        lambda kode: (periode, data.get(kode), target, stop, horizon, hanya_sinyal_baru), workers=workers,
+        initargs=(gunakan_cache, direktori_cache, offline, sumber, path_aturan),
+        gagal=lambda kode, pesan: (kode, None, pesan))
+    for kode, trade, error in hasil:
+        if error:
+            gagal.append({'Kode': kode, 'Error': error})
+            continue
+        semua_trade.append(trade)
+        per_ticker.append({'Kode': kode, **ringkasan_backtest(trade, stop=stop)})
+
+    trade = pd.concat(semua_trade, ignore_index=True) if semua_trade else pd.DataFrame(columns=['Kode'] + KOLOM_TRADE)
+    ringkasan = pd.DataFrame(per_ticker)
+    if not ringkasan.empty and 'Expectancy' in ringkasan.columns:
+        ringkasan = ringkasan.sort_values(['Expectancy', 'Jumlah_Trade'], ascending=[False, False], na_position='last')
+    ringkasan = ringkasan.reset_index(drop=True)
+    ringkasan.index = ringkasan.index + 1
+    waktu_total = time.perf_counter() - mulai
+    statistik = scanner.statistik_pindai(len(daftar_kode), len(per_ticker), len(gagal), waktu_total, waktu_unduh,
+                                         workers)
+    return ringkasan, trade, ringkasan_backtest(trade, stop=stop), pd.DataFrame(gagal, columns=['Kode', 'Error']), statistik
+
+def tampilkan_hasil(ringkasan, total, gagal, statistik, maks_baris=30):
+    """
+    Menampilkan ringkasan universe, tabel per ticker dan waktu backtest
+    """
+    print(f"\n{'='*70}")
+    print(f"HASIL BACKTEST ({statistik['berhasil']} dari {statistik['jumlah_ticker']} ticker)")
+    print(f"{'='*70}")
+    if total.get('Jumlah_Trade', 0):
+        print(f"📊 Trade selesai    : {total['Jumlah_Trade']} (Beli {total['Beli']}, Jual {total['Jual']}, "
+              f"terbuka {total['Terbuka']})")
+        print(f"   Hit rate target  : {total['Hit_Rate']*100:.1f}% (stop {total['Stop_Rate']*100:.1f}%)")
+        print(f"   Win rate         : {total['Win_Rate']*100:.1f}%")
+        print(f"   Expectancy       : {total['Expectancy']*100:+.2f}% per trade ({total['Expectancy_R']:+.2f} R)")
+        print(f"   Profit factor    : {total['Profit_Factor']:.2f}")
+        print(f"   Max drawdown     : {total['Max_Drawdown']*100:.1f}% (modal dibagi rata per ticker)")
+        print(f"   Rata-rata durasi : {total['Rata_Durasi_Bar']:.1f} bar")
+    else:
+        print("Tidak ada trade yang selesai")
+    if not ringkasan.empty and 'Expectancy' in ringkasan.columns:
+        kolom = ['Kode', 'Jumlah_Trade', 'Hit_Rate', 'Win_Rate', 'Expectancy', 'Profit_Factor', 'Max_Drawdown']
+        print()
+        with pd.option_context('display.width', 120, 'display.float_format', '{:,.3f}'.format):
+            print(ringkasan[kolom].head(maks_baris).to_string())
+    if not gagal.empty:
+        print(f"\n⚠️  {len(gagal)} ticker gagal di-backtest:")
+        for _, baris in gagal.head(maks_baris).iterrows():
+            print(f"   {baris['Kode']:6s} : {baris['Error']}")
+    print(f"\n⏱️  Waktu total      : {statistik['waktu_total']:.2f} detik ({statistik['workers']} worker)")
+    print(f"   Unduh massal     : {statistik['waktu_unduh']:.2f} detik")
+    print(f"   Ticker per detik : {statistik['ticker_per_detik']:.2f}")
+    print(f"{'='*70}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest sinyal beli/jual untuk banyak saham Indonesia")
+    parser.add_argument('kode', nargs='*', help='Kode saham (default: daftar saham populer)')
+    parser.add_argument('--daftar', help='File teks berisi kode saham, satu per baris')
+    parser.add_argument('--workers', type=int, default=None, help='Jumlah proses (default: jumlah CPU)')
+    parser.add_argument('--periode', default='5y', help='Periode data (default: 5y)')
+    parser.add_argument('--target', type=float, default=TARGET_PERSEN, help='Target profit (default: 0.08)')
+    parser.add_argument('--stop', type=float, default=STOP_PERSEN, help='Stop loss (default: 0.05)')
+    parser.add_argument('--horizon', type=int, default=HORIZON_DEFAULT,
+                        help='Maksimum bar sebuah posisi terbuka (default: 20)')
+    parser.add_argument('--semua-sinyal', action='store_true',
+                        help='Buka posisi di setiap bar sinyal, bukan hanya bar pertama rangkaian sinyal')
+    parser.add_argument('--offline', action='store_true', help='Gunakan data dari cache lokal saja')
+    parser.add_argument('--tanpa-cache', action='store_true', help='Selalu unduh data tanpa cache lokal')
+    parser.add_argument('--direktori-cache', default=DIREKTORI_CACHE_DEFAULT)
+    parser.add_argument('--sumber-csv', metavar='DIREKTORI',
+                        help='Gunakan file CSV lokal (mis. ekspor analisis_*.csv) sebagai sumber data')
+    parser.add_argument('--aturan', help='File JSON aturan sinyal (default: aturan_sinyal.json)')
+    parser.add_argument('--simpan', help='Simpan ringkasan per ticker ke file CSV')
+    parser.add_argument('--simpan-trade', help='Simpan semua trade ke file CSV')
+    parser.add_argument('--tampil', type=int, default=30, help='Jumlah baris yang ditampilkan')
+    args = parser.parse_args()
+
+    daftar_kode = [k.upper() for k in args.kode]
+    if args.daftar:
+        daftar_kode += scanner.baca_daftar_kode(args.daftar)
+    daftar_kode = list(dict.fromkeys(daftar_kode or SAHAM_POPULER))
+
+    sumber = SumberCSV(args.sumber_csv) if args.sumber_csv else None
+    gunakan_cache = not args.tanpa_cache and sumber is None
+
+    print(f"Backtest {len(daftar_kode)} ticker...")
+    ringkasan, trade, total, gagal, statistik = backtest_universe(
+        daftar_kode, workers=args.workers, periode=args.periode, target=args.target, stop=args.stop,
+        horizon=args.horizon, hanya_sinyal_baru=not args.semua_sinyal, gunakan_cache=gunakan_cache,
+        direktori_cache=args.direktori_cache, offline=args.offline, sumber=sumber, path_aturan=args.aturan
+    )
+    tampilkan_hasil(ringkasan, total, gagal, statistik, maks_baris=args.tampil)
+
+    if args.simpan:
+        ringkasan.to_csv(args.simpan, index_label='Peringkat')
+        print(f"Ringkasan backtest disimpan sebagai {args.simpan}")
+    if args.simpan_trade:
+        trade.to_csv(args.simpan_trade, index=False)
+        print(f"Daftar trade disimpan sebagai {args.simpan_trade}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark waktu impor modul (python -X importtime) untuk memantau biaya start-up
+
+Jalankan dari root repository:
+    python benchmarks/bench_impor.py
+    python benchmarks/bench_impor.py --simpan impor.json
+    python benchmarks/bench_impor.py --baseline impor.json --toleransi 0.25
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODUL_DEFAULT = ['saham', 'scanner', 'backtest', 'sweep', 'inkremental']
+
+# Library berat yang seharusnya tidak dimuat hanya karena modul diimpor
+MODUL_BERAT = ['yfinance', 'matplotlib', 'mplfinance', 'textblob']
+
+
+def ukur_impor(modul=None):
+    """
+    Menjalankan interpreter baru dengan -X importtime dan mengembalikan dict
+    nama modul -> (waktu sendiri, waktu kumulatif) dalam mikrodetik.
+    Tanpa modul, yang diukur hanya impor bawaan start-up interpreter (site, encodings, ...).
+    """
+    kode = f'import {modul}' if modul else 'pass'
+    proses = subprocess.run([sys.executable, '-X', 'importtime', '-c', kode],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    waktu = {}
+    for baris in proses.stderr.splitlines():
+        if not baris.startswith('import time:') or 'self [us]' in baris:
+            continue
+        sendiri, kumulatif, nama = baris[len('import time:'):].split('|', 2)
+        waktu[nama.strip()] = (int(sendiri), int(kumulatif))
+    return waktu
+
+
+def ringkas(modul, ulang, teratas, start_up=()):
+    """
+    Mengukur modul beberapa kali dan mengembalikan median waktu impor beserta impor terberat
+    """
+    hasil = [ukur_impor(modul) for _ in range(ulang)]
+    total = statistics.median(h[modul][1] for h in hasil) / 1000
+    terakhir = hasil[-1]
+    terberat = sorted(((nama, w[1] / 1000) for nama, w in terakhir.items()
+                       if nama != modul and '.' not in nama and nama not in start_up),
+                      key=lambda x: -x[1])[:teratas]
+    return {
+        'total_ms': total,
+        'terberat': terberat,
+        'modul_berat': [nama for nama in MODUL_BERAT if nama in terakhir],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('modul', nargs='*', default=MODUL_DEFAULT)
+    parser.add_argument('--ulang', type=int, default=5, help='Jumlah pengukuran per modul (diambil median)')
+    parser.add_argument('--teratas', type=int, default=5, help='Jumlah impor terberat yang ditampilkan')
+    parser.add_argument('--simpan', help='Simpan hasil ke file JSON')
+    parser.add_argument('--baseline', help='File JSON hasil sebelumnya untuk dibandingkan')
+    parser.add_argument('--toleransi', type=float, default=0.25,
+                        help='Kenaikan relatif yang dianggap regresi (default 0.25 = 25%%)')
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    start_up = set(ukur_impor())
+    hasil = {}
+    regresi = []
+    print(f"{'Modul':<12} | {'Impor (ms)':>10} | {'Baseline':>9} | Library berat yang ikut dimuat")
+    print('-' * 75)
+    for modul in args.modul:
+        hasil[modul] = ringkas(modul, args.ulang, args.teratas, start_up)
+        total = hasil[modul]['total_ms']
+        acuan = baseline.get(modul, {}).get('total_ms')
+        kolom_acuan = f"{acuan:>9.1f}" if acuan is not None else f"{'-':>9}"
+        if acuan is not None and total > acuan * (1 + args.toleransi):
+            regresi.append(modul)
+            kolom_acuan += ' ⚠️'
+        berat = ', '.join(hasil[modul]['modul_berat']) or '-'
+        print(f"{modul:<12} | {total:>10.1f} | {kolom_acuan} | {berat}")
+        for nama, waktu in hasil[modul]['terberat']:
+            print(f"{'':<12}   {nama:<20} {waktu:>8.1f} ms")
+
+    if args.simpan:
+        with open(args.simpan, 'w', encoding='utf-8') as f:
+            json.dump(hasil, f, indent=2)
+        print(f"\n💾 Hasil disimpan ke {args.simpan}")
+    if regresi:
+        print(f"\n⚠️  Regresi waktu impor (> {args.toleransi:.0%}): {', '.join(regresi)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
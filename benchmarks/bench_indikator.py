@@ -0,0 +1,190 @@
+"""
+Benchmark indikator dan sinyal pada data OHLCV sintetis (tanpa jaringan)
+
+Setiap metode AnalisisTeknikalLengkap, hitung_indikator_teknikal, generate_sinyal_lengkap dan
+hitung_sinyal_pipeline diukur pada beberapa ukuran data, ditambah PipelinePanel untuk satu
+universe ticker dengan riwayat tidak sama panjang.
+
+Jalankan dari root repository:
+    python benchmarks/bench_indikator.py
+    python benchmarks/bench_indikator.py --ukuran 1000 100000 --ticker 900 --simpan indikator.json
+    python benchmarks/bench_indikator.py --baseline indikator.json --toleransi 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_memori_pipeline import buat_data
+from panel import Panel, PipelinePanel
+from saham import AnalisisSahamLengkap, AnalisisTeknikalLengkap, JendelaRolling
+
+warnings.filterwarnings('ignore')
+
+UKURAN_DEFAULT = [1_000, 100_000, 1_000_000]
+
+# Selisih absolut di bawah batas ini tidak dianggap regresi (derau pengukuran kasus yang sangat cepat)
+BATAS_DERAU_MS = 1.0
+
+
+def buat_universe(jumlah_ticker, jumlah_bar, seed=42):
+    """
+    Membuat universe data harian sintetis; panjang riwayat setiap ticker berbeda (ticker baru listing)
+    """
+    rng = np.random.default_rng(seed)
+    tanggal = pd.bdate_range(end='2024-12-31', periods=jumlah_bar)
+    data = {}
+    for i in range(jumlah_ticker):
+        df = buat_data(jumlah_bar, seed=seed + i + 1)
+        df.index = tanggal
+        data[f'T{i:03d}'] = df.iloc[int(rng.integers(0, jumlah_bar // 2)):]
+    return data
+
+
+def kasus_teknikal(df):
+    """
+    Daftar (nama, fungsi) untuk setiap metode AnalisisTeknikalLengkap pada satu DataFrame
+    """
+    teknikal = AnalisisTeknikalLengkap
+    close, high, low, volume = df['Close'], df['High'], df['Low'], df['Volume']
+    pita = teknikal.bollinger_pita_kolom(close)
+    dm = teknikal.directional_movement_kolom(high, low, close)
+    di = teknikal.directional_indicator_kolom(dm['TR'], dm['+DM'], dm['-DM'])
+    return [
+        ('volume_kolom', lambda: teknikal.volume_kolom(close, volume)),
+        ('volume_rata_kolom', lambda: teknikal.volume_rata_kolom(volume)),
+        ('obv', lambda: teknikal.obv(close, volume)),
+        ('vpt', lambda: teknikal.vpt(close, volume)),
+        ('macd_kolom', lambda: teknikal.macd_kolom(close)),
+        ('rsi_kolom', lambda: teknikal.rsi_kolom(close)),
+        ('sma_kolom', lambda: teknikal.sma_kolom(close)),
+        ('ema_kolom', lambda: teknikal.ema_kolom(close)),
+        ('bollinger_pita_kolom', lambda: teknikal.bollinger_pita_kolom(close)),
+        ('bollinger_posisi_kolom', lambda: teknikal.bollinger_posisi_kolom(close, pita['BB_Upper'], pita['BB_Lower'])),
+        ('stochastic_kolom', lambda: teknikal.stochastic_kolom(close, JendelaRolling(df))),
+        ('directional_movement_kolom', lambda: teknikal.directional_movement_kolom(high, low, close)),
+        ('directional_indicator_kolom', lambda: teknikal.directional_indicator_kolom(dm['TR'], dm['+DM'], dm['-DM'])),
+        ('adx_dari_di_kolom', lambda: teknikal.adx_dari_di_kolom(di['+DI'], di['-DI'], df.index)),
+        ('williams_r_kolom', lambda: teknikal.williams_r_kolom(close, JendelaRolling(df))),
+        ('cci_kolom', lambda: teknikal.cci_kolom(JendelaRolling(df))),
+        ('atr_kolom', lambda: teknikal.atr_kolom(high, low, close)),
+        ('fibonacci_retracement', lambda: teknikal.fibonacci_retracement(df)),
+    ]
+
+
+def kasus_analisis(df):
+    """
+    Daftar (nama, fungsi) untuk tahap indikator dan sinyal AnalisisSahamLengkap
+    """
+    def indikator():
+        analisis = AnalisisSahamLengkap()
+        analisis.data_saham = df
+        return analisis.hitung_indikator_teknikal()
+
+    def pipeline():
+        analisis = AnalisisSahamLengkap()
+        analisis.data_saham = df
+        return analisis.hitung_sinyal_pipeline()
+
+    # Sinyal diukur terpisah dari indikator: data_saham sudah berisi semua kolom indikator
+    siap = AnalisisSahamLengkap()
+    siap.data_saham = df
+    siap.hitung_indikator_teknikal()
+    return [
+        ('hitung_indikator_teknikal', indikator),
+        ('generate_sinyal_lengkap', siap.generate_sinyal_lengkap),
+        ('hitung_sinyal_pipeline', pipeline),
+    ]
+
+
+def ukur(fungsi, ulang):
+    """
+    Menjalankan fungsi beberapa kali dan mengembalikan dict waktu median dan minimum (detik)
+    """
+    waktu = []
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        fungsi()
+        waktu.append(time.perf_counter() - mulai)
+    return {'median_s': statistics.median(waktu), 'min_s': min(waktu), 'ulang': ulang}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--ukuran', type=int, nargs='+', default=UKURAN_DEFAULT, help='Jumlah bar per kasus')
+    parser.add_argument('--ticker', type=int, default=900, help='Jumlah ticker mode panel (0 = lewati)')
+    parser.add_argument('--bar-panel', type=int, default=1250, help='Jumlah bar maksimum per ticker mode panel')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--ulang', type=int, default=3, help='Jumlah pengukuran per kasus (diambil median)')
+    parser.add_argument('--saring', help='Hanya jalankan kasus yang namanya mengandung teks ini')
+    parser.add_argument('--simpan', help='Simpan hasil ke file JSON')
+    parser.add_argument('--baseline', help='File JSON hasil sebelumnya untuk dibandingkan')
+    parser.add_argument('--toleransi', type=float, default=0.25,
+                        help='Kenaikan relatif yang dianggap regresi (default 0.25 = 25%%)')
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get('hasil', {})
+
+    hasil = {}
+    regresi = []
+
+    def catat(kunci, fungsi, bar):
+        if args.saring and args.saring not in kunci:
+            return
+        hasil[kunci] = {**ukur(fungsi, args.ulang), 'bar': bar}
+        waktu = hasil[kunci]['median_s'] * 1000
+        acuan = baseline.get(kunci, {}).get('median_s')
+        kolom_acuan = f"{acuan * 1000:>10.2f}" if acuan is not None else f"{'-':>10}"
+        if (acuan is not None and waktu > acuan * 1000 * (1 + args.toleransi)
+                and waktu - acuan * 1000 > BATAS_DERAU_MS):
+            regresi.append(kunci)
+            kolom_acuan += ' ⚠️'
+        print(f"{kunci:<42} | {waktu:>10.2f} | {bar / hasil[kunci]['median_s'] / 1e6:>8.2f} | {kolom_acuan}")
+
+    print(f"{'Kasus':<42} | {'Waktu (ms)':>10} | {'Mbar/s':>8} | {'Baseline':>10}")
+    print('-' * 82)
+    for n in args.ukuran:
+        df = buat_data(n, seed=args.seed)
+        for nama, fungsi in kasus_teknikal(df) + kasus_analisis(df):
+            catat(f'{n}/{nama}', fungsi, n)
+
+    if args.ticker:
+        data = buat_universe(args.ticker, args.bar_panel, seed=args.seed)
+        bar = sum(len(df) for df in data.values())
+        awalan = f'panel_{args.ticker}x{args.bar_panel}'
+        catat(f'{awalan}/dari_frame', lambda: Panel.dari_frame(data), bar)
+        panel = Panel.dari_frame(data)
+        catat(f'{awalan}/PipelinePanel', lambda: PipelinePanel().jalankan(panel), bar)
+
+    if args.simpan:
+        with open(args.simpan, 'w', encoding='utf-8') as f:
+            json.dump({
+                'meta': {
+                    'python': platform.python_version(),
+                    'numpy': np.__version__,
+                    'pandas': pd.__version__,
+                    'mesin': platform.machine(),
+                    'seed': args.seed,
+                    'ulang': args.ulang,
+                },
+                'hasil': hasil,
+            }, f, indent=2)
+        print(f"\n💾 Hasil disimpan ke {args.simpan}")
+    if regresi:
+        print(f"\n⚠️  Regresi waktu (> {args.toleransi:.0%}): {', '.join(regresi)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
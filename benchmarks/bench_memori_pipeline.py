@@ -0,0 +1,106 @@
+"""
+Benchmark memori pipeline indikator: salin-dan-tambah-kolom (versi lama) vs PipelineIndikator
+
+Jalankan dari root repository:
+    python benchmarks/bench_memori_pipeline.py
+    python benchmarks/bench_memori_pipeline.py --ukuran 10000 1000000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from saham import (AnalisisTeknikalLengkap, JendelaRolling, PipelineIndikator, ATURAN_SINYAL,
+                   NILAI_DEFAULT_INDIKATOR)
+
+warnings.filterwarnings('ignore')
+
+
+def buat_data(jumlah_bar, seed=42):
+    """
+    Membuat data OHLCV sintetis yang dapat direproduksi
+    """
+    rng = np.random.default_rng(seed)
+    close = np.round(1000 * np.exp(np.cumsum(rng.normal(0, 0.02, jumlah_bar))) / 5) * 5 + 5
+    open_ = close * (1 + rng.normal(0, 0.01, jumlah_bar))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, jumlah_bar)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, jumlah_bar)))
+    volume = rng.integers(100_000, 50_000_000, jumlah_bar)
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume,
+                         'Dividends': 0.0, 'Stock Splits': 0.0},
+                        index=pd.date_range('2000-01-01', periods=jumlah_bar, freq='min'))
+
+
+def pipeline_lama(data):
+    """
+    Implementasi lama: salin frame, tambahkan kolom satu per satu, lalu salin lagi untuk sinyal
+    """
+    df = data.copy()
+    teknikal = AnalisisTeknikalLengkap
+    for hitung in (lambda d: teknikal.volume_kolom(d['Close'], d['Volume']),
+                   lambda d: teknikal.macd_kolom(d['Close']),
+                   lambda d: teknikal.rsi_kolom(d['Close']),
+                   lambda d: teknikal.sma_kolom(d['Close']),
+                   lambda d: teknikal.ema_kolom(d['Close'])):
+        for nama, nilai in hitung(df).items():
+            df[nama] = nilai
+    df = teknikal.bollinger_bands(df)
+    jendela = JendelaRolling(df)
+    df = teknikal.stochastic_oscillator(df, jendela=jendela)
+    df = teknikal.adx(df)
+    df = teknikal.williams_r(df, jendela=jendela)
+    df = teknikal.cci(df, jendela=jendela)
+    df = teknikal.atr(df)
+
+    df = df.copy()
+    kode_alasan, skor = ATURAN_SINYAL.evaluasi({nama: df[nama].to_numpy() for nama in ATURAN_SINYAL.kolom})
+    df['Sinyal'] = ATURAN_SINYAL.sinyal(skor)
+    df['Kode_Alasan'] = kode_alasan
+    df['Skor_Sinyal'] = skor
+    return df.fillna(NILAI_DEFAULT_INDIKATOR)
+
+
+def ukur(fungsi, data):
+    """
+    Mengembalikan (waktu detik, puncak memori MB, ukuran frame hasil MB, jumlah kolom)
+    """
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    mulai = time.perf_counter()
+    hasil = fungsi(data)
+    waktu = time.perf_counter() - mulai
+    _, puncak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    ukuran = hasil.memory_usage(deep=True).sum()
+    return waktu, puncak / 1024**2, ukuran / 1024**2, hasil.shape[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--ukuran', type=int, nargs='+', default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    varian = [
+        ('Lama (salin + kolom)', pipeline_lama),
+        ('Pipeline float64 + perantara', lambda d: PipelineIndikator(perantara=True, dtype=np.float64).jalankan(d)),
+        ('Pipeline float64', lambda d: PipelineIndikator(perantara=False, dtype=np.float64).jalankan(d)),
+        ('Pipeline float32', lambda d: PipelineIndikator(perantara=False, dtype=np.float32).jalankan(d)),
+    ]
+    for n in args.ukuran:
+        data = buat_data(n)
+        print(f"\n{n:,} bar (data masukan {data.memory_usage(deep=True).sum() / 1024**2:.1f} MB)")
+        print(f"{'Varian':<30} | {'Waktu (s)':>9} | {'Puncak (MB)':>11} | {'Hasil (MB)':>10} | {'Kolom':>5}")
+        print('-' * 77)
+        for nama, fungsi in varian:
+            waktu, puncak, ukuran, kolom = ukur(fungsi, data)
+            print(f"{nama:<30} | {waktu:>9.3f} | {puncak:>11.1f} | {ukuran:>10.1f} | {kolom:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark OBV dan VPT: loop per baris (versi lama) vs kernel kumulatif (versi baru)
+
+Jalankan dari root repository:
+    python benchmarks/bench_obv_vpt.py
+    python benchmarks/bench_obv_vpt.py --ukuran 10000 100000 1000000 --batas-loop 0
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from saham import AnalisisTeknikalLengkap
+
+warnings.filterwarnings('ignore')
+
+
+def buat_data(jumlah_bar, seed=42):
+    """
+    Membuat data Close/Volume sintetis yang dapat direproduksi
+    """
+    rng = np.random.default_rng(seed)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.02, jumlah_bar)))
+    # Bulatkan ke fraksi harga agar ada bar dengan close yang sama
+    close = np.round(close / 5) * 5 + 5
+    volume = rng.integers(100_000, 50_000_000, jumlah_bar)
+    return pd.DataFrame({'Close': close, 'Volume': volume})
+
+
+def obv_vpt_loop(df):
+    """
+    Implementasi lama: loop Python per baris dengan penulisan per elemen
+    """
+    close = df['Close']
+    volume = df['Volume']
+    obv = np.zeros(len(df), dtype=volume.dtype)
+    vpt = np.zeros(len(df))
+    for i in range(1, len(df)):
+        if close.iloc[i] > close.iloc[i-1]:
+            obv[i] = obv[i-1] + volume.iloc[i]
+        elif close.iloc[i] < close.iloc[i-1]:
+            obv[i] = obv[i-1] - volume.iloc[i]
+        else:
+            obv[i] = obv[i-1]
+    for i in range(1, len(df)):
+        vpt_change = volume.iloc[i] * ((close.iloc[i] - close.iloc[i-1]) / close.iloc[i-1])
+        vpt[i] = vpt[i-1] + vpt_change
+    return obv, vpt
+
+
+def obv_vpt_vektor(df):
+    """
+    Implementasi baru: kernel kumulatif dari AnalisisTeknikalLengkap
+    """
+    close = df['Close'].to_numpy()
+    volume = df['Volume'].to_numpy()
+    return AnalisisTeknikalLengkap.obv(close, volume), AnalisisTeknikalLengkap.vpt(close, volume)
+
+
+def ukur(fungsi, df, ulang):
+    """
+    Mengembalikan waktu terbaik (detik) dari beberapa kali pengulangan
+    """
+    terbaik = float('inf')
+    hasil = None
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        hasil = fungsi(df)
+        terbaik = min(terbaik, time.perf_counter() - mulai)
+    return terbaik, hasil
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--ukuran', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--ulang', type=int, default=3, help='Jumlah pengulangan versi vektor')
+    parser.add_argument('--batas-loop', type=int, default=100_000,
+                        help='Ukuran maksimum untuk menjalankan loop lama; di atasnya waktu '
+                             'diestimasi secara linear (0 = selalu jalankan)')
+    args = parser.parse_args()
+
+    print(f"{'Bar':>10} | {'Loop (s)':>12} | {'Vektor (s)':>10} | {'Speedup':>9}")
+    print('-' * 52)
+    detik_per_bar = None
+    for n in args.ukuran:
+        df = buat_data(n)
+        waktu_vektor, (obv_baru, vpt_baru) = ukur(obv_vpt_vektor, df, args.ulang)
+
+        if args.batas_loop and n > args.batas_loop and detik_per_bar is not None:
+            waktu_loop = detik_per_bar * n
+            label_loop = f"~{waktu_loop:.2f}*"
+        else:
+            waktu_loop, (obv_lama, vpt_lama) = ukur(obv_vpt_loop, df, 1)
+            detik_per_bar = waktu_loop / n
+            label_loop = f"{waktu_loop:.3f}"
+            # Pastikan hasil identik dengan versi lama
+            assert np.array_equal(obv_lama, obv_baru), "OBV berbeda dari implementasi loop"
+            assert np.allclose(vpt_lama, vpt_baru, rtol=1e-12, atol=1e-6), "VPT berbeda dari implementasi loop"
+
+        print(f"{n:>10,} | {label_loop:>12} | {waktu_vektor:>10.4f} | {waktu_loop / waktu_vektor:>8.0f}x")
+
+    if args.batas_loop and any(n > args.batas_loop for n in args.ukuran):
+        print(f"\n* diestimasi dari waktu per bar loop lama (gunakan --batas-loop 0 untuk mengukur langsung)")
+
+
+if __name__ == "__main__":
+    main()
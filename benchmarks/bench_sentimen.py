@@ -0,0 +1,85 @@
+"""
+Benchmark sentimen berita: pencarian substring per kata (versi lama) vs leksikon terkompilasi
+
+Jalankan dari root repository:
+    python benchmarks/bench_sentimen.py
+    python benchmarks/bench_sentimen.py --judul 10000 --leksikon 20 1000 50000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sentimen import LeksikonSentimen, KATA_POSITIF_DEFAULT, KATA_NEGATIF_DEFAULT
+
+KATA_UMUM = ['saham', 'laba', 'emiten', 'kuartal', 'bank', 'investor', 'harga', 'pasar', 'dividen',
+             'hari', 'ini', 'setelah', 'laporan', 'analis', 'target', 'ihsg', 'sektor', 'asing']
+
+
+def buat_judul(jumlah, seed=42):
+    """
+    Membuat judul berita sintetis yang dapat direproduksi
+    """
+    rng = np.random.default_rng(seed)
+    kosakata = np.array(KATA_UMUM + KATA_POSITIF_DEFAULT + KATA_NEGATIF_DEFAULT)
+    return [' '.join(rng.choice(kosakata, rng.integers(6, 14))) for _ in range(jumlah)]
+
+
+def buat_leksikon(ukuran):
+    """
+    Menambah kata sintetis ke leksikon bawaan hingga mencapai ukuran tertentu
+    """
+    tambahan = max(0, ukuran - len(KATA_POSITIF_DEFAULT) - len(KATA_NEGATIF_DEFAULT))
+    positif = KATA_POSITIF_DEFAULT + [f'positif{i}' for i in range(tambahan // 2)]
+    negatif = KATA_NEGATIF_DEFAULT + [f'negatif{i}' for i in range(tambahan - tambahan // 2)]
+    return positif, negatif
+
+
+def skor_substring(daftar_judul, positif, negatif):
+    """
+    Implementasi lama: `kata in teks` untuk setiap kata leksikon pada setiap judul
+    """
+    hasil = []
+    for teks in daftar_judul:
+        teks_lower = teks.lower()
+        skor = 0
+        for kata in positif:
+            if kata in teks_lower:
+                skor += 1
+        for kata in negatif:
+            if kata in teks_lower:
+                skor -= 1
+        hasil.append(skor)
+    return hasil
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--judul', type=int, default=5_000, help='Jumlah judul berita')
+    parser.add_argument('--leksikon', type=int, nargs='+', default=[20, 1_000, 20_000],
+                        help='Ukuran leksikon yang diuji')
+    args = parser.parse_args()
+
+    daftar_judul = buat_judul(args.judul)
+    print(f"{args.judul:,} judul berita")
+    print(f"{'Leksikon':>10} | {'Substring (s)':>13} | {'Kompilasi (s)':>13} | {'Speedup':>9}")
+    print('-' * 56)
+    for ukuran in args.leksikon:
+        positif, negatif = buat_leksikon(ukuran)
+        mulai = time.perf_counter()
+        skor_substring(daftar_judul, positif, negatif)
+        waktu_lama = time.perf_counter() - mulai
+
+        leksikon = LeksikonSentimen(positif=positif, negatif=negatif)
+        mulai = time.perf_counter()
+        leksikon.skor_banyak(daftar_judul)
+        waktu_baru = time.perf_counter() - mulai
+
+        print(f"{ukuran:>10,} | {waktu_lama:>13.3f} | {waktu_baru:>13.4f} | {waktu_lama / waktu_baru:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,549 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from sumber_data import SumberYFinance, mulai_periode
+
+try:
+    import fcntl  # Tidak tersedia di Windows
+except ImportError:
+    fcntl = None
+
+DIREKTORI_CACHE_DEFAULT = os.path.join(os.path.expanduser('~'), '.saham_ai', 'cache')
+
+@contextmanager
+def kunci_file(path):
+    """
+    Kunci eksklusif antar-proses (flock pada file path); tanpa fcntl hanya berlaku di satu proses
+    """
+    with open(path, 'a', encoding='utf-8') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+class CacheOHLCV:
+    """Kelas cache OHLCV lokal (kolumnar, per ticker dan interval) dengan refresh inkremental"""
+
+    def __init__(self, direktori=DIREKTORI_CACHE_DEFAULT, batas_ukuran=200 * 1024 * 1024,
+                 offline=False, ttl_segar=900, sumber=None):
+        """
+        batas_ukuran : total ukuran file cache (byte) sebelum entri terlama diusir (LRU)
+        offline      : hanya melayani dari cache, tanpa akses jaringan
+        ttl_segar    : entri yang diperbarui dalam rentang ini (detik) tidak di-refresh lagi
+        sumber       : SumberData untuk mengunduh bar (default SumberYFinance)
+        """
+        self.direktori = direktori
+        self.batas_ukuran = batas_ukuran
+        self.offline = offline
+        self.ttl_segar = ttl_segar
+        self.sumber = sumber if sumber is not None else SumberYFinance()
+        self.statistik_cache = {'hit': 0, 'miss': 0, 'refresh': 0, 'basi': 0, 'eviksi': 0}
+        self._kunci = threading.Lock()
+        os.makedirs(self.direktori, exist_ok=True)
+        self._path_indeks = os.path.join(self.direktori, 'indeks.json')
+        self._indeks = self._baca_indeks()
+        # Entri yang diubah/dihapus proses ini sejak indeks terakhir disimpan
+        self._berubah = set()
+        self._dihapus = set()
+
+    def _baca_indeks(self):
+        try:
+            with open(self._path_indeks, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _simpan_indeks(self, kecuali=None):
+        """
+        Menggabungkan perubahan proses ini ke indeks di disk, mengusir entri berlebih lalu menulisnya.
+        Dijalankan di bawah kunci file agar entri dari proses lain (mis. worker scanner) tidak hilang.
+        """
+        with kunci_file(self._path_indeks + '.lock'):
+            indeks = {k: v for k, v in self._baca_indeks().items() if k not in self._dihapus}
+            indeks.update((k, self._indeks[k]) for k in self._berubah if k in self._indeks)
+            self._indeks = indeks
+            self._eviksi(kecuali=kecuali)
+            sementara = f"{self._path_indeks}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(sementara, 'w', encoding='utf-8') as f:
+                json.dump(self._indeks, f)
+            os.replace(sementara, self._path_indeks)
+        self._berubah.clear()
+        self._dihapus.clear()
+
+    @staticmethod
+    def _kunci_entri(ticker, interval):
+        return f"{ticker}_{interval}"
+
+    def _path_entri(self, kunci):
+        return os.path.join(self.direktori, re.sub(r'[^A-Za-z0-9_.^=-]', '_', kunci) + '.npz')
+
+    def _baca_entri(self, kunci):
+        """
+        Membaca DataFrame dari file .npz (satu array per kolom)
+        """
+        try:
+            with np.load(self._path_entri(kunci), allow_pickle=False) as data:
+                kolom = [str(k) for k in data['__kolom__']]
+                zona = str(data['__tz__'])
+                indeks = pd.DatetimeIndex(data['__indeks__'].astype('datetime64[ns]'), tz='UTC')
+                if zona:
+                    indeks = indeks.tz_convert(zona)
+                else:
+                    indeks = indeks.tz_localize(None)
+                df = pd.DataFrame({k: data['k_' + k] for k in kolom}, index=indeks)
+                df.index.name = str(data['__nama_indeks__']) or None
+                return df
+        except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+            # File rusak/terpotong dianggap miss sehingga diunduh ulang
+            return None
+
+    def _tulis_entri(self, kunci, df):
+        """
+        Menyimpan DataFrame sebagai file .npz secara atomik
+        """
+        indeks = df.index
+        zona = str(indeks.tz) if getattr(indeks, 'tz', None) is not None else ''
+        utc = indeks.tz_convert('UTC') if zona else indeks
+        array = {
+            '__indeks__': utc.as_unit('ns').asi8 if hasattr(utc, 'as_unit') else utc.asi8,
+            '__tz__': np.array(zona),
+            '__nama_indeks__': np.array(indeks.name or ''),
+            '__kolom__': np.array([str(k) for k in df.columns]),
+        }
+        for k in df.columns:
+            array['k_' + str(k)] = df[k].to_numpy()
+        path = self._path_entri(kunci)
+        # File sementara per proses/thread: beberapa proses dapat me-refresh ticker yang sama
+        sementara = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+        np.savez(sementara, **array)
+        os.replace(sementara, path)
+        return os.path.getsize(path)
+
+    def _gabung(self, lama, baru):
+        """
+        Menggabungkan data cache dengan bar baru; bar dengan tanggal sama memakai versi terbaru
+        """
+        if lama is None or lama.empty:
+            return baru
+        if baru is None or baru.empty:
+            return lama
+        gabungan = pd.concat([lama, baru])
+        gabungan = gabungan[~gabungan.index.duplicated(keep='last')]
+        return gabungan.sort_index()
+
+    def _eviksi(self, kecuali=None):
+        """
+        Mengusir entri yang paling lama tidak diakses sampai total ukuran di bawah batas
+        """
+        total = sum(info.get('ukuran', 0) for info in self._indeks.values())
+        for kunci, info in sorted(self._indeks.items(), key=lambda item: item[1].get('akses', 0)):
+            if total <= self.batas_ukuran:
+                break
+            if kunci == kecuali:
+                continue
+            try:
+                os.remove(self._path_entri(kunci))
+            except OSError:
+                pass
+            total -= info.get('ukuran', 0)
+            del self._indeks[kunci]
+            self._dihapus.add(kunci)
+            self.statistik_cache['eviksi'] += 1
+
+    def _rencana(self, ticker, periode, interval):
+        """
+        Menentukan tindakan untuk satu ticker: 'hit' (layani dari cache), 'refresh' (unduh bar
+        sejak bar terakhir), 'unduh' (unduh penuh) atau 'kosong' (offline tanpa data)
+        """
+        kunci = self._kunci_entri(ticker, interval)
+        info = self._indeks.get(kunci)
+        awal = mulai_periode(periode)
+        df = self._baca_entri(kunci) if info else None
+
+        tercakup = (
+            df is not None and not df.empty and
+            (info.get('mulai') == 'max' if awal is None else
+             info.get('mulai') == 'max' or pd.Timestamp(info['mulai']) <= awal)
+        )
+
+        if tercakup:
+            segar = time.time() - info.get('diperbarui', 0) < self.ttl_segar
+            tindakan = 'hit' if self.offline or segar else 'refresh'
+            self.statistik_cache[tindakan] += 1
+        else:
+            self.statistik_cache['miss'] += 1
+            if self.offline:
+                # Mode offline: layani data parsial yang ada, jika ada
+                tindakan = 'kosong' if df is None or df.empty else 'hit'
+            else:
+                tindakan = 'unduh'
+        return {'kunci': kunci, 'info': info, 'df': df, 'awal': awal, 'tindakan': tindakan}
+
+    def _pakai_basi(self, rencana):
+        """
+        Refresh gagal: layani data cache apa adanya tanpa mengubah waktu 'diperbarui' agar dicoba lagi
+        """
+        rencana['tindakan'] = 'hit'
+        self.statistik_cache['basi'] += 1
+
+    def _selesaikan(self, rencana, baru=None):
+        """
+        Menggabungkan bar baru ke cache, memperbarui indeks dan mengembalikan potongan periode
+        """
+        kunci, info, df, awal = rencana['kunci'], rencana['info'], rencana['df'], rencana['awal']
+        tindakan = rencana['tindakan']
+        if tindakan == 'kosong':
+            return None
+
+        if tindakan == 'refresh':
+            df = self._gabung(df, baru)
+            info['ukuran'] = self._tulis_entri(kunci, df)
+            info['diperbarui'] = time.time()
+        elif tindakan == 'unduh':
+            df = self._gabung(df, baru)
+            if df is None or df.empty:
+                return df
+            self._dihapus.discard(kunci)
+            info = {
+                'mulai': 'max' if awal is None else awal.isoformat(),
+                'ukuran': self._tulis_entri(kunci, df),
+                'diperbarui': time.time(),
+            }
+            self._indeks[kunci] = info
+
+        info['akses'] = time.time()
+        self._berubah.add(kunci)
+        return self._potong(df, awal)
+
+    def ambil(self, ticker, periode='6mo', interval='1d'):
+        """
+        Mengambil data OHLCV; hanya bar yang lebih baru dari cache yang diunduh
+        """
+        with self._kunci:
+            rencana = self._rencana(ticker, periode, interval)
+            baru = None
+            if rencana['tindakan'] == 'refresh':
+                # Unduh ulang mulai bar terakhir (bar hari ini bisa masih berubah)
+                try:
+                    baru = self.sumber.riwayat(ticker, interval=interval, mulai=rencana['df'].index[-1])
+                except Exception:
+                    self._pakai_basi(rencana)
+            elif rencana['tindakan'] == 'unduh':
+                baru = self.sumber.riwayat(ticker, periode=periode, interval=interval)
+            hasil = self._selesaikan(rencana, baru)
+            self._simpan_indeks(kecuali=rencana['kunci'])
+            return hasil
+
+    def ambil_banyak(self, tickers, periode='6mo', interval='1d'):
+        """
+        Mengambil data banyak ticker; ticker yang perlu diunduh digabung dalam request massal.
+        Mengembalikan dict ticker -> DataFrame (ticker tanpa data tidak disertakan).
+        """
+        with self._kunci:
+            rencana = {ticker: self._rencana(ticker, periode, interval) for ticker in tickers}
+            perlu_refresh = [t for t, r in rencana.items() if r['tindakan'] == 'refresh']
+            perlu_unduh = [t for t, r in rencana.items() if r['tindakan'] == 'unduh']
+
+            baru = {}
+            if perlu_refresh:
+                # Satu tanggal awal untuk seluruh batch; bar yang sudah ada ditimpa saat digabung
+                mulai = min(rencana[t]['df'].index[-1] for t in perlu_refresh)
+                try:
+                    baru.update(self.sumber.riwayat_banyak(perlu_refresh, interval=interval, mulai=mulai))
+                except Exception:
+                    for ticker in perlu_refresh:
+                        self._pakai_basi(rencana[ticker])
+            if perlu_unduh:
+                baru.update(self.sumber.riwayat_banyak(perlu_unduh, periode=periode, interval=interval))
+
+            hasil = {}
+            for ticker, r in rencana.items():
+                df = self._selesaikan(r, baru.get(ticker))
+                if df is not None and not df.empty:
+                    hasil[ticker] = df
+            self._simpan_indeks()
+            return hasil
+
+    @staticmethod
+    def _potong(df, awal):
+        """
+        Mengembalikan bar sejak tanggal awal periode
+        """
+        if awal is None or df.empty:
+            return df
+        if df.index.tz is None:
+            awal = awal.tz_localize(None)
+        return df[df.index >= awal]
+
+    def statistik(self):
+        """
+        Mengembalikan counter hit/refresh/miss beserta jumlah entri dan ukuran cache
+        """
+        total = self.statistik_cache['hit'] + self.statistik_cache['refresh'] + self.statistik_cache['miss']
+        return {
+            **self.statistik_cache,
+            'rasio_hit': self.statistik_cache['hit'] / total if total else 0.0,
+            'jumlah_entri': len(self._indeks),
+            'ukuran_byte': sum(info.get('ukuran', 0) for info in self._indeks.values()),
+        }
+
+    def hapus(self, ticker=None, interval='1d'):
+        """
+        Menghapus satu entri (atau seluruh cache jika ticker tidak diberikan)
+        """
+        with self._kunci:
+            kunci_list = [self._kunci_entri(ticker, interval)] if ticker else list(self._indeks)
+            for kunci in kunci_list:
+                try:
+                    os.remove(self._path_entri(kunci))
+                except OSError:
+                    pass
+                self._indeks.pop(kunci, None)
+                self._dihapus.add(kunci)
+            self._simpan_indeks()
+
+class CacheFundamental:
+    """Kelas cache data fundamental (saham.info) di memori dan disk dengan TTL dan eviksi LRU"""
+
+    def __init__(self, direktori=os.path.join(DIREKTORI_CACHE_DEFAULT, 'fundamental'), ttl=24 * 3600,
+                 maks_memori=1000, maks_disk=5000, offline=False, pengambil=None):
+        """
+        ttl         : umur maksimum data (detik) sebelum diambil ulang
+        maks_memori : jumlah entri maksimum di memori (LRU)
+        maks_disk   : jumlah file maksimum di disk (LRU berdasarkan waktu akses; mtime file diperbarui
+                      setiap kali entri dibaca, dari memori maupun disk)
+        pengambil   : fungsi ticker -> dict info (default saham.info dari Yahoo Finance)
+        """
+        self.direktori = direktori
+        self.ttl = ttl
+        self.maks_memori = maks_memori
+        self.maks_disk = maks_disk
+        self.offline = offline
+        self.pengambil = pengambil if pengambil is not None else self._pengambil_default
+        self.statistik_cache = {'hit_memori': 0, 'hit_disk': 0, 'miss': 0, 'basi': 0, 'eviksi': 0}
+        self._memori = OrderedDict()  # ticker -> (waktu_ambil, info)
+        self._kunci = threading.RLock()
+        self._sumber = None
+        os.makedirs(self.direktori, exist_ok=True)
+
+    def _pengambil_default(self, ticker):
+        if self._sumber is None:
+            self._sumber = SumberYFinance()
+        return self._sumber.info(ticker)
+
+    def _path(self, ticker):
+        return os.path.join(self.direktori, re.sub(r'[^A-Za-z0-9_.^=-]', '_', ticker) + '.json')
+
+    def _simpan_memori(self, ticker, waktu, info):
+        self._memori[ticker] = (waktu, info)
+        self._memori.move_to_end(ticker)
+        while len(self._memori) > self.maks_memori:
+            self._memori.popitem(last=False)
+            self.statistik_cache['eviksi'] += 1
+
+    def _sentuh(self, ticker):
+        # Tandai file sebagai baru diakses untuk LRU disk (_eviksi_disk mengurutkan berdasarkan mtime)
+        try:
+            os.utime(self._path(ticker))
+        except OSError:
+            pass
+
+    def _baca_disk(self, ticker):
+        try:
+            with open(self._path(ticker), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._sentuh(ticker)
+            return data['waktu'], data['info']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _tulis_disk(self, ticker, waktu, info):
+        path = self._path(ticker)
+        sementara = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(sementara, 'w', encoding='utf-8') as f:
+            json.dump({'ticker': ticker, 'waktu': waktu, 'info': info}, f, default=str)
+        os.replace(sementara, path)
+
+    def _eviksi_disk(self):
+        file_list = [e for e in os.scandir(self.direktori) if e.name.endswith('.json')]
+        if len(file_list) <= self.maks_disk:
+            return
+        file_list.sort(key=lambda e: e.stat().st_mtime)
+        for entri in file_list[:len(file_list) - self.maks_disk]:
+            try:
+                os.remove(entri.path)
+                self.statistik_cache['eviksi'] += 1
+            except OSError:
+                pass
+
+    def _cari(self, ticker):
+        """
+        Mencari entri di memori lalu disk; mengembalikan (waktu, info) atau None
+        """
+        with self._kunci:
+            entri = self._memori.get(ticker)
+            if entri is not None:
+                self._memori.move_to_end(ticker)
+                self._sentuh(ticker)
+                if time.time() - entri[0] < self.ttl:
+                    self.statistik_cache['hit_memori'] += 1
+                return entri
+            entri = self._baca_disk(ticker)
+            if entri is not None:
+                self._simpan_memori(ticker, *entri)
+                if time.time() - entri[0] < self.ttl:
+                    self.statistik_cache['hit_disk'] += 1
+            return entri
+
+    def ambil(self, ticker, pengambil=None):
+        """
+        Mengambil info fundamental; diunduh ulang hanya jika belum ada atau sudah melewati TTL
+        """
+        entri = self._cari(ticker)
+        if entri is not None and (time.time() - entri[0] < self.ttl or self.offline):
+            return entri[1]
+
+        with self._kunci:
+            self.statistik_cache['miss'] += 1
+        if self.offline:
+            return None
+        try:
+            info = (pengambil or self.pengambil)(ticker)
+        except Exception:
+            if entri is not None:
+                # Sumber gagal: gunakan data basi daripada tidak ada data sama sekali
+                with self._kunci:
+                    self.statistik_cache['basi'] += 1
+                return entri[1]
+            raise
+
+        waktu = time.time()
+        with self._kunci:
+            self._simpan_memori(ticker, waktu, info)
+            self._tulis_disk(ticker, waktu, info)
+            self._eviksi_disk()
+        return info
+
+    def ambil_banyak(self, tickers, workers=8, pengambil=None):
+        """
+        Mengambil info banyak ticker; yang belum ada di cache diunduh paralel.
+        Mengembalikan dict ticker -> info (ticker yang gagal tidak disertakan).
+        """
+        hasil = {}
+        perlu_unduh = []
+        for ticker in dict.fromkeys(tickers):
+            entri = self._cari(ticker)
+            if entri is not None and (time.time() - entri[0] < self.ttl or self.offline):
+                hasil[ticker] = entri[1]
+            else:
+                perlu_unduh.append(ticker)
+
+        if perlu_unduh:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fundamental') as pool:
+                futures = {pool.submit(self.ambil, ticker, pengambil): ticker for ticker in perlu_unduh}
+                for future, ticker in futures.items():
+                    try:
+                        info = future.result()
+                    except Exception as e:
+                        print(f"Error mengambil data fundamental {ticker}: {e}")
+                        continue
+                    if info:
+                        hasil[ticker] = info
+        return hasil
+
+    def statistik(self):
+        """
+        Mengembalikan counter hit/miss cache fundamental
+        """
+        hit = self.statistik_cache['hit_memori'] + self.statistik_cache['hit_disk']
+        total = hit + self.statistik_cache['miss']
+        return {
+            **self.statistik_cache,
+            'rasio_hit': hit / total if total else 0.0,
+            'entri_memori': len(self._memori),
+        }
+
+class CacheSentimen:
+    """Kelas cache hasil sentimen per judul berita, disimpan antar-run dalam satu file JSON"""
+
+    def __init__(self, path=os.path.join(DIREKTORI_CACHE_DEFAULT, 'sentimen.json'), maks_entri=50000):
+        self.path = path
+        self.maks_entri = maks_entri
+        self.statistik_cache = {'hit': 0, 'miss': 0}
+        self._kunci = threading.Lock()
+        self._berubah = False
+        self._data = self._baca()
+
+    def _baca(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def kunci(teks, mesin=''):
+        """
+        Hash judul yang dinormalisasi (huruf kecil, tanpa tanda baca, spasi tunggal)
+        """
+        normal = ' '.join(re.sub(r'[^\w\s]', ' ', teks.lower()).split())
+        return hashlib.sha1(f"{mesin}|{normal}".encode('utf-8')).hexdigest()
+
+    def ambil(self, teks, hitung, mesin=''):
+        """
+        Mengembalikan (sentimen, skor) dari cache, atau menghitungnya sekali dengan `hitung(teks)`
+        """
+        kunci = self.kunci(teks, mesin)
+        with self._kunci:
+            hasil = self._data.get(kunci)
+            if hasil is not None:
+                self.statistik_cache['hit'] += 1
+                return hasil[0], hasil[1]
+            self.statistik_cache['miss'] += 1
+        sentimen, skor = hitung(teks)
+        with self._kunci:
+            self._data[kunci] = [sentimen, skor]
+            while len(self._data) > self.maks_entri:
+                # Entri tertua (urutan sisip) dibuang lebih dulu
+                del self._data[next(iter(self._data))]
+            self._berubah = True
+        return sentimen, skor
+
+    def simpan(self):
+        """
+        Menyimpan cache ke disk jika ada entri baru
+        """
+        with self._kunci:
+            if not self._berubah:
+                return
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            sementara = f"{self.path}.{os.getpid()}.tmp"
+            with open(sementara, 'w', encoding='utf-8') as f:
+                json.dump(self._data, f)
+            os.replace(sementara, self.path)
+            self._berubah = False
+
+    def statistik(self):
+        """
+        Mengembalikan counter hit/miss cache sentimen
+        """
+        total = self.statistik_cache['hit'] + self.statistik_cache['miss']
+        return {
+            **self.statistik_cache,
+            'rasio_hit': self.statistik_cache['hit'] / total if total else 0.0,
+            'jumlah_entri': len(self._data),
+        }
@@ -0,0 +1,333 @@
+"""
+Render grafik analisis teknikal banyak saham ke file PNG/SVG tanpa tampilan (headless).
+
+Setiap worker membuat satu figure Agg (tanpa pyplot) sekali, lalu untuk setiap ticker hanya
+data artist-nya (candle, volume, garis indikator, penanda sinyal) yang diganti sebelum disimpan.
+Riwayat panjang diturunkan resolusinya menjadi paling banyak --maks-bar candle agar waktu
+render per grafik tetap terbatas.
+
+Contoh:
+    python grafik.py BBCA TLKM BBRI --direktori grafik
+    python grafik.py --daftar daftar_idx.txt --periode 2y --format svg --workers 8
+"""
+import argparse
+import contextlib
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import scanner
+from cache_data import DIREKTORI_CACHE_DEFAULT
+from impor_malas import ModulMalas
+from saham import SAHAM_POPULER
+from sumber_data import SumberCSV
+
+# Figure dibuat langsung (tanpa pyplot) sehingga backend GUI tidak pernah dimuat
+figure = ModulMalas('matplotlib.figure')
+collections = ModulMalas('matplotlib.collections')
+ticker_mpl = ModulMalas('matplotlib.ticker')
+
+# Batas candle per grafik; riwayat lebih panjang digabung per beberapa bar
+MAKS_BAR_DEFAULT = 300
+
+FORMAT_GRAFIK = ('png', 'svg')
+
+# Kolom indikator yang digambar (hanya kolom ini dan kolom aturan sinyal yang dihitung)
+KOLOM_GRAFIK = ['SMA_20', 'SMA_50', 'BB_Upper', 'BB_Lower', 'VMA_20', 'RSI', 'MACD', 'MACD_Signal', '%K', '%D']
+
+# Garis indikator: kolom -> (panel, warna, lebar, gaya garis)
+GAYA_GARIS = {
+    'SMA_20': (0, 'blue', 1.0, '-'),
+    'SMA_50': (0, 'red', 1.0, '-'),
+    'BB_Upper': (0, 'gray', 0.5, '--'),
+    'BB_Lower': (0, 'gray', 0.5, '--'),
+    'VMA_20': (1, 'orange', 1.0, '-'),
+    'RSI': (2, 'purple', 1.0, '-'),
+    'MACD': (3, 'blue', 1.0, '-'),
+    'MACD_Signal': (3, 'red', 1.0, '-'),
+    '%K': (4, 'blue', 1.0, '-'),
+    '%D': (4, 'red', 1.0, '-'),
+}
+
+# Garis bantu tetap per panel: panel -> [(nilai, warna)]
+GARIS_BANTU = {2: [(70, 'r'), (30, 'g')], 4: [(80, 'r'), (20, 'g')]}
+
+# Level kompresi zlib PNG: 3 hampir secepat tanpa kompresi dengan ukuran file ~7% lebih besar dari default
+KOMPRESI_PNG = 3
+
+WARNA_NAIK = '#006340'
+WARNA_TURUN = '#a02128'
+
+_template = None
+
+def turunkan_resolusi(df, maks_bar=MAKS_BAR_DEFAULT):
+    """
+    Menggabungkan bar berurutan agar jumlah bar paling banyak maks_bar.
+    OHLC digabung sebagai candle (Open pertama, High maks, Low min, Close terakhir), Volume
+    dirata-rata per bar (tetap sebanding dengan VMA_20), kolom lain memakai nilai bar terakhir,
+    dan Sinyal memakai sinyal Beli/Jual terakhir di dalam kelompok agar penanda tidak hilang.
+    """
+    n = len(df)
+    if maks_bar is None or maks_bar < 1 or n <= maks_bar:
+        return df
+    ukuran = -(-n // maks_bar)
+    # Kelompok disejajarkan ke bar terakhir sehingga bar terbaru selalu berada di kelompok penuh
+    sisa = n % ukuran
+    awal = np.arange(sisa, n, ukuran)
+    if sisa:
+        awal = np.concatenate([[0], awal])
+    akhir = np.append(awal[1:], n) - 1
+
+    hasil = {nama: df[nama].to_numpy()[akhir] for nama in df.columns}
+    if 'Open' in df.columns:
+        hasil['Open'] = df['Open'].to_numpy()[awal]
+    if 'High' in df.columns:
+        hasil['High'] = np.maximum.reduceat(df['High'].to_numpy(), awal)
+    if 'Low' in df.columns:
+        hasil['Low'] = np.minimum.reduceat(df['Low'].to_numpy(), awal)
+    if 'Volume' in df.columns:
+        hasil['Volume'] = np.add.reduceat(df['Volume'].to_numpy(dtype=float), awal) / (akhir - awal + 1)
+    if 'Sinyal' in df.columns:
+        sinyal = df['Sinyal'].to_numpy()
+        posisi = np.where(sinyal != 'Tahan', np.arange(n), -1)
+        terakhir = np.maximum.reduceat(posisi, awal)
+        hasil['Sinyal'] = np.where(terakhir >= 0, sinyal[np.maximum(terakhir, 0)], 'Tahan').astype(object)
+    return pd.DataFrame(hasil, index=df.index[akhir])
+
+def _batas(*nilai, margin=0.05):
+    """
+    Batas sumbu y (min, maks) dari beberapa array dengan margin; None jika semua NaN
+    """
+    gabungan = np.concatenate([np.asarray(v, dtype=float).ravel() for v in nilai]) if nilai else np.array([])
+    gabungan = gabungan[np.isfinite(gabungan)]
+    if not len(gabungan):
+        return None
+    bawah, atas = gabungan.min(), gabungan.max()
+    jarak = (atas - bawah) or abs(atas) or 1.0
+    return bawah - jarak * margin, atas + jarak * margin
+
+class TemplateGrafik:
+    """Kelas figure grafik yang dibuat sekali lalu dipakai ulang: hanya data artist yang diganti per ticker"""
+
+    def __init__(self, ukuran=(14, 10), dpi=100):
+        self.figure = figure.Figure(figsize=ukuran, dpi=dpi)
+        grid = self.figure.add_gridspec(5, 1, height_ratios=[4, 1, 1.2, 1.2, 1.2], hspace=0.08)
+        utama = self.figure.add_subplot(grid[0])
+        self.panel = [utama] + [self.figure.add_subplot(grid[i], sharex=utama) for i in range(1, 5)]
+        self.figure.subplots_adjust(left=0.07, right=0.97, top=0.95, bottom=0.06)
+        self.judul = self.figure.suptitle('')
+        for panel, label in zip(self.panel, ['Harga (Rp)', 'Volume', 'RSI', 'MACD', 'Stochastic']):
+            panel.set_ylabel(label)
+            panel.grid(True, alpha=0.2)
+        for panel in self.panel[:-1]:
+            panel.tick_params(labelbottom=False)
+
+        # Candle: sumbu (wick) sebagai LineCollection, badan dan volume sebagai PolyCollection
+        self.sumbu = collections.LineCollection([], linewidths=0.8)
+        self.badan = collections.PolyCollection([], linewidths=0.5)
+        self.volume = collections.PolyCollection([], linewidths=0)
+        utama.add_collection(self.sumbu)
+        utama.add_collection(self.badan)
+        self.panel[1].add_collection(self.volume)
+
+        self.garis = {}
+        for kolom, (panel, warna, lebar, gaya) in GAYA_GARIS.items():
+            self.garis[kolom], = self.panel[panel].plot([], [], color=warna, linewidth=lebar, linestyle=gaya)
+        for panel, garis in GARIS_BANTU.items():
+            for nilai, warna in garis:
+                self.panel[panel].axhline(y=nilai, color=warna, linestyle='--', alpha=0.5, linewidth=0.8)
+            self.panel[panel].set_ylim(0, 100)
+        self.beli = utama.scatter([], [], s=50, marker='^', color='green', zorder=3)
+        self.jual = utama.scatter([], [], s=50, marker='v', color='red', zorder=3)
+
+        self._tanggal = pd.DatetimeIndex([])
+        self.panel[-1].xaxis.set_major_locator(ticker_mpl.MaxNLocator(nbins=10, integer=True))
+        self.panel[-1].xaxis.set_major_formatter(ticker_mpl.FuncFormatter(self._format_tanggal))
+
+    def _format_tanggal(self, x, _posisi=None):
+        i = int(round(x))
+        if 0 <= i < len(self._tanggal):
+            tanggal = self._tanggal[i]
+            return tanggal.strftime('%d %b %Y') if hasattr(tanggal, 'strftime') else str(tanggal)
+        return ''
+
+    def gambar(self, df, judul=''):
+        """
+        Mengganti data semua artist dengan isi df (OHLCV, kolom indikator dan Sinyal)
+        """
+        n = len(df)
+        x = np.arange(n, dtype=float)
+        o, h, l, c = (df[k].to_numpy(dtype=float) for k in ('Open', 'High', 'Low', 'Close'))
+        naik = c >= o
+        lebar = 0.3
+
+        self.sumbu.set_segments(np.stack([np.column_stack([x, l]), np.column_stack([x, h])], axis=1))
+        self.sumbu.set_color(np.where(naik, WARNA_NAIK, WARNA_TURUN))
+        bawah, atas = np.minimum(o, c), np.maximum(o, c)
+        self.badan.set_verts(np.stack([
+            np.column_stack([x - lebar, bawah]), np.column_stack([x - lebar, atas]),
+            np.column_stack([x + lebar, atas]), np.column_stack([x + lebar, bawah]),
+        ], axis=1))
+        self.badan.set_facecolor(np.where(naik, WARNA_NAIK, WARNA_TURUN))
+        self.badan.set_edgecolor(np.where(naik, WARNA_NAIK, WARNA_TURUN))
+
+        volume = df['Volume'].to_numpy(dtype=float) if 'Volume' in df.columns else np.zeros(n)
+        nol = np.zeros(n)
+        self.volume.set_verts(np.stack([
+            np.column_stack([x - lebar, nol]), np.column_stack([x - lebar, volume]),
+            np.column_stack([x + lebar, volume]), np.column_stack([x + lebar, nol]),
+        ], axis=1))
+        self.volume.set_facecolor(np.where(naik, WARNA_NAIK, WARNA_TURUN))
+
+        for kolom, garis in self.garis.items():
+            if kolom in df.columns:
+                garis.set_data(x, df[kolom].to_numpy(dtype=float))
+            else:
+                garis.set_data([], [])
+
+        sinyal = df['Sinyal'].to_numpy() if 'Sinyal' in df.columns else np.full(n, 'Tahan')
+        beli, jual = sinyal == 'Beli', sinyal == 'Jual'
+        self.beli.set_offsets(np.column_stack([x[beli], l[beli] * 0.99]))
+        self.jual.set_offsets(np.column_stack([x[jual], h[jual] * 1.01]))
+
+        # Batas sumbu dihitung langsung (autoscale tidak memperhitungkan koleksi yang diganti)
+        self.panel[0].set_xlim(-1, max(n, 1))
+        batas_harga = _batas(l * 0.98, h * 1.02, *(df[k] for k in ('BB_Upper', 'BB_Lower') if k in df.columns))
+        if batas_harga:
+            self.panel[0].set_ylim(*batas_harga)
+        batas_volume = _batas(volume, df['VMA_20'] if 'VMA_20' in df.columns else volume, margin=0)
+        if batas_volume:
+            self.panel[1].set_ylim(0, batas_volume[1] * 1.05 or 1)
+        batas_macd = _batas(*(df[k] for k in ('MACD', 'MACD_Signal') if k in df.columns))
+        if batas_macd:
+            self.panel[3].set_ylim(*batas_macd)
+
+        self._tanggal = df.index
+        self.judul.set_text(judul)
+        return self.figure
+
+    def simpan(self, path, format=None):
+        """
+        Menyimpan figure ke file (format dari ekstensi jika tidak diberikan)
+        """
+        format = format or os.path.splitext(path)[1].lstrip('.').lower() or 'png'
+        opsi = {'pil_kwargs': {'compress_level': KOMPRESI_PNG}} if format == 'png' else {}
+        self.figure.savefig(path, format=format, **opsi)
+        return path
+
+def _inisialisasi_grafik(gunakan_cache, direktori_cache, offline, sumber, path_aturan, ukuran, dpi):
+    """
+    Inisialisasi worker: analyzer scanner dan satu template figure per proses
+    """
+    global _template
+    scanner.inisialisasi_worker(gunakan_cache, direktori_cache, offline, sumber, path_aturan)
+    _template = TemplateGrafik(ukuran=ukuran, dpi=dpi)
+
+def render_ticker(kode_saham, periode, data, direktori, format='png', maks_bar=MAKS_BAR_DEFAULT):
+    """
+    Menghitung indikator grafik satu ticker lalu menyimpan grafiknya.
+    Mengembalikan dict (Kode, File, Bar, Durasi_Detik, Error).
+    """
+    mulai = time.perf_counter()
+    hasil = {'Kode': kode_saham, 'File': '', 'Bar': 0}
+    try:
+        analyzer = scanner.analyzer_worker()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if data is not None:
+                analyzer.ticker = kode_saham + ".JK"
+                analyzer.data_saham = data
+            elif not analyzer.unduh_data_saham(kode_saham, periode=periode):
+                raise ValueError("data tidak tersedia")
+            df_sinyal = analyzer.hitung_sinyal_pipeline(kolom=KOLOM_GRAFIK)
+        if df_sinyal is None or df_sinyal.empty:
+            raise ValueError("sinyal tidak dapat dihitung")
+        df_grafik = turunkan_resolusi(df_sinyal, maks_bar)
+        _template.gambar(df_grafik, f'Analisis Teknikal Lengkap - {kode_saham}')
+        hasil['File'] = _template.simpan(os.path.join(direktori, f'{kode_saham}.{format}'), format=format)
+        hasil['Bar'] = len(df_grafik)
+        hasil['Error'] = ''
+    except Exception as e:
+        hasil['Error'] = f"{type(e).__name__}: {e}"
+    hasil['Durasi_Detik'] = time.perf_counter() - mulai
+    return hasil
+
+def render_universe(daftar_kode, direktori='grafik', format='png', workers=None, periode='6mo',
+                    maks_bar=MAKS_BAR_DEFAULT, gunakan_cache=True, direktori_cache=DIREKTORI_CACHE_DEFAULT,
+                    offline=False, sumber=None, path_aturan=None, ukuran=(14, 10), dpi=100):
+    """
+    Merender grafik banyak ticker di process pool.
+    Mengembalikan (tabel hasil, statistik waktu).
+    """
+    if format not in FORMAT_GRAFIK:
+        raise ValueError(f"Format grafik harus salah satu dari {', '.join(FORMAT_GRAFIK)}")
+    os.makedirs(direktori, exist_ok=True)
+    mulai = time.perf_counter()
+    workers = workers or os.cpu_count()
+    data = scanner.unduh_massal(daftar_kode, periode=periode, gunakan_cache=gunakan_cache,
+                                direktori_cache=direktori_cache, offline=offline, sumber=sumber)
+    waktu_unduh = time.perf_counter() - mulai
+
+    hasil = scanner.jalankan_paralel(
+        render_ticker, daftar_kode, lambda kode: (periode, data.get(kode), direktori, format, maks_bar),
+        workers=workers, initializer=_inisialisasi_grafik,
+        initargs=(gunakan_cache, direktori_cache, offline, sumber, path_aturan, ukuran, dpi))
+
+    waktu_total = time.perf_counter() - mulai
+    tabel = pd.DataFrame(hasil, columns=['Kode', 'File', 'Bar', 'Durasi_Detik', 'Error'])
+    berhasil = tabel[tabel['Error'] == '']
+    statistik = scanner.statistik_pindai(
+        len(daftar_kode), len(berhasil), len(tabel) - len(berhasil), waktu_total, waktu_unduh, workers,
+        rata_render=berhasil['Durasi_Detik'].mean() if len(berhasil) else 0.0,
+        grafik_per_detik=len(berhasil) / waktu_total if waktu_total > 0 else 0.0)
+    return tabel, statistik
+
+def main():
+    parser = argparse.ArgumentParser(description="Render grafik analisis teknikal banyak saham ke file")
+    parser.add_argument('kode', nargs='*', help='Kode saham (default: daftar saham populer)')
+    parser.add_argument('--daftar', help='File teks berisi kode saham, satu per baris')
+    parser.add_argument('--direktori', default='grafik', help='Direktori keluaran (default: grafik)')
+    parser.add_argument('--format', choices=FORMAT_GRAFIK, default='png', help='Format file (default: png)')
+    parser.add_argument('--maks-bar', type=int, default=MAKS_BAR_DEFAULT,
+                        help=f'Maksimum candle per grafik, riwayat lebih panjang digabung (default: {MAKS_BAR_DEFAULT})')
+    parser.add_argument('--dpi', type=int, default=100, help='Resolusi PNG (default: 100)')
+    parser.add_argument('--workers', type=int, default=None, help='Jumlah proses (default: jumlah CPU)')
+    parser.add_argument('--periode', default='6mo', help='Periode data (default: 6mo)')
+    parser.add_argument('--offline', action='store_true', help='Gunakan data dari cache lokal saja')
+    parser.add_argument('--tanpa-cache', action='store_true', help='Selalu unduh data tanpa cache lokal')
+    parser.add_argument('--direktori-cache', default=DIREKTORI_CACHE_DEFAULT)
+    parser.add_argument('--sumber-csv', metavar='DIREKTORI',
+                        help='Gunakan file CSV lokal (mis. ekspor analisis_*.csv) sebagai sumber data')
+    parser.add_argument('--aturan', help='File JSON aturan sinyal (default: aturan_sinyal.json)')
+    args = parser.parse_args()
+
+    daftar_kode = [k.upper() for k in args.kode]
+    if args.daftar:
+        daftar_kode += scanner.baca_daftar_kode(args.daftar)
+    daftar_kode = list(dict.fromkeys(daftar_kode or SAHAM_POPULER))
+
+    sumber = SumberCSV(args.sumber_csv) if args.sumber_csv else None
+    gunakan_cache = not args.tanpa_cache and sumber is None
+
+    print(f"Merender grafik {len(daftar_kode)} ticker ke {args.direktori}/ ...")
+    tabel, statistik = render_universe(
+        daftar_kode, direktori=args.direktori, format=args.format, workers=args.workers,
+        periode=args.periode, maks_bar=args.maks_bar, gunakan_cache=gunakan_cache,
+        direktori_cache=args.direktori_cache, offline=args.offline, sumber=sumber,
+        path_aturan=args.aturan, dpi=args.dpi
+    )
+    gagal = tabel[tabel['Error'] != '']
+    print(f"✅ {statistik['berhasil']} grafik disimpan ({statistik['gagal']} gagal)")
+    if not gagal.empty:
+        print(f"\n⚠️  {len(gagal)} ticker gagal dirender:")
+        for _, baris in gagal.iterrows():
+            print(f"   {baris['Kode']:6s} : {baris['Error']}")
+    print(f"\n⏱️  Waktu total       : {statistik['waktu_total']:.2f} detik ({statistik['workers']} worker)")
+    print(f"   Unduh massal      : {statistik['waktu_unduh']:.2f} detik")
+    print(f"   Rata-rata render  : {statistik['rata_render']:.3f} detik per grafik")
+    print(f"   Grafik per detik  : {statistik['grafik_per_detik']:.2f}")
+
+if __name__ == "__main__":
+    main()
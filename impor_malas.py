@@ -0,0 +1,66 @@
+import importlib
+import importlib.util
+import threading
+
+
+def modul_tersedia(nama):
+    """
+    Mengecek apakah modul terpasang tanpa mengimpornya
+    """
+    try:
+        return importlib.util.find_spec(nama) is not None
+    except (ImportError, ValueError):
+        return False
+
+class ModulMalas:
+    """Proxy modul berat (yfinance, matplotlib, ...) yang baru diimpor saat atribut pertamanya diakses"""
+
+    def __init__(self, nama, sebelum_impor=None):
+        """
+        nama          : nama modul, mis. 'matplotlib.pyplot'
+        sebelum_impor : fungsi tanpa argumen yang dijalankan sekali tepat sebelum impor
+                        (mis. memilih backend matplotlib)
+        """
+        self._nama = nama
+        self._sebelum_impor = sebelum_impor
+        self._modul = None
+        self._gagal = False
+        self._kunci = threading.Lock()
+
+    def muat(self):
+        """
+        Mengimpor modul (sekali) lalu mengembalikannya; ImportError diteruskan ke pemanggil
+        """
+        if self._modul is None:
+            with self._kunci:
+                if self._modul is None:
+                    if self._sebelum_impor is not None:
+                        self._sebelum_impor()
+                    self._modul = importlib.import_module(self._nama)
+        return self._modul
+
+    def sudah_dimuat(self):
+        """
+        True jika modul sudah diimpor lewat proxy ini
+        """
+        return self._modul is not None
+
+    def tersedia(self):
+        """
+        True jika modul dapat diimpor (impor dilakukan saat pertama kali dicek)
+        """
+        if self._gagal:
+            return False
+        try:
+            self.muat()
+            return True
+        except ImportError:
+            self._gagal = True
+            return False
+
+    def __getattr__(self, atribut):
+        return getattr(self.muat(), atribut)
+
+    def __repr__(self):
+        status = 'dimuat' if self._modul is not None else 'belum dimuat'
+        return f"<ModulMalas {self._nama} ({status})>"
@@ -0,0 +1,412 @@
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from saham import ATURAN_SINYAL, NILAI_DEFAULT_INDIKATOR
+
+# Urutan kolom indikator, sama dengan hasil hitung_indikator_teknikal + generate_sinyal_lengkap
+KOLOM_INDIKATOR = [
+    'VMA_20', 'VROC_10', 'OBV', 'VPT', 'MACD', 'MACD_Signal', 'MACD_Histogram', 'RSI',
+    'SMA_20', 'SMA_50', 'SMA_200', 'EMA_12', 'EMA_26',
+    'BB_Middle', 'BB_Upper', 'BB_Lower', 'BB_Width', 'BB_Position', '%K', '%D',
+    'TR', '+DM', '-DM', 'TR_Smooth', '+DM_Smooth', '-DM_Smooth', '+DI', '-DI', 'DX', 'ADX',
+    'Williams_R', 'CCI', 'ATR', 'Sinyal', 'Kode_Alasan', 'Skor_Sinyal'
+]
+
+class _JendelaBergulir:
+    """Jendela bergulir dengan jumlah, rata-rata dan varians O(1), mengikuti aritmetika pandas.rolling"""
+
+    def __init__(self, period, varians=False):
+        self.period = period
+        self.varians = varians
+        self.nilai = deque()
+        self.nobs = 0
+        self.jumlah_negatif = 0
+        self.jumlah_sama = 0
+        self.nilai_sebelumnya = None
+        # Jumlah dengan kompensasi Kahan terpisah untuk penambahan dan pengurangan
+        self._jumlah = 0.0
+        self._kompensasi_tambah = 0.0
+        self._kompensasi_kurang = 0.0
+        # Akumulator Welford untuk varians
+        self._rata = 0.0
+        self._ssqdm = 0.0
+        self._kompensasi_var_tambah = 0.0
+        self._kompensasi_var_kurang = 0.0
+
+    def _kahan(self, x, kompensasi):
+        y = x - kompensasi
+        t = self._jumlah + y
+        kompensasi = t - self._jumlah - y
+        self._jumlah = t
+        return kompensasi
+
+    def _kurang(self, x):
+        if x != x:
+            return
+        self.nobs -= 1
+        if x < 0:
+            self.jumlah_negatif -= 1
+        self._kompensasi_kurang = self._kahan(-x, self._kompensasi_kurang)
+        if self.varians:
+            if self.nobs:
+                rata_lama = self._rata - self._kompensasi_var_kurang
+                y = x - self._kompensasi_var_kurang
+                t = y - self._rata
+                self._kompensasi_var_kurang = t + self._rata - y
+                self._rata = self._rata - t / self.nobs
+                self._ssqdm = self._ssqdm - (x - rata_lama) * (x - self._rata)
+            else:
+                self._rata = 0.0
+                self._ssqdm = 0.0
+
+    def _tambah(self, x):
+        if x != x:
+            return
+        self.nobs += 1
+        if x < 0:
+            self.jumlah_negatif += 1
+        self._kompensasi_tambah = self._kahan(x, self._kompensasi_tambah)
+        if x == self.nilai_sebelumnya:
+            self.jumlah_sama += 1
+        else:
+            self.jumlah_sama = 1
+        self.nilai_sebelumnya = x
+        if self.varians:
+            rata_lama = self._rata - self._kompensasi_var_tambah
+            y = x - self._kompensasi_var_tambah
+            t = y - self._rata
+            self._kompensasi_var_tambah = t + self._rata - y
+            self._rata = self._rata + t / self.nobs
+            self._ssqdm = self._ssqdm + (x - rata_lama) * (x - self._rata)
+
+    def tambah(self, x):
+        """
+        Menambahkan satu nilai; nilai tertua dibuang lebih dulu jika jendela penuh
+        """
+        x = float(x)
+        if len(self.nilai) == self.period:
+            self._kurang(self.nilai.popleft())
+        self.nilai.append(x)
+        self._tambah(x)
+
+    @property
+    def valid(self):
+        """
+        True jika jendela penuh dan tidak mengandung NaN (setara min_periods=window)
+        """
+        return self.nobs == self.period
+
+    def jumlah(self):
+        if not self.valid:
+            return np.nan
+        if self.jumlah_sama >= self.nobs:
+            return self.nilai_sebelumnya * self.nobs
+        return self._jumlah
+
+    def rata_rata(self):
+        if not self.valid:
+            return np.nan
+        hasil = self._jumlah / self.nobs
+        if self.jumlah_sama >= self.nobs:
+            hasil = self.nilai_sebelumnya
+        elif self.jumlah_negatif == 0 and hasil < 0:
+            hasil = 0.0
+        elif self.jumlah_negatif == self.nobs and hasil > 0:
+            hasil = 0.0
+        return hasil
+
+    def std(self):
+        if not self.valid or self.nobs < 2:
+            return np.nan
+        if self.jumlah_sama >= self.nobs:
+            return 0.0
+        return math.sqrt(max(self._ssqdm / (self.nobs - 1), 0.0))
+
+    def mad(self):
+        # MAD butuh rata-rata jendela terbaru sehingga dihitung ulang per jendela (O(period))
+        if not self.valid:
+            return np.nan
+        jendela = np.fromiter(self.nilai, dtype=float, count=self.period)
+        return np.abs(jendela - jendela.mean()).mean()
+
+class _JendelaEkstrem:
+    """Rolling max/min O(1) teramortisasi menggunakan monotonic deque"""
+
+    def __init__(self, period, maksimum=True):
+        self.period = period
+        self.maksimum = maksimum
+        self.indeks = 0
+        self.kandidat = deque()  # (indeks, nilai)
+        self.posisi_nan = deque()
+
+    def tambah(self, x):
+        x = float(x)
+        i = self.indeks
+        self.indeks += 1
+        if x != x:
+            self.posisi_nan.append(i)
+        else:
+            if self.maksimum:
+                while self.kandidat and self.kandidat[-1][1] <= x:
+                    self.kandidat.pop()
+            else:
+                while self.kandidat and self.kandidat[-1][1] >= x:
+                    self.kandidat.pop()
+            self.kandidat.append((i, x))
+
+        batas = self.indeks - self.period
+        while self.kandidat and self.kandidat[0][0] < batas:
+            self.kandidat.popleft()
+        while self.posisi_nan and self.posisi_nan[0] < batas:
+            self.posisi_nan.popleft()
+
+    def nilai(self):
+        if self.indeks < self.period or self.posisi_nan or not self.kandidat:
+            return np.nan
+        return self.kandidat[0][1]
+
+class _EMA:
+    """EMA adjust=False dengan rumus pembobotan yang sama seperti pandas.ewm"""
+
+    def __init__(self, span):
+        # alpha dihitung lewat com seperti pandas agar pembulatannya identik
+        self.alpha = 1.0 / (1.0 + (span - 1.0) / 2.0)
+        self.faktor_lama = 1.0 - self.alpha
+        self.nilai = np.nan
+
+    def tambah(self, x):
+        x = float(x)
+        if self.nilai != self.nilai:
+            self.nilai = x
+        elif x == x and self.nilai != x:
+            bobot_lama = self.faktor_lama
+            self.nilai = ((bobot_lama * self.nilai) + (self.alpha * x)) / (bobot_lama + self.alpha)
+        return self.nilai
+
+class _RiwayatKolom(dict):
+    """Dict nama kolom -> array beberapa bar terakhir, dibuat saat kolom dibaca aturan"""
+
+    def __init__(self, riwayat):
+        super().__init__()
+        self.riwayat = riwayat
+
+    def __missing__(self, nama):
+        nilai = np.array([baris[nama] for baris in self.riwayat], dtype=float)
+        self[nama] = nilai
+        return nilai
+
+class MesinIndikatorInkremental:
+    """Kelas untuk memperbarui semua indikator dan sinyal satu bar demi satu bar"""
+
+    def __init__(self, aturan=None):
+        self.aturan = aturan if aturan is not None else ATURAN_SINYAL
+        self.jumlah_bar = 0
+        self.close_lalu = np.nan
+        self.high_lalu = np.nan
+        self.low_lalu = np.nan
+
+        # Volume
+        self.vma_20 = _JendelaBergulir(20)
+        self.volume_lalu = deque(maxlen=11)
+        self.obv = 0
+        self.vpt = 0.0
+
+        # MACD dan EMA
+        self.ema_12 = _EMA(12)
+        self.ema_26 = _EMA(26)
+        self.macd_signal = _EMA(9)
+
+        # RSI
+        self.gain = _JendelaBergulir(14)
+        self.loss = _JendelaBergulir(14)
+
+        # SMA dan Bollinger Bands
+        self.sma_20 = _JendelaBergulir(20, varians=True)
+        self.sma_50 = _JendelaBergulir(50)
+        self.sma_200 = _JendelaBergulir(200)
+
+        # Stochastic dan Williams %R (jendela min/max bersama)
+        self.high_max = _JendelaEkstrem(14, maksimum=True)
+        self.low_min = _JendelaEkstrem(14, maksimum=False)
+        self.stoch_d = _JendelaBergulir(3)
+
+        # ADX dan ATR
+        self.tr_smooth = _JendelaBergulir(14)
+        self.plus_dm_smooth = _JendelaBergulir(14)
+        self.minus_dm_smooth = _JendelaBergulir(14)
+        self.adx = _JendelaBergulir(14)
+        self.atr = _JendelaBergulir(14)
+
+        # CCI
+        self.typical_price = _JendelaBergulir(20)
+
+        # Baris mentah (sebelum fillna) untuk aturan yang membaca bar sebelumnya
+        self.riwayat = deque(maxlen=self.aturan.riwayat)
+
+    @classmethod
+    def dari_data(cls, df, aturan=None):
+        """
+        Membuat mesin dan memutar ulang data historis untuk mengisi state awal
+        """
+        mesin = cls(aturan=aturan)
+        for bar in df.to_dict('records'):
+            mesin.update(bar)
+        return mesin
+
+    def update(self, bar):
+        """
+        Menambahkan satu bar OHLCV dan mengembalikan baris lengkap (dict) beserta Sinyal/Skor_Sinyal
+        """
+        baris = dict(bar)
+        o = float(baris['Open'])
+        h = float(baris['High'])
+        l = float(baris['Low'])
+        c = float(baris['Close'])
+        v = baris['Volume']
+        c_lalu, h_lalu, l_lalu = self.close_lalu, self.high_lalu, self.low_lalu
+        pertama = self.jumlah_bar == 0
+
+        # Indikator volume
+        self.vma_20.tambah(v)
+        baris['VMA_20'] = self.vma_20.rata_rata()
+        self.volume_lalu.append(v)
+        if len(self.volume_lalu) == 11:
+            volume_shift = float(self.volume_lalu[0])
+            baris['VROC_10'] = ((v - volume_shift) / volume_shift) * 100 if volume_shift != 0 else 0
+        else:
+            baris['VROC_10'] = np.nan
+
+        # OBV dan VPT
+        if not pertama:
+            if c > c_lalu:
+                self.obv = self.obv + v
+            elif c < c_lalu:
+                self.obv = self.obv - v
+            with np.errstate(divide='ignore', invalid='ignore'):
+                self.vpt = self.vpt + v * ((c - c_lalu) / np.float64(c_lalu))
+        baris['OBV'] = self.obv
+        baris['VPT'] = self.vpt
+
+        # MACD
+        ema_12 = self.ema_12.tambah(c)
+        ema_26 = self.ema_26.tambah(c)
+        macd = ema_12 - ema_26
+        macd_signal = self.macd_signal.tambah(macd)
+        baris['MACD'] = macd
+        baris['MACD_Signal'] = macd_signal
+        baris['MACD_Histogram'] = macd - macd_signal
+
+        # RSI
+        delta = c - c_lalu
+        self.gain.tambah(delta if delta > 0 else 0.0)
+        self.loss.tambah(-delta if delta < 0 else -0.0)
+        gain, loss = self.gain.rata_rata(), self.loss.rata_rata()
+        if loss != loss:
+            rs = np.nan
+        else:
+            rs = gain / loss if loss != 0 else 0
+        baris['RSI'] = (100 - (100 / (1 + rs))) if rs != 0 else 50
+
+        # SMA dan EMA
+        self.sma_20.tambah(c)
+        self.sma_50.tambah(c)
+        self.sma_200.tambah(c)
+        baris['SMA_20'] = self.sma_20.rata_rata()
+        baris['SMA_50'] = self.sma_50.rata_rata()
+        baris['SMA_200'] = self.sma_200.rata_rata()
+        baris['EMA_12'] = ema_12
+        baris['EMA_26'] = ema_26
+
+        # Bollinger Bands
+        bb_middle = baris['SMA_20']
+        bb_std = self.sma_20.std()
+        bb_upper = bb_middle + (bb_std * 2)
+        bb_lower = bb_middle - (bb_std * 2)
+        bb_range = bb_upper - bb_lower
+        baris['BB_Middle'] = bb_middle
+        baris['BB_Upper'] = bb_upper
+        baris['BB_Lower'] = bb_lower
+        baris['BB_Width'] = bb_range
+        baris['BB_Position'] = (c - bb_lower) / bb_range if bb_range != 0 else 0.5
+
+        # Stochastic
+        self.high_max.tambah(h)
+        self.low_min.tambah(l)
+        high_max, low_min = self.high_max.nilai(), self.low_min.nilai()
+        stoch_range = high_max - low_min
+        baris['%K'] = 100 * ((c - low_min) / stoch_range) if stoch_range != 0 else 50
+        self.stoch_d.tambah(baris['%K'])
+        baris['%D'] = self.stoch_d.rata_rata()
+
+        # ADX
+        tr = max(h - l, max(abs(h - c_lalu), abs(l - c_lalu))) if not pertama else np.nan
+        naik = h - h_lalu
+        turun = l_lalu - l
+        plus_dm = max(naik, 0) if naik > turun else 0
+        minus_dm = max(turun, 0) if turun > naik else 0
+        self.tr_smooth.tambah(tr)
+        self.plus_dm_smooth.tambah(plus_dm)
+        self.minus_dm_smooth.tambah(minus_dm)
+        tr_smooth = self.tr_smooth.jumlah()
+        plus_dm_smooth = self.plus_dm_smooth.jumlah()
+        minus_dm_smooth = self.minus_dm_smooth.jumlah()
+        plus_di = 100 * (plus_dm_smooth / tr_smooth) if tr_smooth != 0 else 0
+        minus_di = 100 * (minus_dm_smooth / tr_smooth) if tr_smooth != 0 else 0
+        di_sum = plus_di + minus_di
+        dx = 100 * abs(plus_di - minus_di) / di_sum if di_sum != 0 else 0
+        self.adx.tambah(dx)
+        baris['TR'] = tr
+        baris['+DM'] = plus_dm
+        baris['-DM'] = minus_dm
+        baris['TR_Smooth'] = tr_smooth
+        baris['+DM_Smooth'] = plus_dm_smooth
+        baris['-DM_Smooth'] = minus_dm_smooth
+        baris['+DI'] = plus_di
+        baris['-DI'] = minus_di
+        baris['DX'] = dx
+        baris['ADX'] = self.adx.rata_rata()
+
+        # Williams %R
+        baris['Williams_R'] = -100 * ((high_max - c) / stoch_range) if stoch_range != 0 else -50
+
+        # CCI
+        tp = (h + l + c) / 3
+        self.typical_price.tambah(tp)
+        sma_tp = self.typical_price.rata_rata()
+        mad = self.typical_price.mad()
+        baris['CCI'] = (tp - sma_tp) / (0.015 * mad) if mad != 0 else 0
+
+        # ATR (bar pertama memakai High - Low saja)
+        self.atr.tambah(h - l if pertama else tr)
+        baris['ATR'] = self.atr.rata_rata()
+
+        # Sinyal dihitung dari nilai mentah, sama seperti jalur batch
+        self.riwayat.append(baris)
+        kolom = _RiwayatKolom(self.riwayat)
+        kode_alasan, skor = self.aturan.evaluasi(kolom)
+        skor = int(skor[-1])
+        baris['Skor_Sinyal'] = skor
+        baris['Kode_Alasan'] = int(kode_alasan[-1])
+        baris['Sinyal'] = self.aturan.label_sinyal(skor)
+
+        self.close_lalu, self.high_lalu, self.low_lalu = c, h, l
+        self.jumlah_bar += 1
+
+        # Baris keluaran memakai nilai default untuk NaN, seperti generate_sinyal_lengkap
+        hasil = {k: baris[k] for k in baris if k not in KOLOM_INDIKATOR}
+        for nama in KOLOM_INDIKATOR:
+            nilai = baris[nama]
+            if nama in NILAI_DEFAULT_INDIKATOR and nilai != nilai:
+                nilai = NILAI_DEFAULT_INDIKATOR[nama]
+            hasil[nama] = nilai
+        return hasil
+
+    def update_banyak(self, df):
+        """
+        Memperbarui mesin dengan beberapa bar sekaligus dan mengembalikan DataFrame hasilnya
+        """
+        baris = [self.update(bar) for bar in df.to_dict('records')]
+        return pd.DataFrame(baris, index=df.index)
@@ -0,0 +1,237 @@
+"""
+Analisis multi-timeframe: bar harian diambil sekali (lewat cache/sumber data) lalu di-resample
+menjadi bar mingguan dan bulanan, pipeline indikator/sinyal dijalankan per timeframe, dan sinyal
+timeframe besar disejajarkan ke bar harian untuk melihat kapan keduanya selaras.
+
+Contoh:
+    python kerangka_waktu.py BBCA --periode 5y --tampil 15
+    python kerangka_waktu.py --daftar daftar_idx.txt --workers 8 --simpan selaras.csv
+"""
+import argparse
+import contextlib
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import scanner
+from cache_data import DIREKTORI_CACHE_DEFAULT
+from saham import PipelineIndikator, SAHAM_POPULER
+from sumber_data import SumberCSV
+
+# Nama timeframe -> frekuensi resample (alias pandas; None = bar harian apa adanya)
+KERANGKA_WAKTU = {'harian': None, 'mingguan': 'W-FRI', 'bulanan': 'ME'}
+
+# Riwayat default lebih panjang dari scanner agar indikator mingguan/bulanan punya cukup bar
+PERIODE_DEFAULT = '5y'
+
+def _kunci_periode(indeks, frekuensi):
+    """
+    Nomor periode (minggu berakhir Jumat atau bulan kalender) setiap bar menurut tanggal lokal bursa
+    """
+    tanggal = (indeks.tz_localize(None) if indeks.tz is not None else indeks).to_numpy().astype('datetime64[D]')
+    if frekuensi == 'W-FRI':
+        # 1970-01-01 jatuh pada Kamis; minggu dihitung Sabtu s.d. Jumat
+        return (tanggal.astype(np.int64) - 2) // 7
+    if frekuensi == 'ME':
+        return tanggal.astype('datetime64[M]').astype(np.int64)
+    raise ValueError(f"Frekuensi resample tidak didukung: {frekuensi}")
+
+def resample_ohlcv(df, frekuensi):
+    """
+    Menggabungkan bar harian menjadi bar timeframe lebih besar ('W-FRI' atau 'ME') dengan reduceat.
+    Setiap bar diberi label tanggal bar harian terakhirnya (bukan akhir kalender) sehingga bar
+    periode berjalan tetap ada dan indeksnya merupakan bagian dari indeks harian.
+    """
+    if frekuensi is None or df.empty:
+        return df
+    kunci = _kunci_periode(df.index, frekuensi)
+    awal = np.flatnonzero(np.r_[True, kunci[1:] != kunci[:-1]])
+    akhir = np.r_[awal[1:], len(df)] - 1
+
+    hasil = {}
+    for kolom in df.columns:
+        nilai = df[kolom].to_numpy()
+        if kolom == 'Open':
+            hasil[kolom] = nilai[awal]
+        elif kolom == 'High':
+            hasil[kolom] = np.fmax.reduceat(nilai, awal)
+        elif kolom == 'Low':
+            hasil[kolom] = np.fmin.reduceat(nilai, awal)
+        elif kolom in ('Volume', 'Dividends'):
+            # NaN dilewati seperti sum pandas (satu bar kosong tidak membuat seluruh periode NaN)
+            hasil[kolom] = np.add.reduceat(np.nan_to_num(nilai), awal)
+        elif kolom == 'Stock Splits':
+            # Rasio split dalam satu periode dikalikan; 0 atau NaN berarti tidak ada split
+            rasio = np.multiply.reduceat(np.where((nilai == 0) | np.isnan(nilai), 1.0, nilai), awal)
+            hasil[kolom] = np.where(rasio == 1.0, 0.0, rasio)
+        else:
+            hasil[kolom] = nilai[akhir]
+    return pd.DataFrame(hasil, index=df.index[akhir])
+
+def analisis_timeframe(data_harian, aturan=None, kerangka=tuple(KERANGKA_WAKTU), dtype=np.float64):
+    """
+    Menjalankan pipeline indikator dan sinyal pada setiap timeframe dari satu frame harian.
+    Mengembalikan dict nama timeframe -> DataFrame sinyal.
+    """
+    pipeline = PipelineIndikator(perantara=False, dtype=dtype, aturan=aturan)
+    hasil = {}
+    for nama in kerangka:
+        if nama not in KERANGKA_WAKTU:
+            raise ValueError(f"Timeframe tidak dikenal: {nama} (pilihan: {', '.join(KERANGKA_WAKTU)})")
+        hasil[nama] = pipeline.jalankan(resample_ohlcv(data_harian, KERANGKA_WAKTU[nama]))
+    return hasil
+
+def gabungkan_sinyal(hasil, selaras=('harian', 'mingguan')):
+    """
+    Menyejajarkan Sinyal dan Skor_Sinyal semua timeframe ke indeks timeframe pertama.
+    Sinyal timeframe besar diteruskan (forward-fill) dari bar terakhirnya yang sudah terbentuk,
+    sehingga tidak ada informasi dari masa depan. Kolom Selaras bernilai True jika sinyal
+    timeframe pada `selaras` sama dan bukan 'Tahan'.
+    """
+    nama_dasar = next(iter(hasil))
+    indeks = hasil[nama_dasar].index
+    gabungan = pd.DataFrame({'Close': hasil[nama_dasar]['Close']}, index=indeks)
+    for nama, df in hasil.items():
+        gabungan[f'Sinyal_{nama}'] = df['Sinyal'].reindex(indeks, method='ffill').fillna('Tahan')
+        gabungan[f'Skor_{nama}'] = df['Skor_Sinyal'].reindex(indeks, method='ffill').fillna(0).astype(int)
+
+    pertama = gabungan[f'Sinyal_{selaras[0]}']
+    sama = pertama != 'Tahan'
+    for nama in selaras[1:]:
+        sama &= gabungan[f'Sinyal_{nama}'] == pertama
+    gabungan['Selaras'] = sama
+    gabungan['Sinyal_Selaras'] = pertama.where(sama, 'Tahan')
+    return gabungan
+
+def analisis_ticker_multi(kode_saham, periode=PERIODE_DEFAULT, data=None, kerangka=tuple(KERANGKA_WAKTU),
+                          selaras=('harian', 'mingguan')):
+    """
+    Worker: satu pengambilan data harian lalu ringkasan bar terakhir setiap timeframe.
+    Kegagalan dikembalikan sebagai kolom Error, tidak dilempar ke pemanggil.
+    """
+    mulai = time.perf_counter()
+    hasil = {'Kode': kode_saham}
+    try:
+        analyzer = scanner.analyzer_worker()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if data is None:
+                data = analyzer.ambil_riwayat(kode_saham + ".JK", periode=periode)
+        if data is None or data.empty:
+            raise ValueError("data tidak tersedia")
+        gabungan = gabungkan_sinyal(analisis_timeframe(data, aturan=analyzer.aturan, kerangka=kerangka),
+                                    selaras=selaras)
+        terakhir = gabungan.iloc[-1]
+        hasil['Tanggal'] = gabungan.index[-1]
+        hasil['Close'] = terakhir['Close']
+        for nama in kerangka:
+            hasil[f'Sinyal_{nama}'] = terakhir[f'Sinyal_{nama}']
+            hasil[f'Skor_{nama}'] = int(terakhir[f'Skor_{nama}'])
+        hasil['Selaras'] = bool(terakhir['Selaras'])
+        tanggal_selaras = gabungan.index[gabungan['Selaras'].to_numpy()]
+        hasil['Selaras_Terakhir'] = tanggal_selaras[-1] if len(tanggal_selaras) else pd.NaT
+        hasil['Error'] = ''
+    except Exception as e:
+        hasil['Error'] = f"{type(e).__name__}: {e}"
+    hasil['Durasi_Detik'] = time.perf_counter() - mulai
+    return hasil
+
+def pindai_multi_timeframe(daftar_kode, workers=None, periode=PERIODE_DEFAULT, gunakan_cache=True,
+                           direktori_cache=DIREKTORI_CACHE_DEFAULT, offline=False, sumber=None,
+                           path_aturan=None, kerangka=tuple(KERANGKA_WAKTU), selaras=('harian', 'mingguan')):
+    """
+    Analisis multi-timeframe banyak ticker di process pool.
+    Mengembalikan (tabel ringkasan, tabel gagal, statistik waktu).
+    """
+    mulai = time.perf_counter()
+    workers = workers or os.cpu_count()
+    data = scanner.unduh_massal(daftar_kode, periode=periode, gunakan_cache=gunakan_cache,
+                                direktori_cache=direktori_cache, offline=offline, sumber=sumber)
+    waktu_unduh = time.perf_counter() - mulai
+
+    hasil = scanner.jalankan_paralel(
+        analisis_ticker_multi, daftar_kode, lambda kode: (periode, data.get(kode), kerangka, selaras),
+        workers=workers, initargs=(gunakan_cache, direktori_cache, offline, sumber, path_aturan))
+
+    waktu_total = time.perf_counter() - mulai
+    df = pd.DataFrame(hasil)
+    gagal = df[df['Error'] != ''].reset_index(drop=True)
+    berhasil = df[df['Error'] == ''].drop(columns='Error')
+    if not berhasil.empty:
+        # Baris gagal (NaN) membuat kolom skor menjadi float/object; kembalikan tipenya setelah disaring
+        skor = [kolom for kolom in berhasil.columns if kolom.startswith('Skor_')]
+        berhasil = berhasil.astype({**dict.fromkeys(skor, int), 'Selaras': bool})
+        # Ticker yang selaras di atas, lalu berdasarkan total skor timeframe yang dibandingkan
+        berhasil['Skor_Gabungan'] = sum(berhasil[f'Skor_{nama}'] for nama in selaras)
+        berhasil = berhasil.sort_values(['Selaras', 'Skor_Gabungan'], ascending=[False, False])
+    berhasil = berhasil.reset_index(drop=True)
+    berhasil.index = berhasil.index + 1
+
+    statistik = scanner.statistik_pindai(
+        len(daftar_kode), len(berhasil), len(gagal), waktu_total, waktu_unduh, workers,
+        selaras=int(berhasil['Selaras'].sum()) if not berhasil.empty else 0)
+    return berhasil, gagal, statistik
+
+def main():
+    parser = argparse.ArgumentParser(description="Analisis sinyal harian, mingguan dan bulanan dari satu unduhan")
+    parser.add_argument('kode', nargs='*', help='Kode saham (default: daftar saham populer)')
+    parser.add_argument('--daftar', help='File teks berisi kode saham, satu per baris')
+    parser.add_argument('--kerangka', nargs='+', choices=list(KERANGKA_WAKTU), default=list(KERANGKA_WAKTU),
+                        help='Timeframe yang dihitung; yang pertama menjadi dasar tampilan (default: semua)')
+    parser.add_argument('--selaras', nargs='+', choices=list(KERANGKA_WAKTU), default=['harian', 'mingguan'],
+                        help='Timeframe yang sinyalnya harus sama (default: harian mingguan)')
+    parser.add_argument('--workers', type=int, default=None, help='Jumlah proses (default: jumlah CPU)')
+    parser.add_argument('--periode', default=PERIODE_DEFAULT, help=f'Periode data harian (default: {PERIODE_DEFAULT})')
+    parser.add_argument('--offline', action='store_true', help='Gunakan data dari cache lokal saja')
+    parser.add_argument('--tanpa-cache', action='store_true', help='Selalu unduh data tanpa cache lokal')
+    parser.add_argument('--direktori-cache', default=DIREKTORI_CACHE_DEFAULT)
+    parser.add_argument('--sumber-csv', metavar='DIREKTORI',
+                        help='Gunakan file CSV lokal (mis. ekspor analisis_*.csv) sebagai sumber data')
+    parser.add_argument('--aturan', help='File JSON aturan sinyal (default: aturan_sinyal.json)')
+    parser.add_argument('--simpan', help='Simpan tabel ringkasan ke file CSV')
+    parser.add_argument('--tampil', type=int, default=30, help='Jumlah baris yang ditampilkan')
+    args = parser.parse_args()
+
+    kerangka = tuple(dict.fromkeys(args.kerangka + args.selaras))
+    daftar_kode = [k.upper() for k in args.kode]
+    if args.daftar:
+        daftar_kode += scanner.baca_daftar_kode(args.daftar)
+    daftar_kode = list(dict.fromkeys(daftar_kode or SAHAM_POPULER))
+
+    sumber = SumberCSV(args.sumber_csv) if args.sumber_csv else None
+    gunakan_cache = not args.tanpa_cache and sumber is None
+
+    print(f"Analisis {', '.join(kerangka)} untuk {len(daftar_kode)} ticker...")
+    berhasil, gagal, statistik = pindai_multi_timeframe(
+        daftar_kode, workers=args.workers, periode=args.periode, gunakan_cache=gunakan_cache,
+        direktori_cache=args.direktori_cache, offline=args.offline, sumber=sumber,
+        path_aturan=args.aturan, kerangka=kerangka, selaras=tuple(args.selaras)
+    )
+
+    print(f"\n{'='*70}")
+    print(f"SINYAL MULTI-TIMEFRAME ({statistik['selaras']} dari {statistik['berhasil']} ticker selaras: "
+          f"{' + '.join(args.selaras)})")
+    print(f"{'='*70}")
+    if not berhasil.empty:
+        kolom = ['Kode', 'Close'] + [f'Sinyal_{nama}' for nama in kerangka] + [f'Skor_{nama}' for nama in kerangka]
+        kolom += ['Selaras', 'Selaras_Terakhir']
+        tampil = berhasil[kolom].head(args.tampil).copy()
+        tampil['Selaras_Terakhir'] = tampil['Selaras_Terakhir'].map(
+            lambda t: t.strftime('%Y-%m-%d') if pd.notna(t) else '-')
+        with pd.option_context('display.width', 160, 'display.float_format', '{:,.2f}'.format):
+            print(tampil.to_string())
+    if not gagal.empty:
+        print(f"\n⚠️  {len(gagal)} ticker gagal dianalisis:")
+        for _, baris in gagal.head(args.tampil).iterrows():
+            print(f"   {baris['Kode']:6s} : {baris['Error']}")
+    print(f"\n⏱️  Waktu total : {statistik['waktu_total']:.2f} detik ({statistik['workers']} worker), "
+          f"unduh {statistik['waktu_unduh']:.2f} detik")
+
+    if args.simpan:
+        berhasil.to_csv(args.simpan, index_label='Peringkat')
+        print(f"Hasil disimpan sebagai {args.simpan}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""
+Layanan HTTP lokal yang mengembalikan Sinyal/Skor_Sinyal sebuah ticker dalam format JSON.
+
+Hasil per ticker disimpan di memori dan dipakai ulang selama data harganya tidak berubah: setelah
+--ttl detik data dicek ulang (lewat cache OHLCV), dan sinyal hanya dihitung ulang jika ada bar baru
+atau bar terakhir berubah. Permintaan bersamaan untuk ticker yang sama menunggu satu perhitungan
+yang sama (tanpa unduhan ganda).
+
+Contoh:
+    python layanan.py --port 8765
+    curl http://127.0.0.1:8765/sinyal/BBCA
+    curl "http://127.0.0.1:8765/sinyal?kode=BBCA,TLKM&riwayat=5"
+    curl http://127.0.0.1:8765/status
+    curl http://127.0.0.1:8765/metrics
+"""
+import argparse
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from aturan_sinyal import AturanSinyal
+from cache_data import CacheOHLCV, DIREKTORI_CACHE_DEFAULT
+from metrik import METRIK
+from saham import AnalisisSahamLengkap, decode_alasan
+from sumber_data import SumberCSV, mulai_periode
+
+# Kolom indikator bar terakhir yang disertakan di respons
+KOLOM_LAYANAN = ['Close', 'Volume', 'RSI', 'MACD', 'MACD_Signal', 'ADX', '+DI', '-DI', '%K', '%D',
+                 'BB_Position', 'VROC_10', 'VMA_20', 'SMA_20', 'SMA_50', 'ATR']
+
+# Kolom yang menentukan apakah data harga berubah sejak sinyal terakhir dihitung
+KOLOM_TANDA = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Batas jumlah bar riwayat sinyal per respons
+MAKS_RIWAYAT = 500
+
+def _angka(nilai):
+    """
+    Mengubah skalar numpy/pandas menjadi nilai JSON (NaN menjadi null)
+    """
+    if isinstance(nilai, (np.integer, int)):
+        return int(nilai)
+    if isinstance(nilai, (np.floating, float)):
+        return None if np.isnan(nilai) else float(nilai)
+    return nilai
+
+class LayananSinyal:
+    """Kelas cache hasil sinyal per ticker dengan penggabungan permintaan bersamaan (single-flight)"""
+
+    def __init__(self, cache=None, sumber=None, aturan=None, periode='6mo', ttl=60, maks_entri=1000):
+        """
+        cache      : CacheOHLCV bersama (opsional); tanpa cache data diambil langsung dari sumber
+        ttl        : detik hasil dilayani tanpa mengecek data harga lagi
+        maks_entri : jumlah ticker/periode yang disimpan di memori (LRU)
+        """
+        self.cache = cache
+        self.sumber = sumber
+        self.aturan = aturan
+        self.periode = periode
+        self.ttl = ttl
+        self.maks_entri = maks_entri
+        self._hasil = OrderedDict()
+        self._berjalan = {}
+        self._kunci = threading.Lock()
+        self._lokal = threading.local()
+        self.statistik_layanan = {'hit': 0, 'valid': 0, 'hitung': 0, 'gabung': 0, 'gagal': 0}
+
+    def _analyzer(self):
+        """
+        Satu AnalisisSahamLengkap per thread (state data_saham tidak dibagi antar permintaan)
+        """
+        if not hasattr(self._lokal, 'analyzer'):
+            self._lokal.analyzer = AnalisisSahamLengkap(cache=self.cache, sumber=self.sumber, aturan=self.aturan)
+        return self._lokal.analyzer
+
+    def _catat(self, nama):
+        with self._kunci:
+            self.statistik_layanan[nama] += 1
+
+    def ambil(self, kode_saham, periode=None):
+        """
+        Mengembalikan (entri hasil, status) untuk satu ticker. Status: 'hit' (dalam ttl), 'valid'
+        (data dicek, tidak ada bar baru), 'hitung' (sinyal dihitung ulang) atau 'gabung' (menunggu
+        perhitungan yang sedang berjalan untuk ticker yang sama).
+        """
+        kunci = (kode_saham, periode or self.periode)
+        with self._kunci:
+            entri = self._hasil.get(kunci)
+            if entri is not None and time.monotonic() - entri['dicek'] < self.ttl:
+                self._hasil.move_to_end(kunci)
+                self.statistik_layanan['hit'] += 1
+                return entri, 'hit'
+            future = self._berjalan.get(kunci)
+            pemilik = future is None
+            if pemilik:
+                future = self._berjalan[kunci] = Future()
+
+        if not pemilik:
+            self._catat('gabung')
+            return future.result(), 'gabung'
+
+        try:
+            entri, status = self._segarkan(kunci, entri)
+            future.set_result(entri)
+        except Exception as e:
+            self._catat('gagal')
+            future.set_exception(e)
+            raise
+        finally:
+            with self._kunci:
+                del self._berjalan[kunci]
+        self._catat(status)
+        return entri, status
+
+    def _segarkan(self, kunci, entri):
+        """
+        Mengambil data harga terbaru; sinyal dihitung ulang hanya jika datanya berubah
+        """
+        kode_saham, periode = kunci
+        analyzer = self._analyzer()
+        df = analyzer.ambil_riwayat(kode_saham + ".JK", periode=periode)
+        if df is None or df.empty:
+            raise KeyError(f"Data {kode_saham} tidak tersedia")
+        tanda = (len(df), df.index[-1], tuple(_angka(v) for v in df.iloc[-1][KOLOM_TANDA]))
+
+        if entri is not None and entri['tanda'] == tanda:
+            status = 'valid'
+            entri = {**entri, 'dicek': time.monotonic()}
+        else:
+            status = 'hitung'
+            mulai = time.perf_counter()
+            analyzer.ticker = kode_saham + ".JK"
+            analyzer.data_saham = df
+            df_sinyal = analyzer.hitung_sinyal_pipeline(kolom=KOLOM_LAYANAN)
+            entri = {
+                'tanda': tanda,
+                'dicek': time.monotonic(),
+                'dihitung': pd.Timestamp.now(tz='UTC').isoformat(),
+                'durasi_hitung_ms': (time.perf_counter() - mulai) * 1000,
+                'terakhir': {kolom: _angka(df_sinyal[kolom].iloc[-1]) for kolom in KOLOM_LAYANAN},
+                'kode_alasan': int(df_sinyal['Kode_Alasan'].iloc[-1]),
+                # Riwayat sinyal disimpan ringkas untuk parameter riwayat=N
+                'tanggal': df_sinyal.index[-MAKS_RIWAYAT:],
+                'sinyal': df_sinyal['Sinyal'].to_numpy()[-MAKS_RIWAYAT:],
+                'skor': df_sinyal['Skor_Sinyal'].to_numpy()[-MAKS_RIWAYAT:],
+            }
+            analyzer.data_saham = None
+
+        with self._kunci:
+            self._hasil[kunci] = entri
+            self._hasil.move_to_end(kunci)
+            while len(self._hasil) > self.maks_entri:
+                self._hasil.popitem(last=False)
+        return entri, status
+
+    def respons(self, kode_saham, periode=None, riwayat=0):
+        """
+        Hasil satu ticker sebagai dict siap JSON
+        """
+        mulai = time.perf_counter()
+        entri, status = self.ambil(kode_saham, periode)
+        hasil = {
+            'kode': kode_saham,
+            'periode': periode or self.periode,
+            'tanggal': entri['tanggal'][-1].isoformat(),
+            'sinyal': entri['sinyal'][-1],
+            'skor_sinyal': int(entri['skor'][-1]),
+            'alasan': decode_alasan(entri['kode_alasan'], self.aturan),
+            'indikator': entri['terakhir'],
+            'bar': entri['tanda'][0],
+            'dihitung': entri['dihitung'],
+            'cache': status,
+            'durasi_ms': (time.perf_counter() - mulai) * 1000,
+        }
+        if riwayat:
+            hasil['riwayat'] = [
+                {'tanggal': t.isoformat(), 'sinyal': s, 'skor_sinyal': int(k)}
+                for t, s, k in zip(entri['tanggal'][-riwayat:], entri['sinyal'][-riwayat:], entri['skor'][-riwayat:])
+            ]
+        return hasil
+
+    def statistik(self):
+        """
+        Counter permintaan beserta jumlah entri dan perhitungan yang sedang berjalan
+        """
+        with self._kunci:
+            total = sum(self.statistik_layanan.values())
+            return {
+                **self.statistik_layanan,
+                'jumlah_entri': len(self._hasil),
+                'sedang_dihitung': len(self._berjalan),
+                'rasio_hit': (self.statistik_layanan['hit'] + self.statistik_layanan['valid'] +
+                              self.statistik_layanan['gabung']) / total if total else 0.0,
+                'ttl': self.ttl,
+            }
+
+class PenanganSinyal(BaseHTTPRequestHandler):
+    """Penangan HTTP: /sinyal/<KODE>, /sinyal?kode=A,B, /status dan /metrics (Prometheus)"""
+
+    layanan = None  # Diisi oleh buat_server()
+    server_version = 'SahamAI/1.0'
+
+    def _kirim(self, status, isi):
+        data = json.dumps(isi, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _satu(self, kode, periode, riwayat):
+        try:
+            return 200, self.layanan.respons(kode, periode=periode, riwayat=riwayat)
+        except KeyError as e:
+            return 404, {'kode': kode, 'error': e.args[0]}
+        except Exception as e:
+            return 500, {'kode': kode, 'error': f"{type(e).__name__}: {e}"}
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parameter = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        bagian = [b for b in url.path.split('/') if b]
+        try:
+            riwayat = int(parameter.get('riwayat', 0))
+        except ValueError:
+            riwayat = -1
+        if riwayat < 0:
+            return self._kirim(400, {'error': 'riwayat harus bilangan bulat >= 0'})
+        riwayat = min(riwayat, MAKS_RIWAYAT)
+        periode = parameter.get('periode')
+        if periode is not None:
+            try:
+                mulai_periode(periode)
+            except ValueError as e:
+                return self._kirim(400, {'error': str(e), 'contoh_periode': ['5d', '6mo', '1y', 'ytd', 'max']})
+
+        if bagian == ['status']:
+            return self._kirim(200, self.layanan.statistik())
+        if bagian == ['metrics']:
+            data = METRIK.prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            return self.wfile.write(data)
+        if len(bagian) == 2 and bagian[0] == 'sinyal':
+            return self._kirim(*self._satu(bagian[1].upper().removesuffix('.JK'), periode, riwayat))
+        if bagian == ['sinyal'] and parameter.get('kode'):
+            daftar = [k.strip().upper().removesuffix('.JK') for k in parameter['kode'].split(',') if k.strip()]
+            return self._kirim(200, {kode: self._satu(kode, periode, riwayat)[1] for kode in daftar})
+        return self._kirim(404, {'error': f"Path tidak dikenal: {url.path}",
+                                 'path': ['/sinyal/<KODE>', '/sinyal?kode=A,B', '/status', '/metrics']})
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+def buat_server(layanan, host='127.0.0.1', port=8765, verbose=False):
+    """
+    Membuat ThreadingHTTPServer (satu thread per koneksi) untuk layanan sinyal
+    """
+    penangan = type('PenanganLayanan', (PenanganSinyal,), {'layanan': layanan})
+    server = ThreadingHTTPServer((host, port), penangan)
+    server.daemon_threads = True
+    server.verbose = verbose
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Layanan HTTP lokal untuk sinyal saham (JSON)")
+    parser.add_argument('--host', default='127.0.0.1', help='Alamat yang didengarkan (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port HTTP (default: 8765)')
+    parser.add_argument('--periode', default='6mo', help='Periode data default (default: 6mo)')
+    parser.add_argument('--ttl', type=float, default=60,
+                        help='Detik hasil dilayani dari memori sebelum data harga dicek ulang (default: 60)')
+    parser.add_argument('--maks-entri', type=int, default=1000, help='Jumlah hasil ticker di memori (default: 1000)')
+    parser.add_argument('--offline', action='store_true', help='Gunakan data dari cache lokal saja')
+    parser.add_argument('--tanpa-cache', action='store_true', help='Selalu unduh data tanpa cache lokal')
+    parser.add_argument('--direktori-cache', default=DIREKTORI_CACHE_DEFAULT)
+    parser.add_argument('--sumber-csv', metavar='DIREKTORI',
+                        help='Gunakan file CSV lokal (mis. ekspor analisis_*.csv) sebagai sumber data')
+    parser.add_argument('--aturan', help='File JSON aturan sinyal (default: aturan_sinyal.json)')
+    parser.add_argument('--verbose', action='store_true', help='Tampilkan log setiap permintaan')
+    parser.add_argument('--metrik-log', help='Tambahkan metrik setiap tahap ke file JSON Lines')
+    args = parser.parse_args()
+    METRIK.atur(path_log=args.metrik_log)
+
+    sumber = SumberCSV(args.sumber_csv) if args.sumber_csv else None
+    gunakan_cache = not args.tanpa_cache and sumber is None
+    # Cache OHLCV di-refresh mengikuti ttl layanan agar bar baru terlihat saat data dicek ulang
+    cache = CacheOHLCV(args.direktori_cache, offline=args.offline, ttl_segar=args.ttl) if gunakan_cache else None
+    aturan = AturanSinyal.dari_file(args.aturan) if args.aturan else None
+    layanan = LayananSinyal(cache=cache, sumber=sumber, aturan=aturan, periode=args.periode,
+                            ttl=args.ttl, maks_entri=args.maks_entri)
+
+    server = buat_server(layanan, args.host, args.port, verbose=args.verbose)
+    print(f"🚀 Layanan sinyal berjalan di http://{args.host}:{args.port} (Ctrl+C untuk berhenti)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        stat = layanan.statistik()
+        print(f"\nLayanan berhenti: {stat['hit'] + stat['valid']} hit, {stat['gabung']} digabung, "
+              f"{stat['hitung']} dihitung, {stat['gagal']} gagal")
+
+if __name__ == "__main__":
+    main()
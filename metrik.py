@@ -0,0 +1,290 @@
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+try:
+    import resource  # Tidak tersedia di Windows
+except ImportError:
+    resource = None
+
+# Interval minimum (detik) antar penulisan ulang file Prometheus
+INTERVAL_PROMETHEUS_DEFAULT = 15
+
+def maxrss():
+    """
+    Puncak resident set size proses saat ini (byte); None jika tidak dapat dibaca
+    """
+    if resource is None:
+        return None
+    puncak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan KB, macOS byte
+    return puncak if sys.platform == 'darwin' else puncak * 1024
+
+def jumlah_baris(hasil, *args, **kwargs):
+    """
+    Jumlah baris hasil tahap (len hasil), None jika hasil tidak memiliki panjang
+    """
+    try:
+        return len(hasil)
+    except TypeError:
+        return None
+
+def ada_hasil(hasil, *args, **kwargs):
+    """
+    1 jika tahap menghasilkan data (mis. payload fundamental), 0 jika kosong
+    """
+    return int(bool(hasil))
+
+def _escape_label(nilai):
+    return str(nilai).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class _Tahap:
+    """Context manager pengukuran satu tahap; baris dapat diisi di dalam blok (tahap.baris = n)"""
+
+    __slots__ = ('pencatat', 'nama', 'label', 'baris', 'mulai', 'rss_awal', 'memori_awal')
+
+    def __init__(self, pencatat, nama, label, baris):
+        self.pencatat = pencatat
+        self.nama = nama
+        self.label = label
+        self.baris = baris
+
+    def __enter__(self):
+        self.rss_awal = maxrss()
+        self.memori_awal = self.pencatat._masuk_memori()
+        self.mulai = time.perf_counter()
+        return self
+
+    def __exit__(self, tipe, nilai, jejak):
+        durasi = time.perf_counter() - self.mulai
+        puncak = self.pencatat._keluar_memori(self.memori_awal)
+        rss = maxrss()
+        self.pencatat.catat(self.nama, durasi, baris=self.baris, label=self.label, gagal=tipe is not None,
+                            puncak_memori=puncak, rss=rss,
+                            kenaikan_rss=rss - self.rss_awal if rss is not None else None)
+        return False
+
+class _TahapNonaktif:
+    """Context manager kosong saat pencatatan dimatikan"""
+
+    __slots__ = ('baris',)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipe, nilai, jejak):
+        return False
+
+class PencatatMetrik:
+    """Kelas pencatat waktu, jumlah baris dan puncak memori per tahap analisis (log JSON dan Prometheus)"""
+
+    def __init__(self, aktif=True, path_log=None, path_prometheus=None, ukur_alokasi=False,
+                 awalan='saham', interval_prometheus=INTERVAL_PROMETHEUS_DEFAULT):
+        """
+        path_log        : file JSON Lines, satu baris per tahap selesai (None = tidak ditulis)
+        path_prometheus : file teks format Prometheus (textfile collector), ditulis ulang paling
+                          sering setiap interval_prometheus detik dan saat program selesai
+        ukur_alokasi    : ukur puncak alokasi Python per tahap (lebih akurat tetapi memperlambat
+                          alokasi); tanpa ini hanya puncak RSS proses (ru_maxrss) yang dicatat
+        """
+        self._kunci = threading.Lock()
+        self._lokal = threading.local()
+        self._log = None
+        self._atexit = False
+        self.agregat = {}
+        self.atur(aktif=aktif, path_log=path_log, path_prometheus=path_prometheus, ukur_alokasi=ukur_alokasi,
+                  awalan=awalan, interval_prometheus=interval_prometheus)
+
+    def atur(self, aktif=True, path_log=None, path_prometheus=None, ukur_alokasi=False, awalan='saham',
+             interval_prometheus=INTERVAL_PROMETHEUS_DEFAULT):
+        """
+        Mengubah konfigurasi pencatat (dipakai CLI); agregat yang sudah ada tetap disimpan
+        """
+        with self._kunci:
+            if self._log is not None:
+                self._log.close()
+            self._log = open(path_log, 'a', encoding='utf-8', buffering=1) if path_log else None
+        self.aktif = aktif
+        self.path_prometheus = path_prometheus
+        self.awalan = awalan
+        self.interval_prometheus = interval_prometheus
+        self._terakhir_tulis = 0.0
+        self.ukur_alokasi = ukur_alokasi
+        if ukur_alokasi and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if (path_log or path_prometheus) and not self._atexit:
+            atexit.register(self.tutup)
+            self._atexit = True
+
+    def tahap(self, nama, baris=None, **label):
+        """
+        Context manager pengukuran satu tahap, mis. with METRIK.tahap('unduh', kode='BBCA') as t: ...
+        """
+        if not self.aktif:
+            return _TahapNonaktif()
+        return _Tahap(self, nama, label, baris)
+
+    def diukur(self, nama, baris=jumlah_baris, **label):
+        """
+        Decorator pengukuran fungsi; baris(hasil, *args, **kwargs) menghitung jumlah baris yang diproses
+        """
+        def dekorator(fungsi):
+            @functools.wraps(fungsi)
+            def pembungkus(*args, **kwargs):
+                if not self.aktif:
+                    return fungsi(*args, **kwargs)
+                with self.tahap(nama, **label) as tahap:
+                    hasil = fungsi(*args, **kwargs)
+                    tahap.baris = baris(hasil, *args, **kwargs)
+                return hasil
+            return pembungkus
+        return dekorator
+
+    def _masuk_memori(self):
+        # Puncak tracemalloc bersifat global: tahap bersarang menyimpan puncak induk sebelum reset
+        if not self.ukur_alokasi or not tracemalloc.is_tracing():
+            return None
+        sekarang, puncak = tracemalloc.get_traced_memory()
+        tumpukan = self._lokal.__dict__.setdefault('tumpukan', [])
+        if tumpukan:
+            tumpukan[-1] = max(tumpukan[-1], puncak)
+        tracemalloc.reset_peak()
+        tumpukan.append(sekarang)
+        return sekarang
+
+    def _keluar_memori(self, awal):
+        if awal is None or not tracemalloc.is_tracing():
+            return None
+        _, puncak = tracemalloc.get_traced_memory()
+        tumpukan = self._lokal.tumpukan
+        puncak_tahap = max(tumpukan.pop(), puncak)
+        if tumpukan:
+            tumpukan[-1] = max(tumpukan[-1], puncak)
+        return puncak_tahap - awal
+
+    def catat(self, nama, durasi, baris=None, label=None, gagal=False, puncak_memori=None, rss=None,
+              kenaikan_rss=None):
+        """
+        Menambahkan satu pengukuran ke agregat dan menulis baris log JSON (jika diaktifkan)
+        """
+        label = label or {}
+        kunci = (nama, tuple(sorted(label.items())))
+        with self._kunci:
+            agregat = self.agregat.get(kunci)
+            if agregat is None:
+                agregat = self.agregat[kunci] = {'jumlah': 0, 'gagal': 0, 'detik': 0.0, 'detik_maks': 0.0,
+                                                 'baris': 0, 'puncak_memori': 0}
+            agregat['jumlah'] += 1
+            agregat['gagal'] += gagal
+            agregat['detik'] += durasi
+            agregat['detik_maks'] = max(agregat['detik_maks'], durasi)
+            agregat['baris'] += baris or 0
+            if puncak_memori is not None:
+                agregat['puncak_memori'] = max(agregat['puncak_memori'], puncak_memori)
+            if self._log is not None:
+                catatan = {'waktu': datetime.now().isoformat(timespec='milliseconds'), 'tahap': nama, **label,
+                           'durasi_s': round(durasi, 6), 'baris': baris, 'gagal': gagal,
+                           'maxrss_byte': rss, 'kenaikan_maxrss_byte': kenaikan_rss}
+                if puncak_memori is not None:
+                    catatan['puncak_memori_byte'] = puncak_memori
+                self._log.write(json.dumps(catatan, default=str) + '\n')
+        if self.path_prometheus and time.monotonic() - self._terakhir_tulis >= self.interval_prometheus:
+            self.tulis_prometheus()
+
+    def prometheus(self):
+        """
+        Agregat dalam format teks eksposisi Prometheus
+        """
+        with self._kunci:
+            agregat = sorted(self.agregat.items())
+        a = self.awalan
+        metrik = [
+            ('tahap_detik_total', 'counter', 'Total durasi tahap (detik)', 'detik'),
+            ('tahap_jumlah_total', 'counter', 'Jumlah eksekusi tahap', 'jumlah'),
+            ('tahap_gagal_total', 'counter', 'Jumlah eksekusi tahap yang berakhir dengan exception', 'gagal'),
+            ('tahap_baris_total', 'counter', 'Jumlah baris yang diproses tahap', 'baris'),
+            ('tahap_detik_maks', 'gauge', 'Durasi eksekusi tahap terlama (detik)', 'detik_maks'),
+        ]
+        if self.ukur_alokasi:
+            metrik.append(('tahap_memori_puncak_byte', 'gauge', 'Puncak alokasi Python per tahap (tracemalloc)',
+                           'puncak_memori'))
+        baris = []
+        for nama, tipe, bantuan, kunci in metrik:
+            baris.append(f'# HELP {a}_{nama} {bantuan}')
+            baris.append(f'# TYPE {a}_{nama} {tipe}')
+            for (tahap, label), nilai in agregat:
+                teks_label = ','.join(f'{k}="{_escape_label(v)}"' for k, v in (('tahap', tahap),) + label)
+                baris.append(f'{a}_{nama}{{{teks_label}}} {nilai[kunci]!r}')
+        rss = maxrss()
+        if rss is not None:
+            baris.append(f'# HELP {a}_proses_maxrss_byte Puncak resident set size proses')
+            baris.append(f'# TYPE {a}_proses_maxrss_byte gauge')
+            baris.append(f'{a}_proses_maxrss_byte {rss}')
+        return '\n'.join(baris) + '\n'
+
+    def tulis_prometheus(self, path=None):
+        """
+        Menulis file Prometheus secara atomik (file sementara lalu os.replace)
+        """
+        path = path or self.path_prometheus
+        if not path:
+            return
+        self._terakhir_tulis = time.monotonic()
+        sementara = f'{path}.{os.getpid()}.tmp'
+        with open(sementara, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus())
+        os.replace(sementara, path)
+
+    def ringkasan(self):
+        """
+        Daftar dict per tahap diurutkan dari total durasi terbesar
+        """
+        with self._kunci:
+            agregat = list(self.agregat.items())
+        hasil = [{'tahap': nama, 'label': dict(label), **nilai} for (nama, label), nilai in agregat]
+        return sorted(hasil, key=lambda x: -x['detik'])
+
+    def tampilkan(self, teratas=15):
+        """
+        Menampilkan tabel tahap terlama
+        """
+        ringkasan = self.ringkasan()
+        if not ringkasan:
+            return
+        print(f"\n⏱️  Metrik tahap (total {sum(r['jumlah'] for r in ringkasan)} eksekusi)")
+        print(f"{'Tahap':<32} | {'Jumlah':>6} | {'Total (s)':>9} | {'Maks (ms)':>9} | {'Baris':>10}")
+        print('-' * 79)
+        for r in ringkasan[:teratas]:
+            nama = r['tahap'] + ''.join(f'.{v}' for v in r['label'].values())
+            print(f"{nama:<32} | {r['jumlah']:>6} | {r['detik']:>9.3f} | {r['detik_maks'] * 1000:>9.1f} | "
+                  f"{r['baris']:>10,}")
+        rss = maxrss()
+        if rss is not None:
+            print(f"Puncak RSS proses: {rss / 1024**2:.1f} MB")
+
+    def reset(self):
+        """
+        Menghapus semua agregat
+        """
+        with self._kunci:
+            self.agregat.clear()
+
+    def tutup(self):
+        """
+        Menulis file Prometheus terakhir dan menutup file log
+        """
+        if self.path_prometheus:
+            self.tulis_prometheus()
+        with self._kunci:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+# Pencatat global; selalu aktif (agregat di memori), file log/Prometheus diaktifkan lewat atur()
+METRIK = PencatatMetrik()
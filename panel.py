@@ -0,0 +1,380 @@
+"""
+Mode panel: indikator dan Skor_Sinyal untuk banyak ticker sekaligus dari array OHLCV 2 dimensi
+(baris = tanggal, kolom = ticker). Setiap indikator dihitung satu kali untuk seluruh panel, bukan
+satu kali per ticker, dengan hasil yang sama dengan PipelineIndikator per ticker.
+
+Riwayat yang tidak sama panjang (ticker baru melantai, suspensi, delisting) ditandai NaN pada
+kalender gabungan. Sebelum dihitung, bar setiap ticker dipadatkan ke bagian bawah kolomnya sehingga
+baris NaN hanya ada di atas riwayatnya; kernel rolling/EWM pandas memperlakukan NaN di awal persis
+seperti riwayat yang memang belum dimulai. Hasil dikembalikan lagi ke posisi kalender asalnya.
+"""
+import numpy as np
+import pandas as pd
+
+from saham import ATURAN_SINYAL, NILAI_DEFAULT_INDIKATOR, GrafIndikator, JendelaRolling, KonteksIndikator
+
+# Kolom masukan panel (Dividends/Stock Splits tidak dipakai indikator)
+KOLOM_PANEL = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+class Panel:
+    """Kelas panel OHLCV/indikator: dict kolom -> array (tanggal x ticker) pada satu kalender"""
+
+    def __init__(self, indeks, kode, nilai, ada=None):
+        """
+        indeks : DatetimeIndex kalender gabungan (baris)
+        kode   : list kode saham (kolom)
+        nilai  : dict nama kolom -> array 2 dimensi (len(indeks), len(kode)), NaN jika tidak ada bar
+        ada    : mask bar yang tersedia; default dari Close yang bukan NaN
+        """
+        self.indeks = indeks
+        self.kode = list(kode)
+        self.nilai = nilai
+        self.ada = ada if ada is not None else ~np.isnan(nilai['Close'])
+
+    @classmethod
+    def dari_frame(cls, data, kolom=KOLOM_PANEL):
+        """
+        Menyusun panel dari dict kode -> DataFrame OHLCV per ticker (tanggal disejajarkan)
+        """
+        data = {kode: df for kode, df in data.items() if df is not None and not df.empty}
+        semua = [df.index for df in data.values()]
+        indeks = semua[0].append(semua[1:]).unique().sort_values() if semua else pd.DatetimeIndex([])
+        posisi = {kode: indeks.get_indexer(df.index) for kode, df in data.items()}
+        nilai = {}
+        for nama in kolom:
+            isi = np.full((len(indeks), len(data)), np.nan, order='F')
+            for j, (kode, df) in enumerate(data.items()):
+                isi[posisi[kode], j] = df[nama].to_numpy(dtype=np.float64)
+            nilai[nama] = isi
+        return cls(indeks, data.keys(), nilai)
+
+    def __getitem__(self, nama):
+        return self.nilai[nama]
+
+    def __contains__(self, nama):
+        return nama in self.nilai
+
+    def __len__(self):
+        return len(self.indeks)
+
+    @property
+    def columns(self):
+        return list(self.nilai)
+
+    def kolom(self, nama):
+        """
+        Satu kolom sebagai DataFrame lebar (tanggal x kode saham)
+        """
+        return pd.DataFrame(self.nilai[nama], index=self.indeks, columns=self.kode, copy=False)
+
+    def frame(self, kode):
+        """
+        Semua kolom satu ticker sebagai DataFrame, hanya pada tanggal ticker tersebut punya bar
+        """
+        j = self.kode.index(kode)
+        baris = self.ada[:, j]
+        return pd.DataFrame({nama: isi[baris, j] for nama, isi in self.nilai.items()}, index=self.indeks[baris])
+
+    def terakhir(self, kolom=None):
+        """
+        Nilai bar terakhir yang tersedia untuk setiap ticker (index = kode saham)
+        """
+        kolom = kolom if kolom is not None else self.columns
+        punya = self.ada.any(axis=0)
+        baris = len(self.indeks) - 1 - np.argmax(self.ada[::-1], axis=0)
+        j = np.arange(len(self.kode))
+        hasil = pd.DataFrame({'Tanggal': self.indeks[baris]}, index=pd.Index(self.kode, name='Kode'))
+        for nama in kolom:
+            hasil[nama] = self.nilai[nama][baris, j]
+        return hasil[punya]
+
+def _padatkan(panel):
+    """
+    Mengembalikan (urutan, kebalikan): permutasi baris per kolom yang memindahkan bar setiap ticker
+    ke bawah kolom (urutan tetap) dan baris tanpa bar ke atas, beserta permutasi kebalikannya
+    """
+    urutan = np.argsort(panel.ada, axis=0, kind='stable')
+    return urutan, np.argsort(urutan, axis=0, kind='stable')
+
+def _susun(isi, urutan):
+    return np.asfortranarray(np.take_along_axis(isi, urutan, axis=0))
+
+def _geser(nilai, periode=1):
+    """
+    Setara Series.shift per kolom
+    """
+    hasil = np.full(nilai.shape, np.nan, order='F')
+    hasil[periode:] = nilai[:len(nilai) - periode]
+    return hasil
+
+def _kosongkan(nilai, kosong):
+    """
+    Mengembalikan baris tanpa bar menjadi NaN (setelah np.where/cumsum mengisinya)
+    """
+    nilai[kosong] = np.nan
+    return nilai
+
+def _bergulir(nilai, period):
+    return pd.DataFrame(nilai, copy=False).rolling(window=period)
+
+def _ewm(nilai, span):
+    return pd.DataFrame(nilai, copy=False).ewm(span=span, adjust=False).mean().to_numpy()
+
+def _mad(nilai, period):
+    """
+    MAD bergulir per kolom memakai strided view seperti JendelaRolling.mad_strided
+    """
+    hasil = np.full(nilai.shape, np.nan, order='F')
+    if len(nilai) < period:
+        return hasil
+    # Transpos (ticker x tanggal) agar setiap jendela bersebelahan di memori, sama seperti versi 1 dimensi
+    jendela = np.lib.stride_tricks.sliding_window_view(nilai.T, period, axis=1)
+    ukuran_blok = max(1, JendelaRolling.UKURAN_BLOK_MAD // nilai.shape[1])
+    for awal in range(0, jendela.shape[1], ukuran_blok):
+        blok = jendela[:, awal:awal + ukuran_blok]
+        rata = blok.mean(axis=2, keepdims=True)
+        hasil[awal + period - 1:awal + period - 1 + blok.shape[1]] = np.abs(blok - rata).mean(axis=2).T
+    return hasil
+
+class KonteksPanel(KonteksIndikator):
+    """Kelas memo indikator untuk panel yang sudah dipadatkan (baris tanpa bar di atas setiap kolom)"""
+
+    def __init__(self, graf, nilai, kosong):
+        self.graf = graf
+        self.df = nilai  # dict kolom masukan -> array terpadatkan
+        self.kosong = kosong
+        self.nilai = {}
+
+    def __getitem__(self, nama):
+        if nama not in self.graf:
+            return self.df[nama]
+        if nama not in self.nilai:
+            self.hitung([nama])
+        return self.nilai[nama]
+
+    def hitung(self, kolom):
+        for _ in self.alirkan(kolom):
+            pass
+        return {nama: self[nama] for nama in kolom}
+
+def _volume_rata(k):
+    volume = k['Volume']
+    volume_shift = _geser(volume, 10)
+    return {
+        'VMA_20': _bergulir(volume, 20).mean().to_numpy(),
+        'VROC_10': np.where(volume_shift != 0, ((volume - volume_shift) / volume_shift) * 100, 0),
+    }
+
+def _obv(k):
+    close, volume = k['Close'], k['Volume']
+    arah = np.zeros(close.shape, order='F')
+    naik = close[1:] > close[:-1]
+    turun = close[1:] < close[:-1]
+    arah[1:] = np.where(naik, volume[1:], np.where(turun, -volume[1:], 0))
+    return {'OBV': _kosongkan(np.cumsum(arah, axis=0), k.kosong)}
+
+def _vpt(k):
+    close, volume = k['Close'], k['Volume']
+    perubahan = np.zeros(close.shape, order='F')
+    perubahan[1:] = volume[1:] * ((close[1:] - close[:-1]) / close[:-1])
+    # Bar pertama setiap ticker (dan baris kosong di atasnya) tidak punya perubahan harga
+    perubahan[_geser(k.kosong.astype(float), 1) != 0] = 0
+    perubahan[k.kosong] = 0
+    return {'VPT': _kosongkan(np.cumsum(perubahan, axis=0), k.kosong)}
+
+def _macd(k, signal=9):
+    macd = k['EMA_12'] - k['EMA_26']
+    macd_signal = _ewm(macd, signal)
+    return {'MACD': macd, 'MACD_Signal': macd_signal, 'MACD_Histogram': macd - macd_signal}
+
+def _rsi(k, period=14):
+    close = k['Close']
+    delta = close - _geser(close)
+    # Baris kosong tetap NaN agar jendela rolling tidak terisi sebelum riwayat ticker dimulai
+    gain = _kosongkan(np.where(delta > 0, delta, 0), k.kosong)
+    loss = _kosongkan(-np.where(delta < 0, delta, 0), k.kosong)
+    gain = _bergulir(gain, period).mean().to_numpy()
+    loss = _bergulir(loss, period).mean().to_numpy()
+    rs = np.where(loss != 0, gain / loss, 0)
+    return {'RSI': np.where(rs != 0, 100 - (100 / (1 + rs)), 50)}
+
+def _bollinger(k, period=20, std_dev=2):
+    bergulir = _bergulir(k['Close'], period)
+    bb_middle = bergulir.mean().to_numpy()
+    bb_std = bergulir.std().to_numpy()
+    return {
+        'BB_Middle': bb_middle,
+        'BB_Upper': bb_middle + (bb_std * std_dev),
+        'BB_Lower': bb_middle - (bb_std * std_dev),
+    }
+
+def _bollinger_posisi(k):
+    close, bb_upper, bb_lower = k['Close'], k['BB_Upper'], k['BB_Lower']
+    bb_range = bb_upper - bb_lower
+    return {
+        'BB_Width': bb_upper - bb_lower,
+        'BB_Position': np.where(bb_range != 0, (close - bb_lower) / bb_range, 0.5),
+    }
+
+def _rentang_high_low(k, period=14):
+    """
+    High max dan Low min bergulir, dihitung sekali untuk Stochastic dan Williams %R
+    """
+    if ('rentang', period) not in k.nilai:
+        k.nilai[('rentang', period)] = (_bergulir(k['High'], period).max().to_numpy(),
+                                        _bergulir(k['Low'], period).min().to_numpy())
+    return k.nilai[('rentang', period)]
+
+def _stochastic(k, k_period=14, d_period=3):
+    close = k['Close']
+    high_max, low_min = _rentang_high_low(k, k_period)
+    stoch_range = high_max - low_min
+    persen_k = np.where(stoch_range != 0, 100 * ((close - low_min) / stoch_range), 50)
+    return {'%K': persen_k, '%D': _bergulir(persen_k, d_period).mean().to_numpy()}
+
+def _directional_movement(k):
+    high, low, close = k['High'], k['Low'], k['Close']
+    high_1, low_1, close_1 = _geser(high), _geser(low), _geser(close)
+    tr = np.maximum(high - low, np.maximum(abs(high - close_1), abs(low - close_1)))
+    plus_dm = np.where((high - high_1) > (low_1 - low), np.maximum(high - high_1, 0), 0)
+    minus_dm = np.where((low_1 - low) > (high - high_1), np.maximum(low_1 - low, 0), 0)
+    return {'TR': tr, '+DM': _kosongkan(plus_dm, k.kosong), '-DM': _kosongkan(minus_dm, k.kosong)}
+
+def _directional_indicator(k, period=14):
+    tr_smooth = _bergulir(k['TR'], period).sum().to_numpy()
+    plus_dm_smooth = _bergulir(k['+DM'], period).sum().to_numpy()
+    minus_dm_smooth = _bergulir(k['-DM'], period).sum().to_numpy()
+    return {
+        'TR_Smooth': tr_smooth, '+DM_Smooth': plus_dm_smooth, '-DM_Smooth': minus_dm_smooth,
+        '+DI': np.where(tr_smooth != 0, 100 * (plus_dm_smooth / tr_smooth), 0),
+        '-DI': np.where(tr_smooth != 0, 100 * (minus_dm_smooth / tr_smooth), 0),
+    }
+
+def _adx(k, period=14):
+    plus_di, minus_di = k['+DI'], k['-DI']
+    di_sum = plus_di + minus_di
+    dx = np.where(di_sum != 0, 100 * abs(plus_di - minus_di) / di_sum, 0)
+    return {'DX': dx, 'ADX': _bergulir(dx, period).mean().to_numpy()}
+
+def _williams_r(k, period=14):
+    high_max, low_min = _rentang_high_low(k, period)
+    wr_range = high_max - low_min
+    return {'Williams_R': np.where(wr_range != 0, -100 * ((high_max - k['Close']) / wr_range), -50)}
+
+def _cci(k, period=20):
+    typical_price = (k['High'] + k['Low'] + k['Close']) / 3
+    sma_tp = _bergulir(typical_price, period).mean().to_numpy()
+    mad = _mad(typical_price, period)
+    return {'CCI': np.where(mad != 0, (typical_price - sma_tp) / (0.015 * mad), 0)}
+
+def _atr(k, period=14):
+    high, low, close_1 = k['High'], k['Low'], _geser(k['Close'])
+    # Setara DataFrame.max(axis=1): NaN diabaikan, sehingga bar pertama memakai High - Low
+    true_range = np.fmax(np.fmax(high - low, np.abs(high - close_1)), np.abs(low - close_1))
+    return {'ATR': _bergulir(true_range, period).mean().to_numpy()}
+
+# Simpul panel: nama, keluaran, dependensi dan kolom perantara sama dengan SIMPUL_INDIKATOR
+SIMPUL_PANEL = [
+    ('volume_rata', ['VMA_20', 'VROC_10'], ['Volume'], _volume_rata),
+    ('obv', ['OBV'], ['Close', 'Volume'], _obv),
+    ('vpt', ['VPT'], ['Close', 'Volume'], _vpt),
+    ('macd', ['MACD', 'MACD_Signal', 'MACD_Histogram'], ['EMA_12', 'EMA_26'], _macd),
+    ('rsi', ['RSI'], ['Close'], _rsi),
+    *[(f'sma_{period}', [f'SMA_{period}'], ['Close'],
+       lambda k, period=period: {f'SMA_{period}': _bergulir(k['Close'], period).mean().to_numpy()})
+      for period in (20, 50, 200)],
+    *[(f'ema_{span}', [f'EMA_{span}'], ['Close'],
+       lambda k, span=span: {f'EMA_{span}': _ewm(k['Close'], span)})
+      for span in (12, 26)],
+    ('bollinger', ['BB_Middle', 'BB_Upper', 'BB_Lower'], ['Close'], _bollinger),
+    ('bollinger_posisi', ['BB_Width', 'BB_Position'], ['Close', 'BB_Upper', 'BB_Lower'], _bollinger_posisi),
+    ('stochastic', ['%K', '%D'], ['High', 'Low', 'Close'], _stochastic),
+    ('directional_movement', ['TR', '+DM', '-DM'], ['High', 'Low', 'Close'], _directional_movement,
+     ['TR', '+DM', '-DM']),
+    ('directional_indicator', ['TR_Smooth', '+DM_Smooth', '-DM_Smooth', '+DI', '-DI'], ['TR', '+DM', '-DM'],
+     _directional_indicator, ['TR_Smooth', '+DM_Smooth', '-DM_Smooth']),
+    ('adx', ['DX', 'ADX'], ['+DI', '-DI'], _adx, ['DX']),
+    ('williams_r', ['Williams_R'], ['High', 'Low', 'Close'], _williams_r),
+    ('cci', ['CCI'], ['High', 'Low', 'Close'], _cci),
+    ('atr', ['ATR'], ['High', 'Low', 'Close'], _atr),
+]
+
+GRAF_PANEL = GrafIndikator(SIMPUL_PANEL)
+
+class PipelinePanel:
+    """Kelas pipeline indikator dan sinyal untuk seluruh panel dalam satu kali jalan"""
+
+    def __init__(self, perantara=False, aturan=None, kolom=None):
+        """
+        perantara : simpan kolom perantara (TR, +DM, ..., DX) di hasil
+        aturan    : AturanSinyal untuk kolom Sinyal/Kode_Alasan/Skor_Sinyal
+        kolom     : kolom indikator yang diminta; None berarti semua kolom di graf. Kolom yang hanya
+                    dibutuhkan aturan sinyal dihitung tetapi tidak disimpan.
+        """
+        self.perantara = perantara
+        self.aturan = aturan if aturan is not None else ATURAN_SINYAL
+        self.kolom = None if kolom is None else set(kolom)
+
+    def kolom_keluaran(self):
+        """
+        Daftar kolom indikator yang disimpan, sesuai urutan graf
+        """
+        if self.kolom is not None:
+            return [nama for nama in GRAF_PANEL.kolom() if nama in self.kolom]
+        lewati = set() if self.perantara else GRAF_PANEL.perantara()
+        return [nama for nama in GRAF_PANEL.kolom() if nama not in lewati]
+
+    def jalankan(self, panel, sinyal=True):
+        """
+        Menghitung indikator (dan sinyal) untuk semua ticker di panel. Hasilnya Panel baru dengan
+        kolom masukan, indikator dan (jika sinyal=True) Sinyal, Kode_Alasan dan Skor_Sinyal; nilai
+        setiap ticker sama dengan PipelineIndikator().jalankan() pada frame ticker tersebut.
+        """
+        kolom = self.kolom_keluaran()
+        kolom_aturan = set(self.aturan.kolom) if sinyal else set()
+        diminta = kolom + [nama for nama in kolom_aturan if nama in GRAF_PANEL and nama not in kolom]
+
+        urutan, kebalikan = _padatkan(panel)
+        kosong = _susun(~panel.ada, urutan)
+        masukan = {}
+        for nama in panel.columns:
+            masukan[nama] = _susun(panel[nama], urutan)
+            masukan[nama][kosong] = np.nan
+        konteks = KonteksPanel(GRAF_PANEL, masukan, kosong)
+
+        hasil = dict.fromkeys(kolom)
+        nilai_aturan = {nama: masukan[nama] for nama in kolom_aturan if nama in masukan}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for nilai in konteks.alirkan(diminta, simpan=False):
+                for nama, isi in nilai.items():
+                    if nama in kolom_aturan:
+                        nilai_aturan[nama] = isi
+                    if nama in hasil:
+                        hasil[nama] = isi
+                del nilai
+
+            if sinyal:
+                kurang = [nama for nama in self.aturan.kolom if nama not in nilai_aturan]
+                if kurang:
+                    raise ValueError(f"Kolom untuk aturan sinyal tidak tersedia: {', '.join(kurang)}")
+                kode_alasan, skor_sinyal = self.aturan.evaluasi(nilai_aturan)
+                del nilai_aturan
+        for nama, default in NILAI_DEFAULT_INDIKATOR.items():
+            if nama in hasil:
+                hasil[nama] = np.where(np.isnan(hasil[nama]) & ~kosong, default, hasil[nama])
+
+        # Kembalikan ke posisi kalender; baris tanpa bar tetap NaN (Skor 0, Sinyal None)
+        data = dict(panel.nilai)
+        for nama, isi in hasil.items():
+            data[nama] = _susun(isi, kebalikan)
+        if sinyal:
+            skor_sinyal = _susun(skor_sinyal, kebalikan)
+            skor_sinyal[~panel.ada] = 0
+            kode_alasan = _susun(kode_alasan, kebalikan)
+            kode_alasan[~panel.ada] = 0
+            label = self.aturan.sinyal(skor_sinyal)
+            label[~panel.ada] = None
+            data['Sinyal'] = label
+            data['Kode_Alasan'] = kode_alasan
+            data['Skor_Sinyal'] = skor_sinyal
+        return Panel(panel.indeks, panel.kode, data, ada=panel.ada)
@@ -0,0 +1,327 @@
+"""
+Pemantau watchlist berbasis event: aliran bar (langsung dari sumber data atau diputar ulang dari
+file rekaman) diproses satu per satu dengan MesinIndikatorInkremental per ticker, dan hanya
+perubahan Sinyal menjadi Beli/Jual yang dikirim sebagai alert. Di akhir dilaporkan jumlah event
+per detik dan latensi per event.
+
+Contoh:
+    python pantau.py --daftar watchlist.txt --sumber-csv rekaman/ --mulai 2025-06-01 --kecepatan 86400
+    python pantau.py --rekaman event.csv --pemanasan 200 --simpan alert.jsonl
+    python pantau.py BBCA TLKM --langsung --interval 60 --rekam event.csv
+"""
+import argparse
+import copy
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import scanner
+from aturan_sinyal import AturanSinyal
+from cache_data import CacheOHLCV, DIREKTORI_CACHE_DEFAULT
+from inkremental import MesinIndikatorInkremental
+from saham import SAHAM_POPULER, decode_alasan
+from sumber_data import SumberCSV, SumberYFinance
+
+KOLOM_BAR = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Jumlah bar awal per ticker yang hanya mengisi state indikator (tanpa alert)
+PEMANASAN_DEFAULT = 200
+
+class MesinPantau:
+    """Kelas state indikator per ticker yang memproses event bar dan mendeteksi perubahan sinyal"""
+
+    def __init__(self, aturan=None, revisi=False):
+        """
+        revisi : bar dengan waktu yang sama dengan bar terakhir ticker dianggap revisi bar berjalan
+                 (mode langsung); state sebelum bar tersebut disimpan agar dapat dihitung ulang
+        """
+        self.aturan = aturan
+        self.revisi = revisi
+        self.mesin = {}
+        self.sinyal = {}
+        self.waktu = {}
+        self._sebelum = {}
+
+    def _salin(self, mesin):
+        # Aturan terkompilasi dipakai bersama, tidak ikut disalin
+        return copy.deepcopy(mesin, {id(mesin.aturan): mesin.aturan})
+
+    def panaskan(self, kode, df):
+        """
+        Mengisi state ticker dari data historis tanpa menghasilkan alert
+        """
+        if df.empty:
+            return
+        bar = df[KOLOM_BAR].to_dict('records')
+        mesin = MesinIndikatorInkremental(aturan=self.aturan)
+        for baris in bar[:-1]:
+            mesin.update(baris)
+        if self.revisi:
+            self._sebelum[kode] = self._salin(mesin)
+        self.sinyal[kode] = mesin.update(bar[-1])['Sinyal']
+        self.mesin[kode] = mesin
+        self.waktu[kode] = df.index[-1]
+
+    def proses(self, waktu, kode, bar):
+        """
+        Memproses satu event bar. Mengembalikan dict alert jika Sinyal berubah menjadi Beli/Jual,
+        None jika tidak; bar yang lebih lama dari bar terakhir ticker diabaikan.
+        """
+        mesin = self.mesin.get(kode)
+        if mesin is None:
+            mesin = self.mesin[kode] = MesinIndikatorInkremental(aturan=self.aturan)
+        terakhir = self.waktu.get(kode)
+        if terakhir is not None and waktu < terakhir:
+            return None
+        if terakhir is not None and waktu == terakhir:
+            if not self.revisi or kode not in self._sebelum:
+                return None
+            # Revisi bar berjalan: hitung ulang dari state sebelum bar tersebut
+            mesin = self.mesin[kode] = self._salin(self._sebelum[kode])
+        elif self.revisi:
+            self._sebelum[kode] = self._salin(mesin)
+
+        baris = mesin.update(bar)
+        self.waktu[kode] = waktu
+        lama = self.sinyal.get(kode, 'Tahan')
+        baru = self.sinyal[kode] = baris['Sinyal']
+        if baru == lama or baru == 'Tahan':
+            return None
+        return {
+            'waktu': waktu.isoformat(),
+            'kode': kode,
+            'dari': lama,
+            'sinyal': baru,
+            'skor_sinyal': baris['Skor_Sinyal'],
+            'close': float(baris['Close']),
+            'alasan': decode_alasan(baris['Kode_Alasan'], self.aturan),
+        }
+
+def baca_rekaman(path):
+    """
+    Membaca file rekaman event (CSV: Date, Kode, Open, High, Low, Close, Volume) menjadi
+    dict kode -> DataFrame OHLCV. Rekaman mode langsung berisi setiap revisi bar berjalan;
+    hanya versi terakhir per (Kode, Date) yang dipakai.
+    """
+    df = pd.read_csv(path)
+    df['Date'] = pd.to_datetime(df['Date'], utc=True).dt.tz_convert('Asia/Jakarta')
+    hasil = {}
+    for kode, bagian in df.groupby('Kode', sort=False):
+        bagian = bagian.set_index('Date')[KOLOM_BAR].sort_index(kind='stable')
+        hasil[kode] = bagian[~bagian.index.duplicated(keep='last')]
+    return hasil
+
+def pisah_pemanasan(data, mulai=None, pemanasan=PEMANASAN_DEFAULT):
+    """
+    Memisahkan data setiap ticker menjadi bagian pemanasan dan bagian yang diputar sebagai event:
+    sebelum tanggal `mulai`, atau `pemanasan` bar pertama jika tanggal tidak diberikan
+    """
+    awal, aliran = {}, {}
+    for kode, df in data.items():
+        if mulai is not None:
+            batas = pd.Timestamp(mulai)
+            if df.index.tz is not None and batas.tzinfo is None:
+                batas = batas.tz_localize(df.index.tz)
+            potong = int(df.index.searchsorted(batas))
+        else:
+            potong = min(pemanasan, len(df))
+        awal[kode] = df.iloc[:potong]
+        aliran[kode] = df.iloc[potong:]
+    return awal, aliran
+
+def putar_ulang(aliran, kecepatan=0):
+    """
+    Generator event (waktu tiba, waktu bar, kode, bar) dari data rekaman, urut waktu bar lalu kode.
+    kecepatan = detik waktu pasar per detik nyata (mis. 86400: satu hari per detik); 0 berarti
+    secepat mungkin.
+    """
+    bagian = [df[KOLOM_BAR].assign(Kode=kode) for kode, df in aliran.items() if not df.empty]
+    if not bagian:
+        return
+    semua = pd.concat(bagian).rename_axis('Date').reset_index()
+    semua = semua.sort_values(['Date', 'Kode'], kind='stable')
+    awal_nyata = awal_pasar = None
+    for waktu, kode, o, h, l, c, v in semua[['Date', 'Kode'] + KOLOM_BAR].itertuples(index=False):
+        tiba = time.perf_counter()
+        if kecepatan:
+            if awal_nyata is None:
+                awal_nyata, awal_pasar = tiba, waktu
+            # Latensi diukur dari jadwal tiba event, bukan dari saat event diambil
+            tiba = awal_nyata + (waktu - awal_pasar).total_seconds() / kecepatan
+            jeda = tiba - time.perf_counter()
+            if jeda > 0:
+                time.sleep(jeda)
+        yield tiba, waktu, kode, {'Open': o, 'High': h, 'Low': l, 'Close': c, 'Volume': v}
+
+def aliran_langsung(sumber, daftar_kode, terakhir, interval=60, berhenti=None):
+    """
+    Generator event dari sumber data: setiap `interval` detik bar sejak bar terakhir yang diketahui
+    diambil untuk semua ticker sekaligus. Bar hari berjalan dikirim ulang selama masih berubah.
+    """
+    berhenti = berhenti if berhenti is not None else threading.Event()
+    dikirim = {}
+    while not berhenti.is_set():
+        mulai = min(terakhir.values()) if terakhir else None
+        data = sumber.riwayat_banyak([kode + '.JK' for kode in daftar_kode], mulai=mulai)
+        tiba = time.perf_counter()
+        event = []
+        for ticker, df in data.items():
+            kode = ticker[:-3]
+            for waktu, baris in zip(df.index, df[KOLOM_BAR].itertuples(index=False)):
+                bar = dict(zip(KOLOM_BAR, baris))
+                if waktu < terakhir.get(kode, waktu) or dikirim.get((kode, waktu)) == bar:
+                    continue
+                dikirim[(kode, waktu)] = bar
+                terakhir[kode] = waktu
+                event.append((waktu, kode, bar))
+        for waktu, kode, bar in sorted(event, key=lambda e: (e[0], e[1])):
+            yield tiba, waktu, kode, bar
+        berhenti.wait(interval)
+
+def jalankan(mesin, event, tampilkan=True, simpan=None, rekam=None):
+    """
+    Memproses aliran event dan mengembalikan (daftar alert, statistik kinerja)
+    """
+    alert = []
+    latensi = []
+    waktu_proses = 0.0
+    mulai = time.perf_counter()
+    berkas_alert = open(simpan, 'a', encoding='utf-8') if simpan else None
+    berkas_rekam = None
+    if rekam:
+        baru = not os.path.exists(rekam)
+        berkas_rekam = open(rekam, 'a', encoding='utf-8')
+        if baru:
+            berkas_rekam.write('Date,Kode,' + ','.join(KOLOM_BAR) + '\n')
+    try:
+        for tiba, waktu, kode, bar in event:
+            awal = time.perf_counter()
+            hasil = mesin.proses(waktu, kode, bar)
+            selesai = time.perf_counter()
+            waktu_proses += selesai - awal
+            latensi.append(selesai - tiba)
+            if berkas_rekam:
+                berkas_rekam.write(f"{waktu.isoformat()},{kode}," + ','.join(str(bar[k]) for k in KOLOM_BAR) + '\n')
+            if hasil is None:
+                continue
+            alert.append(hasil)
+            if tampilkan:
+                ikon = '🟢' if hasil['sinyal'] == 'Beli' else '🔴'
+                print(f"{ikon} {hasil['waktu'][:10]} {kode:6s} {hasil['dari']} -> {hasil['sinyal']} "
+                      f"(skor {hasil['skor_sinyal']}, close {hasil['close']:,.0f}) {hasil['alasan']}")
+            if berkas_alert:
+                berkas_alert.write(json.dumps(hasil, ensure_ascii=False) + '\n')
+                berkas_alert.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for berkas in (berkas_alert, berkas_rekam):
+            if berkas:
+                berkas.close()
+
+    durasi = time.perf_counter() - mulai
+    latensi_us = np.array(latensi) * 1e6
+    statistik = {
+        'event': len(latensi),
+        'alert': len(alert),
+        'ticker': len(mesin.mesin),
+        'durasi': durasi,
+        'waktu_proses': waktu_proses,
+        'event_per_detik': len(latensi) / waktu_proses if waktu_proses > 0 else 0.0,
+    }
+    if len(latensi_us):
+        for nama, persen in (('p50', 50), ('p95', 95), ('p99', 99)):
+            statistik[f'latensi_{nama}_us'] = float(np.percentile(latensi_us, persen))
+        statistik['latensi_maks_us'] = float(latensi_us.max())
+    return alert, statistik
+
+def tampilkan_statistik(statistik):
+    """
+    Menampilkan ringkasan kinerja pemantauan
+    """
+    print(f"\n{'='*70}")
+    print(f"📊 {statistik['event']:,} event dari {statistik['ticker']} ticker, {statistik['alert']} alert")
+    print(f"⏱️  Durasi total     : {statistik['durasi']:.2f} detik (proses {statistik['waktu_proses']:.2f} detik)")
+    print(f"   Event per detik  : {statistik['event_per_detik']:,.0f} (kapasitas pemrosesan)")
+    if 'latensi_p50_us' in statistik:
+        print(f"   Latensi per event: p50 {statistik['latensi_p50_us']:,.0f} µs, "
+              f"p95 {statistik['latensi_p95_us']:,.0f} µs, p99 {statistik['latensi_p99_us']:,.0f} µs, "
+              f"maks {statistik['latensi_maks_us']:,.0f} µs")
+    print(f"{'='*70}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Pemantau watchlist: alert saat Sinyal berubah menjadi Beli/Jual")
+    parser.add_argument('kode', nargs='*', help='Kode saham (default: daftar saham populer)')
+    parser.add_argument('--daftar', help='File teks berisi kode saham, satu per baris')
+    parser.add_argument('--rekaman', help='Putar ulang file rekaman event (CSV: Date, Kode, OHLCV)')
+    parser.add_argument('--sumber-csv', metavar='DIREKTORI',
+                        help='Putar ulang file CSV per ticker (mis. ekspor analisis_*.csv)')
+    parser.add_argument('--langsung', action='store_true', help='Ambil bar terbaru secara berkala dari sumber data')
+    parser.add_argument('--interval', type=float, default=60, help='Detik antar polling mode langsung (default: 60)')
+    parser.add_argument('--periode', default='1y', help='Periode data pemanasan/putar ulang (default: 1y)')
+    parser.add_argument('--mulai', help='Tanggal awal event putar ulang; bar sebelumnya hanya untuk pemanasan')
+    parser.add_argument('--pemanasan', type=int, default=PEMANASAN_DEFAULT,
+                        help=f'Bar pemanasan per ticker jika --mulai tidak diberikan (default: {PEMANASAN_DEFAULT})')
+    parser.add_argument('--kecepatan', type=float, default=0,
+                        help='Detik waktu pasar per detik nyata saat putar ulang (mis. 86400); 0 = secepat mungkin')
+    parser.add_argument('--offline', action='store_true', help='Gunakan data dari cache lokal saja')
+    parser.add_argument('--tanpa-cache', action='store_true', help='Selalu unduh data tanpa cache lokal')
+    parser.add_argument('--direktori-cache', default=DIREKTORI_CACHE_DEFAULT)
+    parser.add_argument('--aturan', help='File JSON aturan sinyal (default: aturan_sinyal.json)')
+    parser.add_argument('--simpan', help='Tambahkan alert ke file JSON Lines')
+    parser.add_argument('--rekam', help='Rekam semua event ke file CSV (dapat diputar ulang dengan --rekaman)')
+    parser.add_argument('--senyap', action='store_true', help='Jangan tampilkan setiap alert')
+    args = parser.parse_args()
+
+    aturan = AturanSinyal.dari_file(args.aturan) if args.aturan else None
+    daftar_kode = [k.upper() for k in args.kode]
+    if args.daftar:
+        daftar_kode += scanner.baca_daftar_kode(args.daftar)
+    daftar_kode = list(dict.fromkeys(daftar_kode))
+
+    # Data historis: file rekaman, CSV per ticker, atau cache/sumber data
+    if args.rekaman:
+        data = baca_rekaman(args.rekaman)
+        if daftar_kode:
+            data = {kode: df for kode, df in data.items() if kode in daftar_kode}
+    else:
+        daftar_kode = daftar_kode or SAHAM_POPULER
+        sumber = SumberCSV(args.sumber_csv) if args.sumber_csv else SumberYFinance()
+        tickers = [kode + '.JK' for kode in daftar_kode]
+        if args.sumber_csv or args.tanpa_cache:
+            data = sumber.riwayat_banyak(tickers, periode=args.periode)
+        else:
+            data = CacheOHLCV(args.direktori_cache, offline=args.offline, sumber=sumber).ambil_banyak(
+                tickers, periode=args.periode)
+        data = {ticker[:-3]: df for ticker, df in data.items()}
+    if not data:
+        print("⚠️  Tidak ada data untuk ticker yang dipantau")
+        return
+
+    mulai = time.perf_counter()
+    mesin = MesinPantau(aturan=aturan, revisi=args.langsung)
+    if args.langsung:
+        awal, aliran = data, {}
+    else:
+        awal, aliran = pisah_pemanasan(data, mulai=args.mulai, pemanasan=args.pemanasan)
+    for kode, df in awal.items():
+        mesin.panaskan(kode, df)
+    print(f"🔥 Pemanasan {len(awal)} ticker selesai ({time.perf_counter() - mulai:.2f} detik)")
+
+    if args.langsung:
+        print(f"📡 Memantau {len(daftar_kode)} ticker setiap {args.interval:.0f} detik (Ctrl+C untuk berhenti)")
+        event = aliran_langsung(SumberYFinance(), daftar_kode, dict(mesin.waktu), interval=args.interval)
+    else:
+        print(f"⏩ Memutar ulang {sum(len(df) for df in aliran.values()):,} bar"
+              + (f" dengan kecepatan {args.kecepatan:,.0f}x" if args.kecepatan else " secepat mungkin"))
+        event = putar_ulang(aliran, kecepatan=args.kecepatan)
+
+    _, statistik = jalankan(mesin, event, tampilkan=not args.senyap, simpan=args.simpan, rekam=args.rekam)
+    tampilkan_statistik(statistik)
+
+if __name__ == "__main__":
+    main()
@@ -1,55 +1,47 @@
 import pandas as pd
 import numpy as np
-import yfinance as yf
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 import os
-import mplfinance as mpf
+import subprocess
+import sys
+import time
 import warnings
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from cache_data import CacheOHLCV, CacheFundamental, CacheSentimen
+from sumber_data import SumberCSV, SumberYFinance
+from sentimen import LeksikonSentimen
+from aturan_sinyal import AturanSinyal
+from impor_malas import ModulMalas, modul_tersedia
+from metrik import METRIK, ada_hasil
 warnings.filterwarnings('ignore')
 
-# Library untuk sentiment analysis
-try:
-    from textblob import TextBlob
-    TEXTBLOB_AVAILABLE = True
-except ImportError:
-    TEXTBLOB_AVAILABLE = False
-    print("TextBlob tidak tersedia. Menggunakan analisis sentimen sederhana.")
+# Library berat baru diimpor saat fiturnya dipakai (scan/backtest headless tidak memuat matplotlib)
+plt = ModulMalas('matplotlib.pyplot')
+mpf = ModulMalas('mplfinance')
+textblob = ModulMalas('textblob')  # Sentimen TextBlob; tanpa TextBlob dipakai leksikon sederhana
 
-try:
-    import requests
-    REQUESTS_AVAILABLE = True
-except ImportError:
-    REQUESTS_AVAILABLE = False
+# Library opsional yang dipasang oleh --pasang-dependensi (nama modul -> nama paket pip)
+PUSTAKA_OPSIONAL = {
+    'mplfinance': 'mplfinance',
+    'textblob': 'textblob'
+}
 
 class AnalisisBerita:
     """Kelas untuk menganalisis berita terkait saham"""
     
-    def __init__(self):
+    def __init__(self, cache_sentimen=None, leksikon=None, sumber=None):
         self.berita_data = []
+        self.cache_sentimen = cache_sentimen  # CacheSentimen opsional
+        self.leksikon = leksikon if leksikon is not None else LeksikonSentimen()
+        self.sumber = sumber if sumber is not None else SumberYFinance()  # Penyedia berita (SumberData)
         
     def ambil_berita(self, ticker, max_berita=10):
         """
-        Mengambil berita terkait saham dari Yahoo Finance
+        Mengambil berita terkait saham dari sumber data (default Yahoo Finance)
         """
         try:
-            saham = yf.Ticker(ticker)
-            berita = saham.news
-            
-            if not berita:
-                return []
-            
-            # Ambil berita terbaru
-            berita_list = []
-            for item in berita[:max_berita]:
-                berita_info = {
-                    'title': item.get('title', ''),
-                    'publisher': item.get('publisher', ''),
-                    'link': item.get('link', ''),
-                    'datetime': datetime.fromtimestamp(item.get('providerPublishTime', 0)) if item.get('providerPublishTime') else None
-                }
-                berita_list.append(berita_info)
-            
+            berita_list = self.unduh_berita(ticker, max_berita)
             self.berita_data = berita_list
             return berita_list
             
@@ -57,13 +49,30 @@ class AnalisisBerita:
             print(f"Error mengambil berita: {e}")
             return []
     
+    @METRIK.diukur('berita')
+    def unduh_berita(self, ticker, max_berita=10):
+        """
+        Mengunduh daftar berita tanpa mengubah state (aman dijalankan di thread lain)
+        """
+        return self.sumber.berita(ticker, max_berita)
+    
     def analisis_sentimen(self, teks):
         """
-        Menganalisis sentimen dari teks berita
+        Menganalisis sentimen dari teks berita (memakai cache jika tersedia)
+        """
+        if self.cache_sentimen is not None:
+            # Versi leksikon ikut menjadi kunci agar leksikon berbeda tidak memakai hasil lama
+            mesin = 'textblob' if textblob.tersedia() else f'sederhana:{self.leksikon.versi}'
+            return self.cache_sentimen.ambil(teks, self.hitung_sentimen, mesin=mesin)
+        return self.hitung_sentimen(teks)
+    
+    def hitung_sentimen(self, teks):
+        """
+        Menghitung sentimen dari teks berita tanpa cache
         """
-        if TEXTBLOB_AVAILABLE:
+        if textblob.tersedia():
             try:
-                blob = TextBlob(teks)
+                blob = textblob.TextBlob(teks)
                 polarity = blob.sentiment.polarity
                 
                 if polarity > 0.1:
@@ -75,25 +84,25 @@ class AnalisisBerita:
             except:
                 pass
         
-        # Analisis sederhana jika TextBlob tidak tersedia
-        teks_lower = teks.lower()
-        kata_positif = ['naik', 'meningkat', 'untung', 'profit', 'growth', 'baik', 'positif', 'bullish', 'buy']
-        kata_negatif = ['turun', 'menurun', 'rugi', 'loss', 'buruk', 'negatif', 'bearish', 'sell', 'jatuh']
-        
-        skor = 0
-        for kata in kata_positif:
-            if kata in teks_lower:
-                skor += 1
-        for kata in kata_negatif:
-            if kata in teks_lower:
-                skor -= 1
-        
-        if skor > 0:
-            return 'Positif', min(skor / 10, 1.0)
-        elif skor < 0:
-            return 'Negatif', max(skor / 10, -1.0)
-        else:
-            return 'Netral', 0.0
+        # Analisis sederhana (leksikon terkompilasi) jika TextBlob tidak tersedia
+        return self.leksikon.label(self.leksikon.skor(teks))
+    
+    def analisis_sentimen_banyak(self, daftar_teks):
+        """
+        Menganalisis sentimen banyak judul berita dalam satu panggilan
+        """
+        if self.cache_sentimen is not None or textblob.tersedia():
+            return [self.analisis_sentimen(teks) for teks in daftar_teks]
+        return self.leksikon.label_banyak(daftar_teks)
+    
+    def sentimen_berita(self, berita):
+        """
+        Mengembalikan (sentimen, skor) sebuah berita; hasil disimpan di dict berita agar
+        ringkasan dan tampilan memakai satu hasil yang sama
+        """
+        if 'sentimen' not in berita:
+            berita['sentimen'], berita['skor_sentimen'] = self.analisis_sentimen(berita['title'])
+        return berita['sentimen'], berita['skor_sentimen']
     
     def ringkasan_sentimen_berita(self, berita_list):
         """
@@ -107,8 +116,13 @@ class AnalisisBerita:
         jumlah_negatif = 0
         jumlah_netral = 0
         
+        # Berita yang belum dinilai dianalisis sekaligus dalam satu batch
+        belum = [berita for berita in berita_list if 'sentimen' not in berita]
+        for berita, hasil in zip(belum, self.analisis_sentimen_banyak([b['title'] for b in belum])):
+            berita['sentimen'], berita['skor_sentimen'] = hasil
+        
         for berita in berita_list:
-            sentimen, skor = self.analisis_sentimen(berita['title'])
+            sentimen, skor = self.sentimen_berita(berita)
             total_sentimen += skor
             
             if sentimen == 'Positif':
@@ -120,6 +134,9 @@ class AnalisisBerita:
         
         rata_sentimen = total_sentimen / len(berita_list)
         
+        if self.cache_sentimen is not None:
+            self.cache_sentimen.simpan()
+        
         return {
             'rata_sentimen': rata_sentimen,
             'jumlah_positif': jumlah_positif,
@@ -128,146 +145,401 @@ class AnalisisBerita:
             'total_berita': len(berita_list)
         }
 
+class JendelaRolling:
+    """Kelas kernel rolling-window bersama untuk indikator teknikal"""
+    
+    # Jumlah jendela yang diproses sekaligus saat menghitung MAD (membatasi memori)
+    UKURAN_BLOK_MAD = 65536
+    
+    def __init__(self, df):
+        self.df = df
+        self._cache = {}
+    
+    def _ambil(self, kunci, hitung):
+        """
+        Mengambil hasil dari cache atau menghitungnya sekali
+        """
+        if kunci not in self._cache:
+            self._cache[kunci] = hitung()
+        return self._cache[kunci]
+    
+    def rentang_high_low(self, period):
+        """
+        Mengembalikan (High max, Low min) bergulir, dihitung sekali per period
+        """
+        return self._ambil(('rentang', period), lambda: (
+            self.df['High'].rolling(window=period).max(),
+            self.df['Low'].rolling(window=period).min()
+        ))
+    
+    def typical_price(self):
+        """
+        Mengembalikan typical price (High + Low + Close) / 3
+        """
+        return self._ambil('typical_price', lambda: (self.df['High'] + self.df['Low'] + self.df['Close']) / 3)
+    
+    def rata_rata(self, seri, period, kunci=None):
+        """
+        Rata-rata bergulir, di-cache jika kunci diberikan
+        """
+        if kunci is None:
+            return seri.rolling(window=period).mean()
+        return self._ambil(('rata_rata', kunci, period), lambda: seri.rolling(window=period).mean())
+    
+    def mad(self, seri, period, kunci=None):
+        """
+        Mean absolute deviation bergulir menggunakan strided view (tanpa callback Python per jendela)
+        """
+        hitung = lambda: pd.Series(self.mad_strided(seri.to_numpy(dtype=float), period), index=seri.index)
+        if kunci is None:
+            return hitung()
+        return self._ambil(('mad', kunci, period), hitung)
+    
+    @classmethod
+    def mad_strided(cls, nilai, period):
+        """
+        Menghitung MAD untuk setiap jendela dari array 1 dimensi
+        """
+        nilai = np.asarray(nilai, dtype=float)
+        hasil = np.full(len(nilai), np.nan)
+        if period < 1 or len(nilai) < period:
+            return hasil
+        
+        jendela = np.lib.stride_tricks.sliding_window_view(nilai, period)
+        # Proses per blok agar matriks sementara (blok x period) tetap kecil
+        for awal in range(0, len(jendela), cls.UKURAN_BLOK_MAD):
+            blok = jendela[awal:awal + cls.UKURAN_BLOK_MAD]
+            rata = blok.mean(axis=1, keepdims=True)
+            hasil[awal + period - 1:awal + period - 1 + len(blok)] = np.abs(blok - rata).mean(axis=1)
+        return hasil
+
 class AnalisisTeknikalLengkap:
     """Kelas untuk analisis teknikal yang lebih lengkap"""
     
+    @staticmethod
+    def volume_kolom(close, volume):
+        """
+        Menghitung VMA_20, VROC_10, OBV dan VPT dari Series Close dan Volume
+        """
+        return {
+            **AnalisisTeknikalLengkap.volume_rata_kolom(volume),
+            # OBV dan VPT (kumulatif, tanpa loop per baris)
+            'OBV': AnalisisTeknikalLengkap.obv(close.to_numpy(), volume.to_numpy()),
+            'VPT': AnalisisTeknikalLengkap.vpt(close.to_numpy(), volume.to_numpy()),
+        }
+    
+    @staticmethod
+    def volume_rata_kolom(volume):
+        """
+        Menghitung VMA_20 dan VROC_10 dari Series Volume
+        """
+        volume_shift = volume.shift(10)
+        return {
+            'VMA_20': volume.rolling(window=20).mean(),
+            # VROC_10 - hindari division by zero
+            'VROC_10': np.where(volume_shift != 0, ((volume - volume_shift) / volume_shift) * 100, 0),
+        }
+    
+    @staticmethod
+    def macd_kolom(close):
+        """
+        Menghitung MACD, garis sinyal dan histogram
+        """
+        ema = AnalisisTeknikalLengkap.ema_kolom(close, (12, 26))
+        return AnalisisTeknikalLengkap.macd_dari_ema(ema['EMA_12'], ema['EMA_26'])
+    
+    @staticmethod
+    def macd_dari_ema(ema_cepat, ema_lambat, signal=9):
+        """
+        Menghitung MACD, garis sinyal dan histogram dari EMA cepat dan lambat
+        """
+        macd = ema_cepat - ema_lambat
+        macd_signal = macd.ewm(span=signal, adjust=False).mean()
+        return {'MACD': macd, 'MACD_Signal': macd_signal, 'MACD_Histogram': macd - macd_signal}
+    
+    @staticmethod
+    def rsi_kolom(close, period=14):
+        """
+        Menghitung RSI - hindari division by zero
+        """
+        delta = close.diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+        rs = np.where(loss != 0, gain / loss, 0)
+        return {'RSI': np.where(
+            rs != 0,
+            100 - (100 / (1 + rs)),
+            50  # Default ke tengah jika tidak ada perhitungan
+        )}
+    
+    @staticmethod
+    def sma_kolom(close, periods=(20, 50, 200)):
+        """
+        Menghitung SMA untuk beberapa period
+        """
+        return {f'SMA_{period}': close.rolling(window=period).mean() for period in periods}
+    
+    @staticmethod
+    def ema_kolom(close, spans=(12, 26)):
+        """
+        Menghitung EMA untuk beberapa span
+        """
+        return {f'EMA_{span}': close.ewm(span=span, adjust=False).mean() for span in spans}
+    
+    @staticmethod
+    def bollinger_bands_kolom(close, period=20, std_dev=2):
+        """
+        Menghitung kolom Bollinger Bands dari Series Close
+        """
+        pita = AnalisisTeknikalLengkap.bollinger_pita_kolom(close, period, std_dev)
+        return {**pita, **AnalisisTeknikalLengkap.bollinger_posisi_kolom(close, pita['BB_Upper'], pita['BB_Lower'])}
+    
+    @staticmethod
+    def bollinger_pita_kolom(close, period=20, std_dev=2):
+        """
+        Menghitung pita tengah, atas dan bawah Bollinger Bands
+        """
+        bb_middle = close.rolling(window=period).mean()
+        bb_std = close.rolling(window=period).std()
+        return {
+            'BB_Middle': bb_middle,
+            'BB_Upper': bb_middle + (bb_std * std_dev),
+            'BB_Lower': bb_middle - (bb_std * std_dev),
+        }
+    
+    @staticmethod
+    def bollinger_posisi_kolom(close, bb_upper, bb_lower):
+        """
+        Menghitung lebar pita dan posisi harga di dalam pita Bollinger
+        """
+        # Hindari division by zero
+        bb_range = bb_upper - bb_lower
+        return {
+            'BB_Width': bb_upper - bb_lower,
+            'BB_Position': np.where(
+                bb_range != 0,
+                (close - bb_lower) / bb_range,
+                0.5  # Default ke tengah jika tidak ada range
+            ),
+        }
+    
     @staticmethod
     def bollinger_bands(df, period=20, std_dev=2):
         """
         Menghitung Bollinger Bands
         """
-        df['BB_Middle'] = df['Close'].rolling(window=period).mean()
-        bb_std = df['Close'].rolling(window=period).std()
-        df['BB_Upper'] = df['BB_Middle'] + (bb_std * std_dev)
-        df['BB_Lower'] = df['BB_Middle'] - (bb_std * std_dev)
-        df['BB_Width'] = df['BB_Upper'] - df['BB_Lower']
-        # Hindari division by zero
-        bb_range = df['BB_Upper'] - df['BB_Lower']
-        df['BB_Position'] = np.where(
-            bb_range != 0,
-            (df['Close'] - df['BB_Lower']) / bb_range,
-            0.5  # Default ke tengah jika tidak ada range
-        )
+        for nama, nilai in AnalisisTeknikalLengkap.bollinger_bands_kolom(df['Close'], period, std_dev).items():
+            df[nama] = nilai
         return df
     
     @staticmethod
-    def stochastic_oscillator(df, k_period=14, d_period=3):
+    def stochastic_kolom(close, jendela, k_period=14, d_period=3):
         """
-        Menghitung Stochastic Oscillator
+        Menghitung %K dan %D memakai kernel rolling bersama
         """
-        low_min = df['Low'].rolling(window=k_period).min()
-        high_max = df['High'].rolling(window=k_period).max()
+        high_max, low_min = jendela.rentang_high_low(k_period)
         # Hindari division by zero
         stoch_range = high_max - low_min
-        df['%K'] = np.where(
+        persen_k = pd.Series(np.where(
             stoch_range != 0,
-            100 * ((df['Close'] - low_min) / stoch_range),
+            100 * ((close - low_min) / stoch_range),
             50  # Default ke tengah jika tidak ada range
-        )
-        df['%D'] = df['%K'].rolling(window=d_period).mean()
+        ), index=close.index)
+        return {'%K': persen_k, '%D': persen_k.rolling(window=d_period).mean()}
+    
+    @staticmethod
+    def stochastic_oscillator(df, k_period=14, d_period=3, jendela=None):
+        """
+        Menghitung Stochastic Oscillator
+        """
+        jendela = jendela if jendela is not None else JendelaRolling(df)
+        for nama, nilai in AnalisisTeknikalLengkap.stochastic_kolom(df['Close'], jendela, k_period, d_period).items():
+            df[nama] = nilai
         return df
     
     @staticmethod
-    def adx(df, period=14):
+    def adx_kolom(high, low, close, period=14):
         """
-        Menghitung Average Directional Index (ADX)
+        Menghitung ADX beserta kolom perantaranya (TR, DM, nilai smoothing dan DX)
+        """
+        dm = AnalisisTeknikalLengkap.directional_movement_kolom(high, low, close)
+        di = AnalisisTeknikalLengkap.directional_indicator_kolom(dm['TR'], dm['+DM'], dm['-DM'], period)
+        return {**dm, **di,
+                **AnalisisTeknikalLengkap.adx_dari_di_kolom(di['+DI'], di['-DI'], high.index, period)}
+    
+    @staticmethod
+    def directional_movement_kolom(high, low, close):
+        """
+        Menghitung True Range dan Directional Movement (+DM, -DM)
         """
         # True Range
-        df['TR'] = np.maximum(
-            df['High'] - df['Low'],
+        tr = np.maximum(
+            high - low,
             np.maximum(
-                abs(df['High'] - df['Close'].shift(1)),
-                abs(df['Low'] - df['Close'].shift(1))
+                abs(high - close.shift(1)),
+                abs(low - close.shift(1))
             )
         )
         
         # Directional Movement
-        df['+DM'] = np.where(
-            (df['High'] - df['High'].shift(1)) > (df['Low'].shift(1) - df['Low']),
-            np.maximum(df['High'] - df['High'].shift(1), 0),
+        plus_dm = pd.Series(np.where(
+            (high - high.shift(1)) > (low.shift(1) - low),
+            np.maximum(high - high.shift(1), 0),
             0
-        )
-        df['-DM'] = np.where(
-            (df['Low'].shift(1) - df['Low']) > (df['High'] - df['High'].shift(1)),
-            np.maximum(df['Low'].shift(1) - df['Low'], 0),
+        ), index=high.index)
+        minus_dm = pd.Series(np.where(
+            (low.shift(1) - low) > (high - high.shift(1)),
+            np.maximum(low.shift(1) - low, 0),
             0
-        )
-        
+        ), index=high.index)
+        return {'TR': tr, '+DM': plus_dm, '-DM': minus_dm}
+    
+    @staticmethod
+    def directional_indicator_kolom(tr, plus_dm, minus_dm, period=14):
+        """
+        Menghitung nilai smoothing TR/DM dan Directional Indicator (+DI, -DI)
+        """
         # Smoothed values
-        df['TR_Smooth'] = df['TR'].rolling(window=period).sum()
-        df['+DM_Smooth'] = df['+DM'].rolling(window=period).sum()
-        df['-DM_Smooth'] = df['-DM'].rolling(window=period).sum()
+        tr_smooth = tr.rolling(window=period).sum()
+        plus_dm_smooth = plus_dm.rolling(window=period).sum()
+        minus_dm_smooth = minus_dm.rolling(window=period).sum()
         
         # Directional Indicators - hindari division by zero
-        df['+DI'] = np.where(
-            df['TR_Smooth'] != 0,
-            100 * (df['+DM_Smooth'] / df['TR_Smooth']),
+        plus_di = np.where(
+            tr_smooth != 0,
+            100 * (plus_dm_smooth / tr_smooth),
             0
         )
-        df['-DI'] = np.where(
-            df['TR_Smooth'] != 0,
-            100 * (df['-DM_Smooth'] / df['TR_Smooth']),
+        minus_di = np.where(
+            tr_smooth != 0,
+            100 * (minus_dm_smooth / tr_smooth),
             0
         )
-        
+        return {
+            'TR_Smooth': tr_smooth, '+DM_Smooth': plus_dm_smooth, '-DM_Smooth': minus_dm_smooth,
+            '+DI': plus_di, '-DI': minus_di,
+        }
+    
+    @staticmethod
+    def adx_dari_di_kolom(plus_di, minus_di, index, period=14):
+        """
+        Menghitung DX dan ADX dari +DI dan -DI
+        """
         # ADX - hindari division by zero
-        di_sum = df['+DI'] + df['-DI']
-        df['DX'] = np.where(
+        di_sum = plus_di + minus_di
+        dx = pd.Series(np.where(
             di_sum != 0,
-            100 * abs(df['+DI'] - df['-DI']) / di_sum,
+            100 * abs(plus_di - minus_di) / di_sum,
             0
-        )
-        df['ADX'] = df['DX'].rolling(window=period).mean()
-        
+        ), index=index)
+        return {'DX': dx, 'ADX': dx.rolling(window=period).mean()}
+    
+    @staticmethod
+    def adx(df, period=14):
+        """
+        Menghitung Average Directional Index (ADX)
+        """
+        for nama, nilai in AnalisisTeknikalLengkap.adx_kolom(df['High'], df['Low'], df['Close'], period).items():
+            df[nama] = nilai
         return df
     
     @staticmethod
-    def williams_r(df, period=14):
+    def williams_r_kolom(close, jendela, period=14):
         """
-        Menghitung Williams %R
+        Menghitung Williams %R memakai kernel rolling bersama
         """
-        high_max = df['High'].rolling(window=period).max()
-        low_min = df['Low'].rolling(window=period).min()
+        high_max, low_min = jendela.rentang_high_low(period)
         # Hindari division by zero
         wr_range = high_max - low_min
-        df['Williams_R'] = np.where(
+        return {'Williams_R': np.where(
             wr_range != 0,
-            -100 * ((high_max - df['Close']) / wr_range),
+            -100 * ((high_max - close) / wr_range),
             -50  # Default ke tengah jika tidak ada range
-        )
+        )}
+    
+    @staticmethod
+    def williams_r(df, period=14, jendela=None):
+        """
+        Menghitung Williams %R
+        """
+        jendela = jendela if jendela is not None else JendelaRolling(df)
+        df['Williams_R'] = AnalisisTeknikalLengkap.williams_r_kolom(df['Close'], jendela, period)['Williams_R']
         return df
     
     @staticmethod
-    def cci(df, period=20):
+    def cci_kolom(jendela, period=20):
         """
-        Menghitung Commodity Channel Index (CCI)
+        Menghitung Commodity Channel Index (CCI) memakai kernel rolling bersama
         """
-        typical_price = (df['High'] + df['Low'] + df['Close']) / 3
-        sma_tp = typical_price.rolling(window=period).mean()
-        mad = typical_price.rolling(window=period).apply(lambda x: np.abs(x - x.mean()).mean())
+        typical_price = jendela.typical_price()
+        sma_tp = jendela.rata_rata(typical_price, period, kunci='typical_price')
+        mad = jendela.mad(typical_price, period, kunci='typical_price')
         # Hindari division by zero
-        df['CCI'] = np.where(
+        return {'CCI': np.where(
             mad != 0,
             (typical_price - sma_tp) / (0.015 * mad),
             0
-        )
+        )}
+    
+    @staticmethod
+    def cci(df, period=20, jendela=None):
+        """
+        Menghitung Commodity Channel Index (CCI)
+        """
+        jendela = jendela if jendela is not None else JendelaRolling(df)
+        df['CCI'] = AnalisisTeknikalLengkap.cci_kolom(jendela, period)['CCI']
         return df
     
     @staticmethod
-    def atr(df, period=14):
+    def atr_kolom(high, low, close, period=14):
         """
         Menghitung Average True Range (ATR)
         """
-        high_low = df['High'] - df['Low']
-        high_close = np.abs(df['High'] - df['Close'].shift())
-        low_close = np.abs(df['Low'] - df['Close'].shift())
+        high_low = high - low
+        high_close = np.abs(high - close.shift())
+        low_close = np.abs(low - close.shift())
         
         ranges = pd.concat([high_low, high_close, low_close], axis=1)
         true_range = np.max(ranges, axis=1)
         
-        df['ATR'] = true_range.rolling(window=period).mean()
-        return df
+        return {'ATR': true_range.rolling(window=period).mean()}
     
+    @staticmethod
+    def atr(df, period=14):
+        """
+        Menghitung Average True Range (ATR)
+        """
+        df['ATR'] = AnalisisTeknikalLengkap.atr_kolom(df['High'], df['Low'], df['Close'], period)['ATR']
+        return df
+
+    @staticmethod
+    def obv(close, volume):
+        """
+        Menghitung On Balance Volume (OBV) sebagai jumlah kumulatif volume bertanda
+        """
+        close = np.asarray(close, dtype=float)
+        volume = np.asarray(volume)
+        arah = np.zeros(len(close), dtype=volume.dtype)
+        if len(close) > 1:
+            # Volume ditambah saat harga naik, dikurangi saat turun, tetap jika sama
+            naik = close[1:] > close[:-1]
+            turun = close[1:] < close[:-1]
+            arah[1:] = np.where(naik, volume[1:], np.where(turun, -volume[1:], 0))
+        return np.cumsum(arah)
+
+    @staticmethod
+    def vpt(close, volume):
+        """
+        Menghitung Volume Price Trend (VPT) sebagai jumlah kumulatif volume x perubahan harga
+        """
+        close = np.asarray(close, dtype=float)
+        volume = np.asarray(volume)
+        perubahan = np.zeros(len(close))
+        if len(close) > 1:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                perubahan[1:] = volume[1:] * ((close[1:] - close[:-1]) / close[:-1])
+        return np.cumsum(perubahan)
+
     @staticmethod
     def fibonacci_retracement(df):
         """
@@ -292,21 +564,51 @@ class AnalisisTeknikalLengkap:
 class AnalisisFundamental:
     """Kelas untuk analisis fundamental saham"""
     
-    def __init__(self):
+    def __init__(self, cache=None, sumber=None):
         self.info_saham = None
+        self.cache = cache  # CacheFundamental opsional
+        self.sumber = sumber if sumber is not None else SumberYFinance()  # Penyedia fundamental (SumberData)
     
     def ambil_data_fundamental(self, ticker):
         """
-        Mengambil data fundamental dari Yahoo Finance
+        Mengambil data fundamental dari sumber data (default Yahoo Finance)
         """
         try:
-            saham = yf.Ticker(ticker)
-            self.info_saham = saham.info
+            self.info_saham = self.ambil_info(ticker)
             return self.info_saham
         except Exception as e:
             print(f"Error mengambil data fundamental: {e}")
             return None
     
+    @METRIK.diukur('fundamental', baris=ada_hasil)
+    def ambil_info(self, ticker):
+        """
+        Mengambil saham.info lewat cache (jika ada) tanpa mengubah state
+        """
+        if self.cache is not None:
+            return self.cache.ambil(ticker, pengambil=self.unduh_info)
+        return self.unduh_info(ticker)
+    
+    def ambil_banyak(self, tickers):
+        """
+        Mengambil data fundamental banyak ticker sekaligus (dict ticker -> info)
+        """
+        if self.cache is not None:
+            return self.cache.ambil_banyak(tickers, pengambil=self.unduh_info)
+        hasil = {}
+        for ticker in tickers:
+            try:
+                hasil[ticker] = self.unduh_info(ticker)
+            except Exception as e:
+                print(f"Error mengambil data fundamental {ticker}: {e}")
+        return hasil
+    
+    def unduh_info(self, ticker):
+        """
+        Mengunduh payload saham.info tanpa mengubah state (aman dijalankan di thread lain)
+        """
+        return self.sumber.info(ticker)
+    
     def tampilkan_fundamental(self, kode_saham):
         """
         Menampilkan data fundamental saham
@@ -370,28 +672,350 @@ class AnalisisFundamental:
         
         print(f"{'='*70}")
 
+# Daftar saham populer Indonesia
+SAHAM_POPULER = ['BBCA', 'TLKM', 'BBRI', 'ASII', 'UNVR', 'ICBP', 'EXCL', 'ADRO', 'ANTM', 'BMRI']
+
+# Target dan stop loss yang disarankan rekomendasi (juga dipakai backtest.py)
+TARGET_PERSEN = 0.08
+STOP_PERSEN = 0.05
+
+# Aturan sinyal bawaan (aturan_sinyal.json); strategi lain cukup memakai file aturan berbeda
+ATURAN_SINYAL = AturanSinyal.dari_file()
+
+def decode_alasan(kode, aturan=None):
+    """
+    Mengubah Kode_Alasan (bitmask aturan) menjadi teks alasan yang dapat dibaca
+    """
+    return (aturan if aturan is not None else ATURAN_SINYAL).decode(kode)
+
+def tambah_kolom_alasan(df, aturan=None):
+    """
+    Mengganti kolom Kode_Alasan dengan kolom teks Alasan di posisi yang sama (untuk tampilan/ekspor)
+    """
+    if 'Kode_Alasan' not in df.columns:
+        return df
+    kode = df['Kode_Alasan'].to_numpy()
+    # Hanya kombinasi unik yang di-decode, lalu dipetakan kembali ke setiap baris
+    unik, posisi = np.unique(kode, return_inverse=True)
+    teks = np.array([decode_alasan(k, aturan) for k in unik], dtype=object)
+    df = df.copy()
+    df['Kode_Alasan'] = teks[posisi.reshape(-1)]
+    return df.rename(columns={'Kode_Alasan': 'Alasan'})
+
+# Nilai pengganti NaN setelah sinyal dihitung
+NILAI_DEFAULT_INDIKATOR = {
+    'RSI': 50,
+    'MACD': 0,
+    'MACD_Signal': 0,
+    '%K': 50,
+    '%D': 50,
+    'ADX': 0,
+    '+DI': 0,
+    '-DI': 0,
+    'Williams_R': -50,
+    'CCI': 0,
+    'ATR': 0,
+    'BB_Position': 0.5,
+    'VROC_10': 0
+}
+
+class GrafIndikator:
+    """Kelas graf dependensi indikator: hanya subgraf yang dibutuhkan kolom yang diminta yang dihitung"""
+    
+    def __init__(self, simpul=()):
+        """
+        simpul : list (nama, kolom keluaran, kolom dependensi, fungsi hitung, kolom perantara).
+                 Fungsi hitung menerima KonteksIndikator dan mengembalikan dict kolom -> nilai.
+                 Dependensi yang tidak dihasilkan simpul mana pun dibaca dari frame (mis. Close).
+        """
+        self.simpul = {}
+        self.pembuat = {}
+        self.rencana = lru_cache(maxsize=256)(self._rencana)
+        for spek in simpul:
+            self.tambah(*spek)
+    
+    def tambah(self, nama, keluaran, bergantung, hitung, perantara=()):
+        """
+        Mendaftarkan simpul baru; urutan pendaftaran menentukan urutan kolom hasil
+        """
+        if nama in self.simpul:
+            raise ValueError(f"Simpul indikator {nama!r} sudah terdaftar")
+        ganda = [kolom for kolom in keluaran if kolom in self.pembuat]
+        if ganda:
+            raise ValueError(f"Kolom sudah dihasilkan simpul lain: {', '.join(ganda)}")
+        self.simpul[nama] = (list(keluaran), list(bergantung), hitung, set(perantara))
+        for kolom in keluaran:
+            self.pembuat[kolom] = nama
+        self.rencana.cache_clear()
+    
+    def __contains__(self, kolom):
+        return kolom in self.pembuat
+    
+    def kolom(self, perantara=True):
+        """
+        Semua kolom keluaran sesuai urutan pendaftaran
+        """
+        return [kolom for keluaran, _, _, lewati in self.simpul.values() for kolom in keluaran
+                if perantara or kolom not in lewati]
+    
+    def perantara(self):
+        """
+        Himpunan kolom perantara (mis. TR dan DX untuk ADX)
+        """
+        return set().union(*(lewati for _, _, _, lewati in self.simpul.values()))
+    
+    def _rencana(self, kolom):
+        """
+        Mengembalikan tuple nama simpul yang dibutuhkan kolom (tuple), terurut topologis
+        """
+        urutan = []
+        status = {}
+        
+        def kunjungi(nama):
+            if status.get(nama) == 'selesai':
+                return
+            if status.get(nama) == 'aktif':
+                raise ValueError(f"Dependensi melingkar pada simpul indikator {nama!r}")
+            status[nama] = 'aktif'
+            for dependensi in self.simpul[nama][1]:
+                if dependensi in self.pembuat:
+                    kunjungi(self.pembuat[dependensi])
+            status[nama] = 'selesai'
+            urutan.append(nama)
+        
+        for nama in kolom:
+            if nama in self.pembuat:
+                kunjungi(self.pembuat[nama])
+        return tuple(urutan)
+    
+    def konteks(self, df):
+        """
+        Membuat memo nilai indikator untuk satu frame OHLCV
+        """
+        return KonteksIndikator(self, df)
+
+class KonteksIndikator:
+    """Kelas memo indikator per frame: setiap simpul dihitung paling banyak sekali"""
+    
+    def __init__(self, graf, df):
+        self.graf = graf
+        self.df = df  # Frame dianggap tidak berubah selama konteks dipakai
+        self.jendela = JendelaRolling(df)
+        self.nilai = {}
+    
+    def __getitem__(self, nama):
+        """
+        Nilai kolom sebagai Series; kolom indikator dihitung bila belum ada di memo
+        """
+        if nama not in self.graf:
+            return self.df[nama]
+        if nama not in self.nilai:
+            self.hitung([nama])
+        nilai = self.nilai[nama]
+        return nilai if isinstance(nilai, pd.Series) else pd.Series(nilai, index=self.df.index, copy=False)
+    
+    def hitung(self, kolom):
+        """
+        Menghitung kolom yang diminta beserta dependensinya, mengembalikan dict kolom -> array
+        """
+        for _ in self.alirkan(kolom):
+            pass
+        return {nama: np.asarray(self.nilai[nama]) if nama in self.graf else self.df[nama].to_numpy()
+                for nama in kolom}
+    
+    def alirkan(self, kolom, simpan=True):
+        """
+        Menghitung simpul yang dibutuhkan secara berurutan dan menghasilkan dict kolom -> array per simpul.
+        Dengan simpan=False nilai dilepas dari memo segera setelah tidak dibutuhkan simpul berikutnya
+        (untuk pipeline satu kali jalan dengan memori minimum).
+        """
+        rencana = self.graf.rencana(tuple(kolom))
+        sisa_pemakai = {}
+        if not simpan:
+            for nama in rencana:
+                for dependensi in self.graf.simpul[nama][1]:
+                    sisa_pemakai[dependensi] = sisa_pemakai.get(dependensi, 0) + 1
+        
+        for nama in rencana:
+            keluaran, bergantung, hitung, _ = self.graf.simpul[nama]
+            if not all(k in self.nilai for k in keluaran):
+                # Setiap simpul (metode AnalisisTeknikalLengkap) diukur sebagai tahap indikator
+                with METRIK.tahap('indikator', simpul=nama) as tahap:
+                    hasil = hitung(self)
+                    tahap.baris = len(hasil[keluaran[0]])
+                for k in keluaran:
+                    self.nilai[k] = hasil[k]
+                del hasil
+            yield {k: np.asarray(self.nilai[k]) for k in keluaran}
+            if not simpan:
+                for k in keluaran:
+                    if not sisa_pemakai.get(k):
+                        self.nilai.pop(k, None)
+                for dependensi in bergantung:
+                    if dependensi in sisa_pemakai:
+                        sisa_pemakai[dependensi] -= 1
+                        if not sisa_pemakai[dependensi]:
+                            self.nilai.pop(dependensi, None)
+
+# Simpul indikator: (nama, kolom keluaran, dependensi, fungsi hitung, kolom perantara).
+# Urutan daftar menentukan urutan kolom hasil; urutan hitung mengikuti dependensi.
+SIMPUL_INDIKATOR = [
+    ('volume_rata', ['VMA_20', 'VROC_10'], ['Volume'],
+     lambda k: AnalisisTeknikalLengkap.volume_rata_kolom(k['Volume'])),
+    ('obv', ['OBV'], ['Close', 'Volume'],
+     lambda k: {'OBV': AnalisisTeknikalLengkap.obv(k['Close'].to_numpy(), k['Volume'].to_numpy())}),
+    ('vpt', ['VPT'], ['Close', 'Volume'],
+     lambda k: {'VPT': AnalisisTeknikalLengkap.vpt(k['Close'].to_numpy(), k['Volume'].to_numpy())}),
+    ('macd', ['MACD', 'MACD_Signal', 'MACD_Histogram'], ['EMA_12', 'EMA_26'],
+     lambda k: AnalisisTeknikalLengkap.macd_dari_ema(k['EMA_12'], k['EMA_26'])),
+    ('rsi', ['RSI'], ['Close'],
+     lambda k: AnalisisTeknikalLengkap.rsi_kolom(k['Close'])),
+    *[(f'sma_{period}', [f'SMA_{period}'], ['Close'],
+       lambda k, period=period: AnalisisTeknikalLengkap.sma_kolom(k['Close'], (period,)))
+      for period in (20, 50, 200)],
+    *[(f'ema_{span}', [f'EMA_{span}'], ['Close'],
+       lambda k, span=span: AnalisisTeknikalLengkap.ema_kolom(k['Close'], (span,)))
+      for span in (12, 26)],
+    ('bollinger', ['BB_Middle', 'BB_Upper', 'BB_Lower'], ['Close'],
+     lambda k: AnalisisTeknikalLengkap.bollinger_pita_kolom(k['Close'])),
+    ('bollinger_posisi', ['BB_Width', 'BB_Position'], ['Close', 'BB_Upper', 'BB_Lower'],
+     lambda k: AnalisisTeknikalLengkap.bollinger_posisi_kolom(k['Close'], k['BB_Upper'], k['BB_Lower'])),
+    ('stochastic', ['%K', '%D'], ['High', 'Low', 'Close'],
+     lambda k: AnalisisTeknikalLengkap.stochastic_kolom(k['Close'], k.jendela)),
+    ('directional_movement', ['TR', '+DM', '-DM'], ['High', 'Low', 'Close'],
+     lambda k: AnalisisTeknikalLengkap.directional_movement_kolom(k['High'], k['Low'], k['Close']),
+     ['TR', '+DM', '-DM']),
+    ('directional_indicator', ['TR_Smooth', '+DM_Smooth', '-DM_Smooth', '+DI', '-DI'], ['TR', '+DM', '-DM'],
+     lambda k: AnalisisTeknikalLengkap.directional_indicator_kolom(k['TR'], k['+DM'], k['-DM']),
+     ['TR_Smooth', '+DM_Smooth', '-DM_Smooth']),
+    ('adx', ['DX', 'ADX'], ['+DI', '-DI'],
+     lambda k: AnalisisTeknikalLengkap.adx_dari_di_kolom(k['+DI'], k['-DI'], k.df.index),
+     ['DX']),
+    ('williams_r', ['Williams_R'], ['High', 'Low', 'Close'],
+     lambda k: AnalisisTeknikalLengkap.williams_r_kolom(k['Close'], k.jendela)),
+    ('cci', ['CCI'], ['High', 'Low', 'Close'],
+     lambda k: AnalisisTeknikalLengkap.cci_kolom(k.jendela)),
+    ('atr', ['ATR'], ['High', 'Low', 'Close'],
+     lambda k: AnalisisTeknikalLengkap.atr_kolom(k['High'], k['Low'], k['Close'])),
+]
+
+GRAF_INDIKATOR = GrafIndikator(SIMPUL_INDIKATOR)
+
+class PipelineIndikator:
+    """Kelas pipeline indikator dan sinyal tanpa salinan frame"""
+    
+    def __init__(self, perantara=True, dtype=None, aturan=None, graf=None, kolom=None):
+        """
+        perantara : simpan kolom perantara (TR, +DM, ..., DX) di hasil
+        dtype     : None mempertahankan tipe hasil setiap kernel; np.float64/np.float32 menulis
+                    semua kolom indikator ke satu buffer yang dialokasikan di awal
+        aturan    : AturanSinyal untuk kolom Sinyal/Kode_Alasan/Skor_Sinyal
+        kolom     : kolom indikator yang diminta; None berarti semua kolom di graf. Kolom yang hanya
+                    dibutuhkan aturan sinyal dihitung tetapi tidak disimpan.
+        """
+        self.perantara = perantara
+        self.dtype = np.dtype(dtype) if dtype is not None else None
+        self.aturan = aturan if aturan is not None else ATURAN_SINYAL
+        self.graf = graf if graf is not None else GRAF_INDIKATOR
+        self.kolom = None if kolom is None else set(kolom)
+    
+    def kolom_keluaran(self):
+        """
+        Daftar kolom indikator yang disimpan, sesuai urutan graf
+        """
+        if self.kolom is not None:
+            # Kolom yang diminta eksplisit selalu disimpan, termasuk kolom perantara
+            return [nama for nama in self.graf.kolom() if nama in self.kolom]
+        lewati = set() if self.perantara else self.graf.perantara()
+        return [nama for nama in self.graf.kolom() if nama not in lewati]
+    
+    def jalankan(self, df, sinyal=True, konteks=None):
+        """
+        Menghitung indikator (dan sinyal) dari frame OHLCV tanpa menyalin kolom masukan.
+        Dengan sinyal=True hasilnya setara generate_sinyal_lengkap: aturan dievaluasi pada nilai
+        float64 mentah, lalu NaN diisi NILAI_DEFAULT_INDIKATOR. Konteks (memo per frame) dapat
+        diberikan agar indikator yang sudah dihitung tidak dihitung ulang.
+        """
+        kolom = self.kolom_keluaran()
+        buffer = np.empty((len(kolom), len(df)), dtype=self.dtype) if self.dtype is not None else None
+        baris = {nama: i for i, nama in enumerate(kolom)}
+        kolom_aturan = set(self.aturan.kolom) if sinyal else set()
+        hasil = dict.fromkeys(kolom)  # Urutan kolom mengikuti graf, bukan urutan hitung
+        # Kolom masukan untuk aturan (mis. Close, Volume) dibaca langsung dari frame
+        nilai_aturan = {nama: df[nama].to_numpy() for nama in kolom_aturan
+                        if nama not in self.graf and nama in df.columns}
+        diminta = kolom + [nama for nama in kolom_aturan if nama in self.graf and nama not in baris]
+        
+        # Tanpa konteks dari pemanggil, nilai dilepas segera setelah tidak dibutuhkan lagi
+        simpan = konteks is not None
+        konteks = konteks if konteks is not None else self.graf.konteks(df)
+        for nilai in konteks.alirkan(diminta, simpan=simpan):
+            for nama, isi in nilai.items():
+                if nama in kolom_aturan:
+                    nilai_aturan[nama] = isi
+                if nama not in baris:
+                    continue
+                if buffer is None:
+                    hasil[nama] = isi
+                else:
+                    buffer[baris[nama]] = isi
+                    hasil[nama] = buffer[baris[nama]]
+            del nilai
+        
+        if sinyal:
+            kurang = [nama for nama in self.aturan.kolom if nama not in nilai_aturan]
+            if kurang:
+                raise ValueError(f"Kolom untuk aturan sinyal tidak tersedia: {', '.join(kurang)}")
+            kode_alasan, skor_sinyal = self.aturan.evaluasi(nilai_aturan)
+            del nilai_aturan
+            # Isi NaN langsung di buffer (kolom tanpa buffer diganti array baru)
+            for nama, default in NILAI_DEFAULT_INDIKATOR.items():
+                if nama in hasil:
+                    kosong = np.isnan(hasil[nama])
+                    if kosong.any():
+                        if buffer is None:
+                            hasil[nama] = np.where(kosong, default, hasil[nama])
+                        else:
+                            hasil[nama][kosong] = default
+            hasil['Sinyal'] = self.aturan.sinyal(skor_sinyal)
+            hasil['Kode_Alasan'] = kode_alasan
+            hasil['Skor_Sinyal'] = skor_sinyal
+        
+        # Kolom masukan dipakai ulang apa adanya; semua array dibungkus tanpa disalin
+        data = {nama: df[nama].to_numpy() for nama in df.columns}
+        data.update(hasil)
+        return pd.DataFrame(data, index=df.index, copy=False)
+
 class AnalisisSahamLengkap:
     """Kelas utama untuk analisis saham yang lengkap"""
     
-    def __init__(self):
+    # Batas waktu (detik) per sumber saat data diambil bersamaan
+    BATAS_WAKTU_SUMBER = {'harga': 30, 'fundamental': 15, 'berita': 8}
+    
+    def __init__(self, cache=None, sumber=None, cache_fundamental=None, cache_sentimen=None, leksikon=None,
+                 aturan=None):
         self.data_saham = None
         self.ticker = None
-        self.analisis_berita = AnalisisBerita()
-        self.analisis_fundamental = AnalisisFundamental()
+        self.cache = cache  # CacheOHLCV opsional untuk data harga
+        # Penyedia data harga, fundamental dan berita (SumberData); default Yahoo Finance
+        self.sumber = sumber if sumber is not None else (cache.sumber if cache is not None else SumberYFinance())
+        self.analisis_berita = AnalisisBerita(cache_sentimen=cache_sentimen, leksikon=leksikon, sumber=self.sumber)
+        self.analisis_fundamental = AnalisisFundamental(cache=cache_fundamental, sumber=self.sumber)
         self.analisis_teknikal = AnalisisTeknikalLengkap()
+        self.aturan = aturan if aturan is not None else ATURAN_SINYAL  # AturanSinyal terkompilasi
+        self._konteks = None  # Memo indikator untuk data_saham saat ini
         
-    def unduh_data_saham(self, kode_saham, periode="6mo"):
+    def unduh_data_saham(self, kode_saham, periode="6mo", interval="1d"):
         """
-        Mengunduh data saham dari Yahoo Finance
+        Mengunduh data saham dari Yahoo Finance (melalui cache lokal jika tersedia)
         """
         try:
             # Untuk saham Indonesia, tambahkan .JK di akhir kode saham
             self.ticker = kode_saham + ".JK"
             print(f"Mengunduh data untuk {self.ticker}...")
-            saham = yf.Ticker(self.ticker)
-            self.data_saham = saham.history(period=periode)
+            self.data_saham = self.ambil_riwayat(self.ticker, periode=periode, interval=interval)
             
-            if self.data_saham.empty:
+            if self.data_saham is None or self.data_saham.empty:
                 print(f"Tidak dapat menemukan data untuk {kode_saham}")
                 return False
                 
@@ -402,90 +1026,84 @@ class AnalisisSahamLengkap:
             print(f"Error mengunduh data: {e}")
             return False
     
-    def hitung_indikator_teknikal(self):
+    @METRIK.diukur('unduh')
+    def ambil_riwayat(self, ticker, periode="6mo", interval="1d"):
         """
-        Menghitung semua indikator teknikal
+        Mengambil riwayat harga lewat cache (jika ada) atau sumber data, tanpa mengubah state
+        """
+        if self.cache is not None:
+            return self.cache.ambil(ticker, periode=periode, interval=interval)
+        return self.sumber.riwayat(ticker, periode=periode, interval=interval)
+    
+    def ambil_data_bersamaan(self, kode_saham, ambil_fundamental=True, ambil_berita=True,
+                             periode="6mo", batas_waktu=None):
+        """
+        Mengambil riwayat harga, fundamental dan berita secara bersamaan dalam satu sesi sumber data
+        (mis. satu objek Ticker untuk ketiganya). Sumber yang melewati batas waktunya dilewati (None)
+        tanpa menahan hasil teknikal.
+        """
+        batas_waktu = {**self.BATAS_WAKTU_SUMBER, **(batas_waktu or {})}
+        ticker = kode_saham + ".JK"
+        
+        # Satu sesi sumber: SumberYFinance memakai satu objek Ticker untuk ketiga pengambilan
+        with self.sumber.sesi(ticker):
+            pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix='ambil-data')
+            mulai = time.perf_counter()
+            tugas = {'harga': pool.submit(self.ambil_riwayat, ticker, periode)}
+            if ambil_fundamental:
+                tugas['fundamental'] = pool.submit(self.analisis_fundamental.ambil_info, ticker)
+            if ambil_berita:
+                tugas['berita'] = pool.submit(self.analisis_berita.unduh_berita, ticker, 10)
+        
+            hasil = {}
+            for nama, future in tugas.items():
+                sisa = max(0.0, batas_waktu[nama] - (time.perf_counter() - mulai))
+                try:
+                    hasil[nama] = future.result(timeout=sisa)
+                except FuturesTimeoutError:
+                    print(f"⚠️  Pengambilan {nama} melebihi batas waktu {batas_waktu[nama]} detik, dilewati")
+                    hasil[nama] = None
+                except Exception as e:
+                    print(f"⚠️  Error mengambil {nama}: {e}")
+                    hasil[nama] = None
+            # Thread yang masih berjalan dibiarkan selesai di latar belakang
+            pool.shutdown(wait=False, cancel_futures=True)
+        hasil['durasi'] = time.perf_counter() - mulai
+        
+        # State hanya diubah di thread utama
+        self.ticker = ticker
+        self.data_saham = hasil['harga']
+        if ambil_fundamental:
+            self.analisis_fundamental.info_saham = hasil['fundamental']
+        if ambil_berita:
+            self.analisis_berita.berita_data = hasil['berita'] or []
+        return hasil
+    
+    def konteks_indikator(self):
+        """
+        Memo indikator untuk data_saham saat ini; dibuat ulang jika data_saham berganti
+        """
+        if self._konteks is None or self._konteks.df is not self.data_saham:
+            self._konteks = GRAF_INDIKATOR.konteks(self.data_saham)
+        return self._konteks
+    
+    @METRIK.diukur('hitung_indikator')
+    def hitung_indikator_teknikal(self, kolom=None):
+        """
+        Menghitung indikator teknikal (semua, atau hanya kolom yang diminta beserta dependensinya)
         """
         if self.data_saham is None or self.data_saham.empty:
             print("Tidak ada data saham yang tersedia")
             return
         
-        df = self.data_saham.copy()
-        
-        # Indikator volume yang sudah ada
-        df['VMA_20'] = df['Volume'].rolling(window=20).mean()
-        # VROC_10 - hindari division by zero
-        volume_shift = df['Volume'].shift(10)
-        df['VROC_10'] = np.where(
-            volume_shift != 0,
-            ((df['Volume'] - volume_shift) / volume_shift) * 100,
-            0
-        )
-        
-        # OBV
-        df['OBV'] = 0
-        for i in range(1, len(df)):
-            if df['Close'].iloc[i] > df['Close'].iloc[i-1]:
-                df['OBV'].iloc[i] = df['OBV'].iloc[i-1] + df['Volume'].iloc[i]
-            elif df['Close'].iloc[i] < df['Close'].iloc[i-1]:
-                df['OBV'].iloc[i] = df['OBV'].iloc[i-1] - df['Volume'].iloc[i]
-            else:
-                df['OBV'].iloc[i] = df['OBV'].iloc[i-1]
-        
-        # VPT
-        df['VPT'] = 0
-        for i in range(1, len(df)):
-            vpt_change = df['Volume'].iloc[i] * ((df['Close'].iloc[i] - df['Close'].iloc[i-1]) / df['Close'].iloc[i-1])
-            df['VPT'].iloc[i] = df['VPT'].iloc[i-1] + vpt_change
-        
-        # MACD
-        exp12 = df['Close'].ewm(span=12, adjust=False).mean()
-        exp26 = df['Close'].ewm(span=26, adjust=False).mean()
-        df['MACD'] = exp12 - exp26
-        df['MACD_Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
-        df['MACD_Histogram'] = df['MACD'] - df['MACD_Signal']
-        
-        # RSI - hindari division by zero
-        delta = df['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = np.where(loss != 0, gain / loss, 0)
-        df['RSI'] = np.where(
-            rs != 0,
-            100 - (100 / (1 + rs)),
-            50  # Default ke tengah jika tidak ada perhitungan
-        )
-        
-        # SMA
-        df['SMA_20'] = df['Close'].rolling(window=20).mean()
-        df['SMA_50'] = df['Close'].rolling(window=50).mean()
-        df['SMA_200'] = df['Close'].rolling(window=200).mean()
-        
-        # EMA
-        df['EMA_12'] = df['Close'].ewm(span=12, adjust=False).mean()
-        df['EMA_26'] = df['Close'].ewm(span=26, adjust=False).mean()
-        
-        # Bollinger Bands
-        df = self.analisis_teknikal.bollinger_bands(df)
-        
-        # Stochastic
-        df = self.analisis_teknikal.stochastic_oscillator(df)
-        
-        # ADX
-        df = self.analisis_teknikal.adx(df)
-        
-        # Williams %R
-        df = self.analisis_teknikal.williams_r(df)
-        
-        # CCI
-        df = self.analisis_teknikal.cci(df)
-        
-        # ATR
-        df = self.analisis_teknikal.atr(df)
+        # Tipe asli kernel dan tanpa menyalin data_saham; default semua kolom termasuk perantara
+        df = PipelineIndikator(perantara=True, aturan=self.aturan, kolom=kolom).jalankan(
+            self.data_saham, sinyal=False, konteks=self.konteks_indikator())
         
         self.data_saham = df
         return df
     
+    @METRIK.diukur('generate_sinyal')
     def generate_sinyal_lengkap(self):
         """
         Menghasilkan sinyal beli/jual dengan analisis yang lebih lengkap
@@ -494,149 +1112,38 @@ class AnalisisSahamLengkap:
             print("Tidak ada data saham yang tersedia")
             return None
         
-        df = self.data_saham.copy()
-        
-        # Inisialisasi kolom sinyal
-        df['Sinyal'] = 'Tahan'
-        df['Alasan'] = ''
-        df['Skor_Sinyal'] = 0  # Skor untuk mengukur kekuatan sinyal
-        
-        # Aturan untuk sinyal beli (dengan skor)
-        skor_beli = 0
-        
-        # Kondisi 1: Volume tinggi dengan harga menguat
-        kondisi_beli_1 = (
-            (df['Volume'] > 1.5 * df['VMA_20']) & 
-            (df['Close'] > df['Open']) &
-            (df['VROC_10'] > 20)
-        )
-        df.loc[kondisi_beli_1, 'Skor_Sinyal'] += 2
-        df.loc[kondisi_beli_1, 'Alasan'] += 'Volume tinggi dengan harga menguat. '
-        
-        # Kondisi 2: MACD bullish
-        kondisi_beli_2 = (
-            (df['MACD'] > df['MACD_Signal']) &
-            (df['RSI'] < 70) &
-            (df['RSI'] > 30) &
-            (df['Close'] > df['SMA_20'])
-        )
-        df.loc[kondisi_beli_2, 'Skor_Sinyal'] += 2
-        df.loc[kondisi_beli_2, 'Alasan'] += 'Konfirmasi bullish dari MACD dan RSI. '
+        # Salinan dangkal: kolom baru ditambahkan tanpa menyalin kolom indikator yang ada
+        df = self.data_saham.copy(deep=False)
         
-        # Kondisi 3: OBV trending up
-        kondisi_beli_3 = (
-            (df['OBV'] > df['OBV'].shift(5)) &
-            (df['SMA_20'] > df['SMA_50'])
-        )
-        df.loc[kondisi_beli_3, 'Skor_Sinyal'] += 1
-        df.loc[kondisi_beli_3, 'Alasan'] += 'Momentum positif dari OBV. '
-        
-        # Kondisi 4: Bollinger Bands - harga mendekati lower band
-        kondisi_beli_4 = (
-            (df['BB_Position'] < 0.2) &
-            (df['RSI'] < 50) &
-            (df['Close'] > df['BB_Lower'])
-        )
-        df.loc[kondisi_beli_4, 'Skor_Sinyal'] += 1
-        df.loc[kondisi_beli_4, 'Alasan'] += 'Harga mendekati support (BB Lower). '
-        
-        # Kondisi 5: Stochastic oversold
-        kondisi_beli_5 = (
-            (df['%K'] < 20) &
-            (df['%D'] < 20) &
-            (df['%K'] > df['%D'])
-        )
-        df.loc[kondisi_beli_5, 'Skor_Sinyal'] += 1
-        df.loc[kondisi_beli_5, 'Alasan'] += 'Stochastic oversold dengan potensi reversal. '
-        
-        # Kondisi 6: ADX menunjukkan trend kuat
-        kondisi_beli_6 = (
-            (df['ADX'] > 25) &
-            (df['+DI'] > df['-DI']) &
-            (df['Close'] > df['SMA_20'])
-        )
-        df.loc[kondisi_beli_6, 'Skor_Sinyal'] += 1
-        df.loc[kondisi_beli_6, 'Alasan'] += 'Trend bullish kuat (ADX). '
-        
-        # Aturan untuk sinyal jual
-        # Kondisi 1: Volume tinggi dengan harga melemah
-        kondisi_jual_1 = (
-            (df['Volume'] > 1.5 * df['VMA_20']) & 
-            (df['Close'] < df['Open']) &
-            (df['VROC_10'] < -20)
-        )
-        df.loc[kondisi_jual_1, 'Skor_Sinyal'] -= 2
-        df.loc[kondisi_jual_1, 'Alasan'] += 'Volume tinggi dengan harga melemah. '
-        
-        # Kondisi 2: MACD bearish
-        kondisi_jual_2 = (
-            (df['MACD'] < df['MACD_Signal']) &
-            (df['RSI'] > 30) &
-            (df['RSI'] < 70) &
-            (df['Close'] < df['SMA_20'])
-        )
-        df.loc[kondisi_jual_2, 'Skor_Sinyal'] -= 2
-        df.loc[kondisi_jual_2, 'Alasan'] += 'Konfirmasi bearish dari MACD dan RSI. '
-        
-        # Kondisi 3: OBV trending down
-        kondisi_jual_3 = (
-            (df['OBV'] < df['OBV'].shift(5)) &
-            (df['SMA_20'] < df['SMA_50'])
-        )
-        df.loc[kondisi_jual_3, 'Skor_Sinyal'] -= 1
-        df.loc[kondisi_jual_3, 'Alasan'] += 'Momentum negatif dari OBV. '
-        
-        # Kondisi 4: Bollinger Bands - harga mendekati upper band
-        kondisi_jual_4 = (
-            (df['BB_Position'] > 0.8) &
-            (df['RSI'] > 50) &
-            (df['Close'] < df['BB_Upper'])
-        )
-        df.loc[kondisi_jual_4, 'Skor_Sinyal'] -= 1
-        df.loc[kondisi_jual_4, 'Alasan'] += 'Harga mendekati resistance (BB Upper). '
-        
-        # Kondisi 5: Stochastic overbought
-        kondisi_jual_5 = (
-            (df['%K'] > 80) &
-            (df['%D'] > 80) &
-            (df['%K'] < df['%D'])
-        )
-        df.loc[kondisi_jual_5, 'Skor_Sinyal'] -= 1
-        df.loc[kondisi_jual_5, 'Alasan'] += 'Stochastic overbought dengan potensi reversal. '
-        
-        # Kondisi 6: ADX menunjukkan trend bearish kuat
-        kondisi_jual_6 = (
-            (df['ADX'] > 25) &
-            (df['-DI'] > df['+DI']) &
-            (df['Close'] < df['SMA_20'])
-        )
-        df.loc[kondisi_jual_6, 'Skor_Sinyal'] -= 1
-        df.loc[kondisi_jual_6, 'Alasan'] += 'Trend bearish kuat (ADX). '
-        
-        # Tentukan sinyal berdasarkan skor
-        df.loc[df['Skor_Sinyal'] >= 3, 'Sinyal'] = 'Beli'
-        df.loc[df['Skor_Sinyal'] <= -3, 'Sinyal'] = 'Jual'
-        df.loc[(df['Skor_Sinyal'] > -3) & (df['Skor_Sinyal'] < 3), 'Sinyal'] = 'Tahan'
+        # Evaluasi semua aturan beli (skor positif) dan jual (skor negatif) dalam satu fungsi
+        # terkompilasi; setiap aturan yang terpenuhi disimpan sebagai satu bit, teks alasan
+        # di-decode saat ditampilkan
+        kurang = [nama for nama in self.aturan.kolom if nama not in df.columns]
+        if kurang:
+            raise ValueError(f"Kolom untuk aturan sinyal tidak tersedia: {', '.join(kurang)}")
+        kode_alasan, skor_sinyal = self.aturan.evaluasi({nama: df[nama].to_numpy() for nama in self.aturan.kolom})
+        df['Sinyal'] = self.aturan.sinyal(skor_sinyal)
+        df['Kode_Alasan'] = kode_alasan
+        df['Skor_Sinyal'] = skor_sinyal  # Skor untuk mengukur kekuatan sinyal
         
         # Fill NaN values dengan nilai default yang aman
-        df = df.fillna({
-            'RSI': 50,
-            'MACD': 0,
-            'MACD_Signal': 0,
-            '%K': 50,
-            '%D': 50,
-            'ADX': 0,
-            '+DI': 0,
-            '-DI': 0,
-            'Williams_R': -50,
-            'CCI': 0,
-            'ATR': 0,
-            'BB_Position': 0.5,
-            'VROC_10': 0
-        })
+        df = df.fillna(NILAI_DEFAULT_INDIKATOR)
         
         return df
     
+    @METRIK.diukur('sinyal_pipeline')
+    def hitung_sinyal_pipeline(self, perantara=False, dtype=np.float64, kolom=None):
+        """
+        Mode pipeline untuk scan massal: indikator dan sinyal dihitung langsung dari data_saham ke
+        satu buffer (float64 atau float32) tanpa kolom perantara, kecuali diminta. Dengan kolom,
+        hanya kolom tersebut dan kolom yang dibutuhkan aturan sinyal yang dihitung.
+        """
+        if self.data_saham is None or self.data_saham.empty:
+            print("Tidak ada data saham yang tersedia")
+            return None
+        return PipelineIndikator(perantara=perantara, dtype=dtype, aturan=self.aturan, kolom=kolom).jalankan(
+            self.data_saham, konteks=self.konteks_indikator())
+    
     def rekomendasi_trading_lengkap(self, df_sinyal, kode_saham, ringkasan_berita=None):
         """
         Memberikan rekomendasi trading yang lebih detail dengan integrasi berita
@@ -752,7 +1259,7 @@ class AnalisisSahamLengkap:
         print(f"\n🎯 REKOMENDASI:")
         sinyal = latest.get('Sinyal', 'Tahan')
         skor = latest.get('Skor_Sinyal', 0)
-        alasan = latest.get('Alasan', '')
+        alasan = decode_alasan(latest.get('Kode_Alasan', 0), self.aturan)
         
         print(f"   Sinyal              : {sinyal}")
         if pd.notna(skor):
@@ -783,8 +1290,8 @@ class AnalisisSahamLengkap:
         if sinyal_value == 'Beli':
             close_val = latest.get('Close', 0)
             if pd.notna(close_val) and close_val > 0:
-                target_price = close_val * 1.08
-                stop_loss = close_val * 0.95
+                target_price = close_val * (1 + TARGET_PERSEN)
+                stop_loss = close_val * (1 - STOP_PERSEN)
                 
                 print(f"\n💰 TARGET & RISK MANAGEMENT:")
                 print(f"   Target Price       : Rp {target_price:,.2f} (+{((target_price/close_val)-1)*100:.1f}%)")
@@ -809,8 +1316,8 @@ class AnalisisSahamLengkap:
         elif sinyal_value == 'Jual':
             close_val = latest.get('Close', 0)
             if pd.notna(close_val) and close_val > 0:
-                target_price = close_val * 0.92
-                stop_loss = close_val * 1.05
+                target_price = close_val * (1 - TARGET_PERSEN)
+                stop_loss = close_val * (1 + STOP_PERSEN)
                 
                 print(f"\n💰 TARGET & RISK MANAGEMENT:")
                 print(f"   Target Price       : Rp {target_price:,.2f} (-{((1-target_price/close_val))*100:.1f}%)")
@@ -860,7 +1367,7 @@ class AnalisisSahamLengkap:
         print(f"{'='*70}")
         
         for i, berita in enumerate(berita_list[:max_tampil], 1):
-            sentimen, skor = self.analisis_berita.analisis_sentimen(berita['title'])
+            sentimen, skor = self.analisis_berita.sentimen_berita(berita)
             emoji = "📈" if sentimen == 'Positif' else "📉" if sentimen == 'Negatif' else "📊"
             
             print(f"\n{emoji} Berita #{i}:")
@@ -901,8 +1408,6 @@ class AnalisisSahamLengkap:
             # RSI
             if 'RSI' in df_sinyal.columns and df_sinyal['RSI'].notna().any():
                 apds.append(mpf.make_addplot(df_sinyal['RSI'], panel=2, color='purple', width=1, ylim=[0, 100]))
-                apds.append(mpf.make_addplot([70] * len(df_sinyal), panel=2, color='red', width=0.5, linestyle='--'))
-                apds.append(mpf.make_addplot([30] * len(df_sinyal), panel=2, color='green', width=0.5, linestyle='--'))
             
             # MACD
             if 'MACD' in df_sinyal.columns and df_sinyal['MACD'].notna().any():
@@ -915,35 +1420,35 @@ class AnalisisSahamLengkap:
                 apds.append(mpf.make_addplot(df_sinyal['%K'], panel=4, color='blue', width=1, label='%K'))
             if '%D' in df_sinyal.columns and df_sinyal['%D'].notna().any():
                 apds.append(mpf.make_addplot(df_sinyal['%D'], panel=4, color='red', width=1, label='%D'))
-                apds.append(mpf.make_addplot([80] * len(df_sinyal), panel=4, color='red', width=0.5, linestyle='--'))
-                apds.append(mpf.make_addplot([20] * len(df_sinyal), panel=4, color='green', width=0.5, linestyle='--'))
             
             # Tandai sinyal beli dan jual
             if 'Sinyal' in df_sinyal.columns:
-                beli_titik = df_sinyal[df_sinyal['Sinyal'] == 'Beli']
-                jual_titik = df_sinyal[df_sinyal['Sinyal'] == 'Jual']
+                # Penanda dibuat sepanjang data (NaN di bar tanpa sinyal) agar panjangnya sama dengan df_sinyal
+                beli = df_sinyal['Sinyal'] == 'Beli'
+                jual = df_sinyal['Sinyal'] == 'Jual'
                 
-                if not beli_titik.empty and 'Low' in beli_titik.columns:
-                    apds.append(mpf.make_addplot(beli_titik['Low'] * 0.99, type='scatter', 
+                if beli.any():
+                    apds.append(mpf.make_addplot(df_sinyal['Low'].where(beli) * 0.99, type='scatter', 
                                                 markersize=50, marker='^', color='green', panel=0))
                 
-                if not jual_titik.empty and 'High' in jual_titik.columns:
-                    apds.append(mpf.make_addplot(jual_titik['High'] * 1.01, type='scatter', 
+                if jual.any():
+                    apds.append(mpf.make_addplot(df_sinyal['High'].where(jual) * 1.01, type='scatter', 
                                                 markersize=50, marker='v', color='red', panel=0))
             
-            # Buat plot
-            fig, axes = mpf.plot(df_sinyal, 
-                                type='candle', 
-                                style='charles',
-                                addplot=apds if apds else None,
-                                title=f'Analisis Teknikal Lengkap - {kode_saham}',
-                                ylabel='Harga (Rp)',
-                                volume=True,
-                                ylabel_lower='Volume',
-                                figratio=(14, 10),
-                                returnfig=True)
+            # Buat plot (hanya pembuatan figure yang diukur, bukan jendela plt.show() yang menunggu pengguna)
+            with METRIK.tahap('plot', baris=len(df_sinyal)):
+                fig, axes = mpf.plot(df_sinyal, 
+                                    type='candle', 
+                                    style='charles',
+                                    addplot=apds if apds else None,
+                                    title=f'Analisis Teknikal Lengkap - {kode_saham}',
+                                    ylabel='Harga (Rp)',
+                                    volume=True,
+                                    ylabel_lower='Volume',
+                                    figratio=(14, 10),
+                                    returnfig=True)
             
-            # Tambahkan label dengan error handling
+            # Garis bantu 70/30 dan 80/20 digambar sebagai axhline (bukan deret konstan sepanjang data)
             try:
                 if len(axes) > 2 and 'RSI' in df_sinyal.columns:
                     axes[2].axhline(y=70, color='r', linestyle='--', alpha=0.5)
@@ -982,15 +1487,19 @@ class AnalisisSahamLengkap:
         print(f"ANALISIS SAHAM LENGKAP - {kode_saham}")
         print(f"{'='*70}")
         
-        # Unduh data saham
-        if not self.unduh_data_saham(kode_saham):
+        # Unduh data harga, fundamental dan berita secara bersamaan
+        print(f"Mengunduh data untuk {kode_saham}.JK...")
+        data = self.ambil_data_bersamaan(kode_saham, ambil_fundamental=tampilkan_fundamental,
+                                         ambil_berita=tampilkan_berita)
+        if self.data_saham is None or self.data_saham.empty:
+            print(f"Tidak dapat menemukan data untuk {kode_saham}")
             return None
+        print(f"Berhasil mengunduh data untuk {kode_saham} ({data['durasi']:.2f} detik)")
         
         # Analisis fundamental
         if tampilkan_fundamental:
             try:
-                print("\n📊 Mengambil data fundamental...")
-                self.analisis_fundamental.ambil_data_fundamental(self.ticker)
+                print("\n📊 Data fundamental...")
                 if self.analisis_fundamental.info_saham:
                     self.analisis_fundamental.tampilkan_fundamental(kode_saham)
                 else:
@@ -1002,8 +1511,8 @@ class AnalisisSahamLengkap:
         ringkasan_berita = None
         if tampilkan_berita:
             try:
-                print("\n📰 Mengambil berita terkini...")
-                berita_list = self.analisis_berita.ambil_berita(self.ticker, max_berita=10)
+                print("\n📰 Berita terkini...")
+                berita_list = self.analisis_berita.berita_data
                 if berita_list:
                     ringkasan_berita = self.analisis_berita.ringkasan_sentimen_berita(berita_list)
                     self.tampilkan_berita(berita_list, max_tampil=5)
@@ -1044,9 +1553,33 @@ class AnalisisSahamLengkap:
         
         return df_sinyal
 
-def main():
+def pasang_dependensi(pustaka=None):
+    """
+    Memasang library opsional yang belum terpasang memakai pip dari interpreter yang sedang berjalan
+    """
+    pustaka = pustaka if pustaka is not None else PUSTAKA_OPSIONAL
+    kurang = [pip_name for lib_name, pip_name in pustaka.items() if not modul_tersedia(lib_name)]
+    for pip_name in kurang:
+        print(f"Menginstall library {pip_name}...")
+        subprocess.run([sys.executable, '-m', 'pip', 'install', pip_name], check=False)
+    return kurang
+
+def main(gunakan_cache=True, offline=False, path_leksikon=None, path_aturan=None, tampilkan_metrik=False,
+         direktori_sumber=None):
+    if not modul_tersedia('textblob'):
+        print("TextBlob tidak tersedia. Menggunakan analisis sentimen sederhana.")
+    
     # Inisialisasi analyzer
-    analyzer = AnalisisSahamLengkap()
+    leksikon = LeksikonSentimen.dari_file(path_leksikon) if path_leksikon else None
+    aturan = AturanSinyal.dari_file(path_aturan) if path_aturan else None
+    # Sumber file lokal (harga, fundamental dan berita hasil rekaman) sudah lokal sehingga tanpa cache
+    sumber = SumberCSV(direktori_sumber) if direktori_sumber else None
+    gunakan_cache = gunakan_cache and sumber is None
+    cache = CacheOHLCV(offline=offline) if gunakan_cache else None
+    cache_fundamental = CacheFundamental(offline=offline) if gunakan_cache else None
+    cache_sentimen = CacheSentimen() if gunakan_cache else None
+    analyzer = AnalisisSahamLengkap(cache=cache, sumber=sumber, cache_fundamental=cache_fundamental,
+                                    cache_sentimen=cache_sentimen, leksikon=leksikon, aturan=aturan)
     
     # Header program
     os.system('cls' if os.name == 'nt' else 'clear')
@@ -1055,14 +1588,22 @@ def main():
     print("Program untuk analisis saham dengan teknikal, fundamental, dan berita")
     print(f"{'='*70}")
     
-    # Daftar saham populer Indonesia
-    saham_populer = ['BBCA', 'TLKM', 'BBRI', 'ASII', 'UNVR', 'ICBP', 'EXCL', 'ADRO', 'ANTM', 'BMRI']
-    
     while True:
-        print(f"\nSaham populer: {', '.join(saham_populer)}")
+        print(f"\nSaham populer: {', '.join(SAHAM_POPULER)}")
         kode_saham = input("\nMasukkan kode saham (atau 'quit' untuk keluar): ").strip().upper()
         
         if kode_saham.lower() == 'quit':
+            if cache is not None:
+                stat = cache.statistik()
+                print(f"Cache data: {stat['hit']} hit, {stat['refresh']} refresh, {stat['miss']} miss, "
+                      f"{stat['jumlah_entri']} ticker ({stat['ukuran_byte'] / 1024:.0f} KB)")
+                stat = cache_fundamental.statistik()
+                print(f"Cache fundamental: {stat['hit_memori'] + stat['hit_disk']} hit, {stat['miss']} miss")
+                stat = cache_sentimen.statistik()
+                print(f"Cache sentimen: {stat['hit']} hit, {stat['miss']} miss "
+                      f"({stat['rasio_hit'] * 100:.0f}% hit, {stat['jumlah_entri']} judul)")
+            if tampilkan_metrik:
+                METRIK.tampilkan()
             print("Terima kasih telah menggunakan program analisis saham!")
             break
         
@@ -1095,7 +1636,7 @@ def main():
                     if simpan == 'y':
                         try:
                             nama_file = f"analisis_{kode_saham}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-                            df_sinyal.to_csv(nama_file)
+                            tambah_kolom_alasan(df_sinyal, analyzer.aturan).to_csv(nama_file)
                             print(f"Hasil analisis disimpan sebagai {nama_file}")
                         except Exception as e:
                             print(f"⚠️  Error menyimpan file: {e}")
@@ -1109,18 +1650,26 @@ def main():
             traceback.print_exc()
 
 if __name__ == "__main__":
-    # Install library tambahan jika belum ada
-    libraries = {
-        'mplfinance': 'mplfinance',
-        'textblob': 'textblob',
-        'requests': 'requests'
-    }
-    
-    for lib_name, pip_name in libraries.items():
-        try:
-            __import__(lib_name)
-        except ImportError:
-            print(f"Menginstall library {pip_name}...")
-            os.system(f'pip install {pip_name}')
+    import argparse
+    parser = argparse.ArgumentParser(description="Analisis Saham Indonesia")
+    parser.add_argument('--offline', action='store_true', help='Gunakan data dari cache lokal saja')
+    parser.add_argument('--tanpa-cache', action='store_true', help='Selalu unduh data tanpa cache lokal')
+    parser.add_argument('--leksikon', help='File JSON leksikon sentimen (dipakai jika TextBlob tidak tersedia)')
+    parser.add_argument('--sumber-csv', metavar='DIREKTORI',
+                        help='Gunakan data lokal tanpa jaringan (ekspor analisis_*.csv, penyimpanan kolom, fundamental dan berita rekaman)')
+    parser.add_argument('--aturan', help='File JSON aturan sinyal (default: aturan_sinyal.json)')
+    parser.add_argument('--pasang-dependensi', action='store_true',
+                        help='Pasang library opsional yang belum ada (mplfinance, textblob) sebelum mulai')
+    parser.add_argument('--metrik', action='store_true', help='Tampilkan ringkasan waktu per tahap saat keluar')
+    parser.add_argument('--metrik-log', help='Tambahkan metrik setiap tahap ke file JSON Lines')
+    parser.add_argument('--metrik-prometheus', help='Tulis metrik tahap ke file teks format Prometheus')
+    parser.add_argument('--metrik-alokasi', action='store_true',
+                        help='Ukur juga puncak alokasi memori per tahap dengan tracemalloc (lebih lambat)')
+    args = parser.parse_args()
+    
+    if args.pasang_dependensi:
+        pasang_dependensi()
+    METRIK.atur(path_log=args.metrik_log, path_prometheus=args.metrik_prometheus, ukur_alokasi=args.metrik_alokasi)
     
-    main()
+    main(gunakan_cache=not args.tanpa_cache, offline=args.offline, path_leksikon=args.leksikon,
+         path_aturan=args.aturan, tampilkan_metrik=args.metrik, direktori_sumber=args.sumber_csv)
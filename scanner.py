@@ -0,0 +1,324 @@
+"""
+Scanner universe saham: menjalankan pipeline unduh -> indikator -> sinyal untuk banyak ticker
+secara paralel dan mengurutkannya berdasarkan Skor_Sinyal.
+
+Contoh:
+    python scanner.py --daftar daftar_idx.txt --workers 8 --simpan hasil_scan.csv
+    python scanner.py BBCA TLKM BBRI --offline
+"""
+import argparse
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from cache_data import CacheOHLCV, CacheFundamental, DIREKTORI_CACHE_DEFAULT
+from saham import AnalisisSahamLengkap, SAHAM_POPULER, decode_alasan
+from panel import Panel, PipelinePanel
+from sumber_data import SumberCSV, SumberYFinance
+from aturan_sinyal import AturanSinyal
+
+# Kolom ringkasan yang diambil dari bar terakhir setiap ticker
+KOLOM_RINGKASAN = ['Close', 'Volume', 'RSI', 'MACD', 'MACD_Signal', 'ADX', '%K', 'VROC_10', 'BB_Position']
+
+# Field saham.info yang ditambahkan ke tabel jika scan menyertakan fundamental
+KOLOM_FUNDAMENTAL = {
+    'trailingPE': 'PE', 'priceToBook': 'PBV', 'marketCap': 'Market_Cap',
+    'profitMargins': 'Profit_Margin', 'returnOnEquity': 'ROE',
+}
+
+# Analyzer dan tipe data hasil per proses worker (dibuat sekali oleh initializer)
+_analyzer = None
+_dtype = np.float64
+
+def inisialisasi_worker(gunakan_cache, direktori_cache, offline, sumber, path_aturan=None, dtype=np.float64):
+    """
+    Initializer process pool: membuat satu analyzer (dengan cache dan aturan sinyal) per proses worker
+    """
+    global _analyzer, _dtype
+    _dtype = dtype
+    cache = CacheOHLCV(direktori_cache, offline=offline, sumber=sumber) if gunakan_cache else None
+    # Aturan dikompilasi di setiap worker (fungsi hasil kompilasi tidak dapat di-pickle)
+    aturan = AturanSinyal.dari_file(path_aturan) if path_aturan else None
+    _analyzer = AnalisisSahamLengkap(cache=cache, sumber=sumber, aturan=aturan)
+
+def analyzer_worker():
+    """
+    Analyzer milik proses worker saat ini (dibuat oleh inisialisasi_worker)
+    """
+    return _analyzer
+
+def _hasil_gagal(kode, pesan):
+    return {'Kode': kode, 'Error': pesan}
+
+def jalankan_paralel(fungsi, daftar_kode, argumen=lambda kode: (), workers=None, initializer=inisialisasi_worker,
+                     initargs=(), gagal=_hasil_gagal, tampilkan_progres=False):
+    """
+    Menjalankan fungsi(kode, *argumen(kode)) untuk setiap kode di process pool.
+    Mengembalikan list hasil menurut urutan selesai; worker yang mati (mis. kehabisan memori) tetap
+    dicatat sebagai kegagalan ticker lewat gagal(kode, pesan).
+    """
+    hasil = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=initializer,
+                             initargs=initargs) as pool:
+        futures = {pool.submit(fungsi, kode, *argumen(kode)): kode for kode in daftar_kode}
+        for i, future in enumerate(as_completed(futures), 1):
+            try:
+                hasil.append(future.result())
+            except Exception as e:
+                hasil.append(gagal(futures[future], f"{type(e).__name__}: {e}"))
+            if tampilkan_progres and (i % 50 == 0 or i == len(futures)):
+                print(f"   {i}/{len(futures)} ticker selesai...")
+    return hasil
+
+def statistik_pindai(jumlah_ticker, berhasil, gagal, waktu_total, waktu_unduh, workers, **tambahan):
+    """
+    Statistik waktu standar satu pemindaian universe (tambahan: kolom khusus pemanggil)
+    """
+    return {
+        'jumlah_ticker': jumlah_ticker,
+        'berhasil': berhasil,
+        'gagal': gagal,
+        **tambahan,
+        'waktu_total': waktu_total,
+        'waktu_unduh': waktu_unduh,
+        'ticker_per_detik': jumlah_ticker / waktu_total if waktu_total > 0 else 0.0,
+        'workers': workers,
+    }
+
+def analisis_ticker(kode_saham, periode='6mo', data=None):
+    """
+    Menjalankan pipeline untuk satu ticker dan mengembalikan ringkasan bar terakhir.
+    Jika `data` diberikan (hasil unduhan massal), langkah unduh dilewati.
+    Kegagalan dikembalikan sebagai kolom Error, tidak dilempar ke pemanggil.
+    """
+    mulai = time.perf_counter()
+    hasil = {'Kode': kode_saham}
+    try:
+        # Pesan progres per ticker tidak ditampilkan agar keluaran scanner tetap rapi
+        with contextlib.redirect_stdout(io.StringIO()):
+            if data is not None:
+                _analyzer.ticker = kode_saham + ".JK"
+                _analyzer.data_saham = data
+            elif not _analyzer.unduh_data_saham(kode_saham, periode=periode):
+                raise ValueError("data tidak tersedia")
+            # Mode pipeline: hanya kolom ringkasan dan kolom aturan yang dihitung, tanpa salinan frame
+            df_sinyal = _analyzer.hitung_sinyal_pipeline(dtype=_dtype, kolom=KOLOM_RINGKASAN + ['VMA_20'])
+        if df_sinyal is None or df_sinyal.empty:
+            raise ValueError("sinyal tidak dapat dihitung")
+
+        latest = df_sinyal.iloc[-1]
+        hasil['Tanggal'] = df_sinyal.index[-1]
+        hasil['Sinyal'] = latest['Sinyal']
+        hasil['Skor_Sinyal'] = int(latest['Skor_Sinyal'])
+        for kolom in KOLOM_RINGKASAN:
+            hasil[kolom] = latest.get(kolom, np.nan)
+        vma_20 = latest.get('VMA_20', np.nan)
+        hasil['Rasio_Volume'] = latest['Volume'] / vma_20 if pd.notna(vma_20) and vma_20 != 0 else np.nan
+        hasil['Alasan'] = decode_alasan(latest.get('Kode_Alasan', 0), _analyzer.aturan)
+        hasil['Error'] = ''
+    except Exception as e:
+        hasil['Error'] = f"{type(e).__name__}: {e}"
+    hasil['Durasi_Detik'] = time.perf_counter() - mulai
+    return hasil
+
+def unduh_massal(daftar_kode, periode='6mo', gunakan_cache=True,
+                 direktori_cache=DIREKTORI_CACHE_DEFAULT, offline=False, sumber=None):
+    """
+    Mengambil data semua ticker dengan request massal sebelum analisis paralel.
+    Dengan cache, data ditulis ke cache dan worker membacanya dari disk (dikembalikan {}).
+    Tanpa cache, dict kode -> DataFrame dikembalikan untuk diteruskan ke worker.
+    """
+    sumber = sumber if sumber is not None else SumberYFinance()
+    tickers = [kode + '.JK' for kode in daftar_kode]
+    with contextlib.redirect_stdout(io.StringIO()):
+        if gunakan_cache:
+            if not offline:
+                CacheOHLCV(direktori_cache, sumber=sumber).ambil_banyak(tickers, periode=periode)
+            return {}
+        data = sumber.riwayat_banyak(tickers, periode=periode)
+    return {ticker[:-3]: df for ticker, df in data.items()}
+
+def pindai_universe(daftar_kode, workers=None, periode='6mo', gunakan_cache=True,
+                    direktori_cache=DIREKTORI_CACHE_DEFAULT, offline=False, tampilkan_progres=True,
+                    sumber=None, path_aturan=None, dtype=np.float64):
+    """
+    Memindai banyak ticker di process pool.
+    Mengembalikan (tabel peringkat, tabel gagal, statistik waktu).
+    """
+    mulai = time.perf_counter()
+    workers = workers or os.cpu_count()
+    data = unduh_massal(daftar_kode, periode=periode, gunakan_cache=gunakan_cache,
+                        direktori_cache=direktori_cache, offline=offline, sumber=sumber)
+    waktu_unduh = time.perf_counter() - mulai
+    # Tanpa cache, ticker yang tidak ada di hasil unduhan massal dicoba lagi satu per satu oleh worker
+    hasil = jalankan_paralel(analisis_ticker, daftar_kode, lambda kode: (periode, data.get(kode)), workers=workers,
+                             initargs=(gunakan_cache, direktori_cache, offline, sumber, path_aturan, dtype),
+                             tampilkan_progres=tampilkan_progres)
+
+    return _peringkat(hasil, len(daftar_kode), time.perf_counter() - mulai, waktu_unduh, workers)
+
+def pindai_panel(daftar_kode, periode='6mo', gunakan_cache=True, direktori_cache=DIREKTORI_CACHE_DEFAULT,
+                 offline=False, sumber=None, path_aturan=None):
+    """
+    Memindai banyak ticker dalam satu proses memakai mode panel: semua data disejajarkan menjadi
+    array (tanggal x ticker) lalu setiap indikator dihitung sekali untuk seluruh universe.
+    Mengembalikan (tabel peringkat, tabel gagal, statistik waktu) seperti pindai_universe.
+    """
+    mulai = time.perf_counter()
+    sumber = sumber if sumber is not None else SumberYFinance()
+    tickers = [kode + '.JK' for kode in daftar_kode]
+    with contextlib.redirect_stdout(io.StringIO()):
+        if gunakan_cache:
+            data = CacheOHLCV(direktori_cache, offline=offline, sumber=sumber).ambil_banyak(tickers, periode=periode)
+        else:
+            data = sumber.riwayat_banyak(tickers, periode=periode)
+    waktu_unduh = time.perf_counter() - mulai
+
+    aturan = AturanSinyal.dari_file(path_aturan) if path_aturan else None
+    data = {ticker[:-3]: df for ticker, df in data.items() if df is not None and not df.empty}
+    hasil = [{'Kode': kode, 'Error': 'ValueError: data tidak tersedia'} for kode in daftar_kode if kode not in data]
+    if data:
+        mulai_hitung = time.perf_counter()
+        panel = PipelinePanel(aturan=aturan, kolom=KOLOM_RINGKASAN + ['VMA_20']).jalankan(Panel.dari_frame(data))
+        terakhir = panel.terakhir(['Sinyal', 'Skor_Sinyal', 'Kode_Alasan', 'VMA_20'] + KOLOM_RINGKASAN)
+        durasi = (time.perf_counter() - mulai_hitung) / len(data)
+        for kode, baris in terakhir.iterrows():
+            vma_20 = baris['VMA_20']
+            hasil.append({
+                'Kode': kode, 'Tanggal': baris['Tanggal'], 'Sinyal': baris['Sinyal'],
+                'Skor_Sinyal': int(baris['Skor_Sinyal']),
+                **{kolom: baris[kolom] for kolom in KOLOM_RINGKASAN},
+                'Volume': int(baris['Volume']),  # Panel menyimpan Volume sebagai float (NaN untuk tanggal kosong)
+                'Rasio_Volume': baris['Volume'] / vma_20 if pd.notna(vma_20) and vma_20 != 0 else np.nan,
+                'Alasan': decode_alasan(baris['Kode_Alasan'], aturan),
+                'Error': '', 'Durasi_Detik': durasi,
+            })
+    return _peringkat(hasil, len(daftar_kode), time.perf_counter() - mulai, waktu_unduh, 1)
+
+def _peringkat(hasil, jumlah_ticker, waktu_total, waktu_unduh, workers):
+    """
+    Memisahkan ticker gagal, mengurutkan ticker berhasil berdasarkan Skor_Sinyal dan menyusun statistik
+    """
+    df = pd.DataFrame(hasil)
+    gagal = df[df['Error'] != ''].reset_index(drop=True)
+    berhasil = df[df['Error'] == ''].drop(columns='Error')
+    if not berhasil.empty:
+        berhasil['Skor_Sinyal'] = berhasil['Skor_Sinyal'].astype(int)
+        berhasil = berhasil.sort_values(['Skor_Sinyal', 'Rasio_Volume'], ascending=[False, False])
+    berhasil = berhasil.reset_index(drop=True)
+    berhasil.index = berhasil.index + 1
+
+    return berhasil, gagal, statistik_pindai(jumlah_ticker, len(berhasil), len(gagal), waktu_total, waktu_unduh, workers)
+
+def tambah_fundamental(berhasil, gunakan_cache=True, direktori_cache=DIREKTORI_CACHE_DEFAULT, offline=False,
+                       sumber=None):
+    """
+    Menambahkan kolom fundamental utama ke tabel hasil scan lewat lookup massal
+    """
+    if berhasil.empty:
+        return berhasil
+    tickers = [kode + '.JK' for kode in berhasil['Kode']]
+    if sumber is not None:
+        # Sumber lokal (SumberCSV): fundamental hasil rekaman dibaca langsung tanpa cache
+        info = {ticker: sumber.info(ticker) or {} for ticker in tickers}
+    else:
+        cache = CacheFundamental(os.path.join(direktori_cache, 'fundamental'), offline=offline,
+                                 ttl=24 * 3600 if gunakan_cache else 0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            info = cache.ambil_banyak(tickers)
+    for field, kolom in KOLOM_FUNDAMENTAL.items():
+        berhasil[kolom] = [info.get(kode + '.JK', {}).get(field, np.nan) for kode in berhasil['Kode']]
+    return berhasil
+
+def baca_daftar_kode(path):
+    """
+    Membaca daftar kode saham dari file teks (satu kode per baris, '#' untuk komentar)
+    """
+    daftar = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for baris in f:
+            kode = baris.split('#', 1)[0].strip().upper()
+            if kode:
+                daftar.append(kode.removesuffix('.JK'))
+    return daftar
+
+def tampilkan_hasil(berhasil, gagal, statistik, maks_baris=30):
+    """
+    Menampilkan tabel peringkat dan ringkasan waktu scan
+    """
+    print(f"\n{'='*70}")
+    print(f"HASIL SCAN UNIVERSE ({statistik['berhasil']} dari {statistik['jumlah_ticker']} ticker)")
+    print(f"{'='*70}")
+    if not berhasil.empty:
+        kolom = ['Kode', 'Sinyal', 'Skor_Sinyal', 'Close', 'RSI', 'ADX', 'Rasio_Volume', 'VROC_10']
+        kolom += [k for k in ('PE', 'PBV') if k in berhasil.columns]
+        with pd.option_context('display.width', 120, 'display.float_format', '{:,.2f}'.format):
+            print(berhasil[kolom].head(maks_baris).to_string())
+    if not gagal.empty:
+        print(f"\n⚠️  {len(gagal)} ticker gagal dianalisis:")
+        for _, baris in gagal.head(maks_baris).iterrows():
+            print(f"   {baris['Kode']:6s} : {baris['Error']}")
+    print(f"\n⏱️  Waktu total      : {statistik['waktu_total']:.2f} detik ({statistik['workers']} worker)")
+    print(f"   Unduh massal     : {statistik['waktu_unduh']:.2f} detik")
+    print(f"   Ticker per detik : {statistik['ticker_per_detik']:.2f}")
+    print(f"{'='*70}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Scanner sinyal untuk banyak saham Indonesia")
+    parser.add_argument('kode', nargs='*', help='Kode saham (default: daftar saham populer)')
+    parser.add_argument('--daftar', help='File teks berisi kode saham, satu per baris')
+    parser.add_argument('--workers', type=int, default=None, help='Jumlah proses (default: jumlah CPU)')
+    parser.add_argument('--periode', default='6mo', help='Periode data (default: 6mo)')
+    parser.add_argument('--offline', action='store_true', help='Gunakan data dari cache lokal saja')
+    parser.add_argument('--tanpa-cache', action='store_true', help='Selalu unduh data tanpa cache lokal')
+    parser.add_argument('--direktori-cache', default=DIREKTORI_CACHE_DEFAULT)
+    parser.add_argument('--sumber-csv', metavar='DIREKTORI',
+                        help='Gunakan file CSV lokal (mis. ekspor analisis_*.csv) sebagai sumber data')
+    parser.add_argument('--fundamental', action='store_true',
+                        help='Tambahkan P/E, PBV, market cap dan margin (lewat cache fundamental)')
+    parser.add_argument('--aturan', help='File JSON aturan sinyal (default: aturan_sinyal.json)')
+    parser.add_argument('--float32', action='store_true',
+                        help='Simpan indikator sebagai float32 (hemat memori; sinyal tetap dari nilai float64)')
+    parser.add_argument('--panel', action='store_true',
+                        help='Hitung semua ticker sekaligus sebagai array (tanggal x ticker) di satu proses')
+    parser.add_argument('--simpan', help='Simpan tabel peringkat ke file CSV')
+    parser.add_argument('--tampil', type=int, default=30, help='Jumlah baris yang ditampilkan')
+    args = parser.parse_args()
+
+    daftar_kode = [k.upper() for k in args.kode]
+    if args.daftar:
+        daftar_kode += baca_daftar_kode(args.daftar)
+    daftar_kode = list(dict.fromkeys(daftar_kode or SAHAM_POPULER))
+
+    sumber = SumberCSV(args.sumber_csv) if args.sumber_csv else None
+    # File CSV sudah lokal sehingga tidak perlu melewati cache
+    gunakan_cache = not args.tanpa_cache and sumber is None
+
+    print(f"Memindai {len(daftar_kode)} ticker...")
+    if args.panel:
+        berhasil, gagal, statistik = pindai_panel(
+            daftar_kode, periode=args.periode, gunakan_cache=gunakan_cache,
+            direktori_cache=args.direktori_cache, offline=args.offline, sumber=sumber, path_aturan=args.aturan
+        )
+    else:
+        berhasil, gagal, statistik = pindai_universe(
+            daftar_kode, workers=args.workers, periode=args.periode,
+            gunakan_cache=gunakan_cache, direktori_cache=args.direktori_cache, offline=args.offline,
+            sumber=sumber, path_aturan=args.aturan, dtype=np.float32 if args.float32 else np.float64
+        )
+    if args.fundamental:
+        berhasil = tambah_fundamental(berhasil, gunakan_cache=gunakan_cache,
+                                      direktori_cache=args.direktori_cache, offline=args.offline, sumber=sumber)
+    tampilkan_hasil(berhasil, gagal, statistik, maks_baris=args.tampil)
+
+    if args.simpan:
+        berhasil.to_csv(args.simpan, index_label='Peringkat')
+        print(f"Hasil scan disimpan sebagai {args.simpan}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import re
+
+import numpy as np
+
+# Leksikon bawaan: kata dasar lama ditambah bentuk berimbuhan umum agar tetap cocok
+# setelah pencocokan memakai batas kata (mis. 'kenaikan', 'penurunan')
+KATA_POSITIF_DEFAULT = [
+    'naik', 'kenaikan', 'menaik', 'meningkat', 'peningkatan', 'untung', 'keuntungan', 'menguntungkan',
+    'profit', 'growth', 'baik', 'membaik', 'positif', 'bullish', 'buy'
+]
+KATA_NEGATIF_DEFAULT = [
+    'turun', 'penurunan', 'menurun', 'rugi', 'kerugian', 'merugi', 'loss', 'buruk', 'memburuk',
+    'negatif', 'bearish', 'sell', 'jatuh', 'terjatuh'
+]
+
+# Token kata: huruf/angka, boleh mengandung tanda hubung di tengah (mis. 'year-on-year')
+POLA_TOKEN = re.compile(r"\w+(?:-\w+)*")
+
+class LeksikonSentimen:
+    """Kelas pencocok leksikon sentimen yang dikompilasi sekali untuk penilaian massal"""
+
+    def __init__(self, positif=None, negatif=None):
+        """
+        positif/negatif : list kata/frasa (bobot 1) atau dict kata/frasa -> bobot
+        """
+        positif = KATA_POSITIF_DEFAULT if positif is None else positif
+        negatif = KATA_NEGATIF_DEFAULT if negatif is None else negatif
+        self.bobot = {}
+        for daftar, tanda in ((positif, 1.0), (negatif, -1.0)):
+            item = daftar.items() if isinstance(daftar, dict) else ((kata, 1.0) for kata in daftar)
+            for kata, bobot in item:
+                frasa = tuple(POLA_TOKEN.findall(kata.lower()))
+                if frasa:
+                    self.bobot[frasa] = tanda * abs(float(bobot))
+        # Kata tunggal dicocokkan lewat irisan himpunan; frasa multi-kata hanya diperiksa
+        # pada token yang merupakan awal sebuah frasa
+        self.kata_tunggal = {f[0]: b for f, b in self.bobot.items() if len(f) == 1}
+        self._himpunan_tunggal = set(self.kata_tunggal)
+        self.frasa = {f: b for f, b in self.bobot.items() if len(f) > 1}
+        self._awal_frasa = {f[0] for f in self.frasa}
+        self.panjang_maks = max((len(f) for f in self.bobot), default=1)
+        self.versi = hashlib.sha1(
+            json.dumps(sorted((' '.join(k), v) for k, v in self.bobot.items())).encode('utf-8')
+        ).hexdigest()[:12]
+
+    @classmethod
+    def dari_file(cls, path):
+        """
+        Memuat leksikon dari file JSON: {"positif": [...] atau {kata: bobot}, "negatif": ...}
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(positif=data.get('positif', []), negatif=data.get('negatif', []))
+
+    def __len__(self):
+        return len(self.bobot)
+
+    def skor(self, teks):
+        """
+        Menjumlahkan bobot setiap kata/frasa leksikon yang muncul (dihitung sekali per judul)
+        """
+        token = POLA_TOKEN.findall(teks.lower())
+        skor = sum(self.kata_tunggal[kata] for kata in self._himpunan_tunggal.intersection(token))
+        if self.frasa:
+            cocok = set()
+            for i, kata in enumerate(token):
+                if kata in self._awal_frasa:
+                    for n in range(2, min(self.panjang_maks, len(token) - i) + 1):
+                        frasa = tuple(token[i:i + n])
+                        if frasa in self.frasa:
+                            cocok.add(frasa)
+            skor += sum(self.frasa[frasa] for frasa in cocok)
+        return skor
+
+    def skor_banyak(self, daftar_teks):
+        """
+        Menilai banyak judul sekaligus, hasilnya array numpy
+        """
+        return np.fromiter((self.skor(teks) for teks in daftar_teks), dtype=float, count=len(daftar_teks))
+
+    @staticmethod
+    def label(skor):
+        """
+        Mengubah skor mentah menjadi (sentimen, skor ternormalisasi) seperti analisis sederhana lama
+        """
+        if skor > 0:
+            return 'Positif', min(skor / 10, 1.0)
+        elif skor < 0:
+            return 'Negatif', max(skor / 10, -1.0)
+        return 'Netral', 0.0
+
+    def label_banyak(self, daftar_teks):
+        """
+        Menilai banyak judul dan mengembalikan list (sentimen, skor)
+        """
+        return [self.label(skor) for skor in self.skor_banyak(daftar_teks)]
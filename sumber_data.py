@@ -0,0 +1,409 @@
+import argparse
+import glob
+import json
+import os
+import re
+import shutil
+import threading
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from impor_malas import ModulMalas, modul_tersedia
+
+# yfinance baru diimpor saat data pertama kali diunduh (sumber file tidak memuatnya)
+yf = ModulMalas('yfinance')
+
+# Kolom OHLCV standar (urutan sama dengan Ticker.history dari yfinance)
+KOLOM_OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits']
+
+# Zona waktu indeks data lokal (sama dengan riwayat .JK dari Yahoo Finance)
+ZONA_WAKTU = 'Asia/Jakarta'
+
+# Penyimpanan kolom: direktori <KODE>.kolom berisi Date.npy (datetime64 UTC) dan satu .npy per kolom
+# OHLCV, dibaca dengan memory map sehingga hanya bar yang dipakai yang dimuat dari disk
+AKHIRAN_KOLOM = '.kolom'
+
+# File Parquet <KODE>.parquet hanya dibaca jika engine Parquet terpasang
+PARQUET_TERSEDIA = modul_tersedia('pyarrow') or modul_tersedia('fastparquet')
+
+def mulai_periode(periode, sekarang=None):
+    """
+    Mengubah periode gaya yfinance ('5d', '6mo', '1y', 'ytd', 'max') menjadi tanggal awal
+    """
+    sekarang = sekarang if sekarang is not None else pd.Timestamp.now(tz='UTC')
+    if periode == 'max':
+        return None
+    if periode == 'ytd':
+        return pd.Timestamp(year=sekarang.year, month=1, day=1, tz=sekarang.tz)
+    cocok = re.fullmatch(r'(\d+)(d|wk|mo|y)', periode)
+    if not cocok:
+        raise ValueError(f"Periode tidak dikenali: {periode}")
+    jumlah, satuan = int(cocok.group(1)), cocok.group(2)
+    if satuan == 'd':
+        return sekarang - pd.DateOffset(days=jumlah)
+    if satuan == 'wk':
+        return sekarang - pd.DateOffset(weeks=jumlah)
+    if satuan == 'mo':
+        return sekarang - pd.DateOffset(months=jumlah)
+    return sekarang - pd.DateOffset(years=jumlah)
+
+def pisah_per_ticker(gabungan, tickers):
+    """
+    Memecah hasil unduhan gabungan (kolom MultiIndex ticker x field) menjadi frame per ticker.
+    Baris kosong di awal/akhir dipotong dengan slice sehingga data tidak disalin; hanya ticker
+    dengan celah di tengah (mis. suspensi) yang memerlukan salinan.
+    """
+    hasil = {}
+    if gabungan is None or gabungan.empty:
+        return hasil
+    multi = isinstance(gabungan.columns, pd.MultiIndex)
+    for ticker in tickers:
+        if multi:
+            if ticker not in gabungan.columns.get_level_values(0):
+                continue
+            df = gabungan[ticker]
+        else:
+            df = gabungan
+        kolom = [k for k in KOLOM_OHLCV if k in df.columns]
+        df = df[kolom]
+        ada = df['Close'].notna().to_numpy()
+        if not ada.any():
+            continue
+        posisi = np.flatnonzero(ada)
+        awal, akhir = posisi[0], posisi[-1] + 1
+        if akhir - awal == len(posisi):
+            df = df.iloc[awal:akhir]
+        else:
+            df = df[ada]
+        df.columns.name = None
+        hasil[ticker] = df
+    return hasil
+
+def _normalisasi(df):
+    """
+    Menyeragamkan frame dari file lokal: indeks tanggal zona Jakarta dan hanya kolom OHLCV
+    """
+    df.index = pd.to_datetime(df.index, utc=True).tz_convert(ZONA_WAKTU)
+    df.index.name = 'Date'
+    return df[[k for k in KOLOM_OHLCV if k in df.columns]]
+
+def simpan_kolom(df, path):
+    """
+    Menyimpan frame OHLCV sebagai penyimpanan kolom (.npy per kolom) di direktori path.
+    Data ditulis ke direktori sementara lalu dipindahkan agar pembaca tidak melihat file setengah jadi.
+    """
+    indeks = pd.DatetimeIndex(df.index)
+    if indeks.tz is None:
+        indeks = indeks.tz_localize(ZONA_WAKTU)
+    sementara = f'{path}.{os.getpid()}.tmp'
+    os.makedirs(sementara, exist_ok=True)
+    np.save(os.path.join(sementara, 'Date.npy'), indeks.tz_convert('UTC').tz_localize(None).to_numpy())
+    for kolom in KOLOM_OHLCV:
+        if kolom in df.columns:
+            np.save(os.path.join(sementara, kolom + '.npy'), np.ascontiguousarray(df[kolom].to_numpy()))
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    os.replace(sementara, path)
+
+def baca_kolom(path):
+    """
+    Membuka penyimpanan kolom sebagai DataFrame yang kolomnya memory map (tanpa menyalin data)
+    """
+    tanggal = np.load(os.path.join(path, 'Date.npy'))
+    indeks = pd.DatetimeIndex(tanggal, name='Date').tz_localize('UTC').tz_convert(ZONA_WAKTU)
+    # view ndarray: data tetap dibaca dari memory map, tetapi hasil operasi tidak bertipe np.memmap
+    data = {kolom: np.load(os.path.join(path, kolom + '.npy'), mmap_mode='r').view(np.ndarray)
+            for kolom in KOLOM_OHLCV if os.path.exists(os.path.join(path, kolom + '.npy'))}
+    return pd.DataFrame(data, index=indeks, copy=False)
+
+class SumberData:
+    """Antarmuka penyedia data pasar; turunan wajib mengimplementasikan riwayat(), info() dan berita() opsional"""
+
+    def riwayat(self, ticker, periode='6mo', interval='1d', mulai=None):
+        """
+        Mengambil riwayat OHLCV satu ticker, sejak `mulai` (jika diberikan) atau sepanjang `periode`
+        """
+        raise NotImplementedError
+
+    def riwayat_banyak(self, tickers, periode='6mo', interval='1d', mulai=None):
+        """
+        Mengambil riwayat banyak ticker sekaligus, hasilnya dict ticker -> DataFrame.
+        Implementasi default memanggil riwayat() per ticker.
+        """
+        hasil = {}
+        for ticker in tickers:
+            try:
+                df = self.riwayat(ticker, periode=periode, interval=interval, mulai=mulai)
+            except Exception as e:
+                print(f"Error mengambil data {ticker}: {e}")
+                continue
+            if df is not None and not df.empty:
+                hasil[ticker] = df
+        return hasil
+
+    def info(self, ticker):
+        """
+        Data fundamental (dict gaya saham.info); None jika sumber tidak menyediakannya
+        """
+        return None
+
+    def sesi(self, ticker):
+        """
+        Context manager untuk satu rangkaian pengambilan harga, fundamental dan berita ticker yang sama
+        (mis. ambil_data_bersamaan); sumber dapat memakai koneksi/objek bersama di dalamnya
+        """
+        return nullcontext()
+
+    def berita(self, ticker, max_berita=10):
+        """
+        Daftar berita terbaru (dict title, publisher, link, datetime); kosong jika tidak tersedia
+        """
+        return []
+
+class SumberYFinance(SumberData):
+    """Sumber data Yahoo Finance dengan unduhan massal untuk banyak ticker"""
+
+    def __init__(self, ukuran_batch=100, threads=True):
+        self.ukuran_batch = ukuran_batch
+        self.threads = threads
+        self._objek = {}
+        self._kunci = threading.Lock()
+
+    def __getstate__(self):
+        return {'ukuran_batch': self.ukuran_batch, 'threads': self.threads}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @contextmanager
+    def sesi(self, ticker):
+        """
+        Selama blok berjalan, harga, fundamental dan berita ticker memakai satu objek yf.Ticker
+        (juga dari thread lain). Objek dilepas di akhir sesi karena yfinance menyimpan info dan
+        berita di objek tersebut; di luar sesi setiap pengambilan memakai objek baru.
+        """
+        with self._kunci:
+            objek, jumlah = self._objek.get(ticker, (None, 0))
+            if objek is None:
+                objek = yf.Ticker(ticker)
+            self._objek[ticker] = (objek, jumlah + 1)
+        try:
+            yield objek
+        finally:
+            with self._kunci:
+                objek, jumlah = self._objek[ticker]
+                if jumlah == 1:
+                    del self._objek[ticker]
+                else:
+                    self._objek[ticker] = (objek, jumlah - 1)
+
+    def objek_ticker(self, ticker):
+        """
+        Objek yf.Ticker dari sesi yang sedang berjalan, atau objek baru jika tidak ada sesi
+        """
+        with self._kunci:
+            entri = self._objek.get(ticker)
+        return entri[0] if entri is not None else yf.Ticker(ticker)
+
+    def riwayat(self, ticker, periode='6mo', interval='1d', mulai=None):
+        saham = self.objek_ticker(ticker)
+        if mulai is not None:
+            return saham.history(start=mulai.strftime('%Y-%m-%d'), interval=interval)
+        return saham.history(period=periode, interval=interval)
+
+    def riwayat_banyak(self, tickers, periode='6mo', interval='1d', mulai=None):
+        hasil = {}
+        tickers = list(tickers)
+        for i in range(0, len(tickers), self.ukuran_batch):
+            batch = tickers[i:i + self.ukuran_batch]
+            argumen = {'start': mulai.strftime('%Y-%m-%d')} if mulai is not None else {'period': periode}
+            try:
+                # Satu request untuk banyak simbol; actions=True agar kolom sama dengan Ticker.history
+                gabungan = yf.download(batch, interval=interval, group_by='ticker', actions=True,
+                                       auto_adjust=True, threads=self.threads, progress=False, **argumen)
+            except Exception as e:
+                print(f"Error mengunduh batch {batch[0]}..{batch[-1]}: {e}")
+                continue
+            hasil.update(pisah_per_ticker(gabungan, batch))
+        return hasil
+
+    def info(self, ticker):
+        return self.objek_ticker(ticker).info
+
+    def berita(self, ticker, max_berita=10):
+        berita = self.objek_ticker(ticker).news
+        if not berita:
+            return []
+
+        # Ambil berita terbaru
+        berita_list = []
+        for item in berita[:max_berita]:
+            berita_info = {
+                'title': item.get('title', ''),
+                'publisher': item.get('publisher', ''),
+                'link': item.get('link', ''),
+                'datetime': datetime.fromtimestamp(item.get('providerPublishTime', 0)) if item.get('providerPublishTime') else None
+            }
+            berita_list.append(berita_info)
+        return berita_list
+
+class SumberCSV(SumberData):
+    """
+    Sumber data lokal tanpa jaringan: ekspor analisis_<KODE>_<tanggal>.csv atau <KODE>.csv, file
+    <KODE>.parquet, dan penyimpanan kolom <KODE>.kolom (memory map) untuk data besar.
+    Fundamental dan berita dibaca dari <KODE>.info.json dan <KODE>.berita.json jika ada.
+    """
+
+    def __init__(self, direktori='.'):
+        self.direktori = direktori
+        self._data = {}
+        self._peta = None
+
+    def __getstate__(self):
+        # Penyimpanan kolom tidak ikut di-pickle ke worker: worker membuka memory map sendiri
+        state = dict(self.__dict__)
+        peta = self._peta or {}
+        state['_data'] = {ticker: df for ticker, df in self._data.items()
+                          if not peta.get(ticker.removesuffix('.JK') + '.JK', '').endswith(AKHIRAN_KOLOM)}
+        return state
+
+    def daftar_file(self):
+        """
+        Memetakan ticker (KODE.JK) ke file data terbaru di direktori
+        """
+        peta = {}
+        for path in sorted(glob.glob(os.path.join(self.direktori, '*.csv'))):
+            nama = os.path.basename(path)[:-4]
+            cocok = re.fullmatch(r'analisis_([A-Z0-9]+)_\d{8}_\d{6}', nama) or re.fullmatch(r'([A-Z0-9]+)(\.JK)?', nama)
+            if cocok:
+                # File diurutkan per nama, sehingga ekspor dengan tanggal terbaru menang
+                peta[cocok.group(1) + '.JK'] = path
+        # Parquet dan penyimpanan kolom (hasil konversi/rekaman) diutamakan daripada ekspor CSV
+        akhiran = (['.parquet'] if PARQUET_TERSEDIA else []) + [AKHIRAN_KOLOM]
+        for akhir in akhiran:
+            for path in sorted(glob.glob(os.path.join(self.direktori, '*' + akhir))):
+                kode = os.path.basename(path)[:-len(akhir)]
+                if re.fullmatch(r'[A-Z0-9]+', kode):
+                    peta[kode + '.JK'] = path
+        return peta
+
+    def _path(self, ticker):
+        ticker = ticker if ticker.endswith('.JK') else ticker + '.JK'
+        # Peta file dipindai sekali; dipindai ulang hanya jika ticker belum dikenal (file baru)
+        if self._peta is None or ticker not in self._peta:
+            self._peta = self.daftar_file()
+        return self._peta.get(ticker)
+
+    def _baca(self, ticker):
+        if ticker not in self._data:
+            path = self._path(ticker)
+            if path is None:
+                self._data[ticker] = None
+            elif path.endswith(AKHIRAN_KOLOM):
+                self._data[ticker] = baca_kolom(path)
+            elif path.endswith('.parquet'):
+                self._data[ticker] = _normalisasi(pd.read_parquet(path))
+            else:
+                self._data[ticker] = _normalisasi(pd.read_csv(path, index_col=0))
+        return self._data[ticker]
+
+    def riwayat(self, ticker, periode='6mo', interval='1d', mulai=None):
+        """
+        Periode dihitung mundur dari bar terakhir di file agar hasilnya deterministik
+        """
+        df = self._baca(ticker)
+        if df is None:
+            return pd.DataFrame(columns=KOLOM_OHLCV)
+        if interval != '1d':
+            raise ValueError("SumberCSV hanya menyediakan data harian")
+        if mulai is None:
+            mulai = mulai_periode(periode, sekarang=df.index[-1])
+        if mulai is None:
+            return df
+        if mulai.tzinfo is None:
+            mulai = mulai.tz_localize(df.index.tz)
+        # Indeks terurut: slice tanpa menyalin (kolom memory map tetap tidak dibaca seluruhnya)
+        return df.iloc[df.index.searchsorted(mulai.normalize()):]
+
+    def _baca_json(self, ticker, akhiran):
+        kode = ticker.removesuffix('.JK')
+        path = os.path.join(self.direktori, kode + akhiran)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def info(self, ticker):
+        return self._baca_json(ticker, '.info.json')
+
+    def berita(self, ticker, max_berita=10):
+        berita_list = self._baca_json(ticker, '.berita.json') or []
+        for berita in berita_list:
+            if berita.get('datetime'):
+                berita['datetime'] = datetime.fromisoformat(berita['datetime'])
+        return berita_list[:max_berita]
+
+def _tulis_json(path, data):
+    sementara = f'{path}.{os.getpid()}.tmp'
+    with open(sementara, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, default=str)
+    os.replace(sementara, path)
+
+def rekam(tickers, direktori, periode='5y', sumber=None, fundamental=True, berita=True):
+    """
+    Merekam riwayat harga (penyimpanan kolom), fundamental dan berita dari sumber (default Yahoo
+    Finance) ke direktori agar analisis dapat diulang tanpa jaringan dengan SumberCSV(direktori)
+    """
+    sumber = sumber if sumber is not None else SumberYFinance()
+    os.makedirs(direktori, exist_ok=True)
+    data = sumber.riwayat_banyak(tickers, periode=periode)
+    for ticker in tickers:
+        kode = ticker.removesuffix('.JK')
+        if ticker in data:
+            simpan_kolom(data[ticker], os.path.join(direktori, kode + AKHIRAN_KOLOM))
+        try:
+            if fundamental:
+                _tulis_json(os.path.join(direktori, kode + '.info.json'), sumber.info(ticker))
+            if berita:
+                _tulis_json(os.path.join(direktori, kode + '.berita.json'), sumber.berita(ticker))
+        except Exception as e:
+            print(f"Error merekam fundamental/berita {ticker}: {e}")
+    return data
+
+def konversi(direktori_sumber, direktori):
+    """
+    Mengonversi file data di direktori_sumber (ekspor CSV/Parquet) menjadi penyimpanan kolom
+    """
+    sumber = SumberCSV(direktori_sumber)
+    os.makedirs(direktori, exist_ok=True)
+    tickers = list(sumber.daftar_file())
+    for ticker in tickers:
+        simpan_kolom(sumber.riwayat(ticker, periode='max'),
+                     os.path.join(direktori, ticker.removesuffix('.JK') + AKHIRAN_KOLOM))
+    return tickers
+
+def main():
+    parser = argparse.ArgumentParser(description="Rekam atau konversi data pasar ke penyimpanan lokal (tanpa jaringan)")
+    parser.add_argument('kode', nargs='*', help='Kode saham yang direkam dari Yahoo Finance')
+    parser.add_argument('--direktori', required=True, help='Direktori penyimpanan lokal (dipakai dengan --sumber-csv)')
+    parser.add_argument('--periode', default='5y', help='Periode data yang direkam (default: 5y)')
+    parser.add_argument('--konversi', metavar='DIREKTORI_CSV',
+                        help='Konversi ekspor CSV/Parquet di direktori ini menjadi penyimpanan kolom')
+    parser.add_argument('--tanpa-fundamental', action='store_true', help='Jangan rekam data fundamental')
+    parser.add_argument('--tanpa-berita', action='store_true', help='Jangan rekam berita')
+    args = parser.parse_args()
+
+    if args.konversi:
+        tickers = konversi(args.konversi, args.direktori)
+        print(f"💾 {len(tickers)} ticker dikonversi ke {args.direktori}")
+    if args.kode:
+        tickers = [k.upper().removesuffix('.JK') + '.JK' for k in args.kode]
+        data = rekam(tickers, args.direktori, periode=args.periode,
+                     fundamental=not args.tanpa_fundamental, berita=not args.tanpa_berita)
+        print(f"💾 {len(data)}/{len(tickers)} ticker direkam ke {args.direktori}")
+
+if __name__ == "__main__":
+    main()
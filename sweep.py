@@ -0,0 +1,313 @@
+"""
+Sweep parameter sinyal: menguji banyak kombinasi ambang (vol_mult, adx_min, ambang skor, target,
+stop, ...) lewat backtest dan mengurutkannya berdasarkan metrik.
+
+Indikator setiap ticker dihitung sekali, digabung menjadi satu blok array di shared memory dan
+dibaca (read-only) oleh worker. Setiap kombinasi hanya mengevaluasi aturan terkompilasi dan
+backtest di atas array tersebut, tanpa menghitung ulang indikator.
+
+Contoh:
+    python sweep.py BBCA TLKM BBRI --grid vol_mult=1.2,1.5,2 --grid adx_min=20,25,30 --grid ambang=2,3,4
+    python sweep.py --daftar daftar_idx.txt --periode 5y --min-trade 50 --simpan sweep.csv
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+import scanner
+from aturan_sinyal import AturanSinyal
+from backtest import HORIZON_DEFAULT, resolusi_trade, metrik_trade
+from cache_data import DIREKTORI_CACHE_DEFAULT
+from saham import SAHAM_POPULER, TARGET_PERSEN, STOP_PERSEN, PipelineIndikator
+from sumber_data import SumberCSV
+
+# Grid bawaan jika --grid tidak diberikan (27 kombinasi)
+GRID_DEFAULT = {
+    'vol_mult': [1.2, 1.5, 2.0],
+    'adx_min': [20, 25, 30],
+    'ambang': [2, 3, 4],
+}
+
+# Parameter grid yang tidak berasal dari file aturan
+PARAMETER_BACKTEST = ('target', 'stop')
+PARAMETER_AMBANG = ('ambang', 'ambang_beli', 'ambang_jual')
+
+# Kolom harga untuk backtest dan kolom bantu di blok shared memory
+KOLOM_HARGA = ['Open', 'High', 'Low', 'Close']
+KOLOM_BANTU = ['Sisa', 'Tanggal', 'Ticker']
+
+# State worker sweep (dibuat sekali oleh initializer)
+_shm = None
+_data = None
+_aturan_dasar = None
+_opsi = None
+
+def parse_grid(daftar_teks):
+    """
+    Mengubah ['vol_mult=1.2,1.5', 'ambang=2,3'] menjadi dict nama -> list nilai
+    """
+    grid = {}
+    for teks in daftar_teks:
+        nama, _, nilai = teks.partition('=')
+        if not nama or not nilai:
+            raise ValueError(f"Format grid harus nama=v1,v2,...: {teks!r}")
+        grid[nama.strip()] = [float(v) if any(c in v for c in '.eE') else int(v) for v in nilai.split(',') if v.strip()]
+    return grid
+
+def kombinasi_grid(grid):
+    """
+    Semua kombinasi nilai grid sebagai list dict
+    """
+    nama = list(grid)
+    return [dict(zip(nama, nilai)) for nilai in itertools.product(*(grid[n] for n in nama))]
+
+def pisah_parameter(parameter):
+    """
+    Memisahkan kombinasi menjadi (parameter aturan, target, stop); 'ambang' berarti ambang
+    beli = nilai dan ambang jual = -nilai
+    """
+    parameter = dict(parameter)
+    target = parameter.pop('target', TARGET_PERSEN)
+    stop = parameter.pop('stop', STOP_PERSEN)
+    ambang = parameter.pop('ambang', None)
+    if ambang is not None:
+        parameter['ambang_beli'] = ambang
+        parameter['ambang_jual'] = -ambang
+    return parameter, target, stop
+
+def siapkan_ticker(kode_saham, periode, data, kolom):
+    """
+    Menghitung indikator satu ticker (di worker scanner) dan mengembalikan kolom yang dibutuhkan.
+    Mengembalikan (kode, dict kolom -> array, tanggal dalam detik, pesan error).
+    """
+    try:
+        analyzer = scanner.analyzer_worker()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if data is not None:
+                analyzer.ticker = kode_saham + ".JK"
+                analyzer.data_saham = data
+            elif not analyzer.unduh_data_saham(kode_saham, periode=periode):
+                raise ValueError("data tidak tersedia")
+            if analyzer.data_saham is None or analyzer.data_saham.empty:
+                raise ValueError("data tidak tersedia")
+            # Hanya indikator yang dipakai aturan (tanpa sinyal); aturan dievaluasi per kombinasi
+            df = PipelineIndikator(dtype=np.float64, aturan=analyzer.aturan,
+                                   kolom=kolom).jalankan(analyzer.data_saham, sinyal=False)
+        kurang = [nama for nama in kolom if nama not in df.columns]
+        if kurang:
+            raise ValueError(f"kolom tidak tersedia: {', '.join(kurang)}")
+        tanggal = df.index.as_unit('s').asi8.astype(float) if isinstance(df.index, pd.DatetimeIndex) \
+            else np.arange(len(df), dtype=float)
+        return kode_saham, {nama: df[nama].to_numpy(dtype=float) for nama in kolom}, tanggal, ''
+    except Exception as e:
+        return kode_saham, None, None, f"{type(e).__name__}: {e}"
+
+def bangun_data_bersama(per_ticker, kolom, lebar_pemisah):
+    """
+    Menggabungkan kolom semua ticker menjadi satu blok float64 di shared memory.
+    Antar ticker disisipkan baris NaN selebar `lebar_pemisah` agar geser() dan jendela backtest
+    tidak membaca data ticker lain. Mengembalikan (SharedMemory, metadata untuk worker).
+    """
+    semua_kolom = kolom + KOLOM_BANTU
+    panjang = sum(len(tanggal) for _, _, tanggal in per_ticker) + lebar_pemisah * max(len(per_ticker) - 1, 0)
+    shm = shared_memory.SharedMemory(create=True, size=max(len(semua_kolom) * panjang * 8, 1))
+    blok = np.ndarray((len(semua_kolom), panjang), dtype=np.float64, buffer=shm.buf)
+    blok[:] = np.nan
+    baris = {nama: i for i, nama in enumerate(semua_kolom)}
+    blok[baris['Sisa']] = 0
+    posisi = 0
+    for nomor, (_, nilai, tanggal) in enumerate(per_ticker):
+        n = len(tanggal)
+        for nama in kolom:
+            blok[baris[nama], posisi:posisi + n] = nilai[nama]
+        blok[baris['Sisa'], posisi:posisi + n] = np.arange(n - 1, -1, -1)
+        blok[baris['Tanggal'], posisi:posisi + n] = tanggal
+        blok[baris['Ticker'], posisi:posisi + n] = nomor
+        posisi += n + lebar_pemisah
+    del blok
+    return shm, {'nama': shm.name, 'kolom': semua_kolom, 'panjang': panjang}
+
+def _inisialisasi_sweep(meta, path_aturan, horizon, hanya_sinyal_baru):
+    global _shm, _data, _aturan_dasar, _opsi
+    _shm = shared_memory.SharedMemory(name=meta['nama'])
+    blok = np.ndarray((len(meta['kolom']), meta['panjang']), dtype=np.float64, buffer=_shm.buf)
+    blok.flags.writeable = False
+    _data = {nama: blok[i] for i, nama in enumerate(meta['kolom'])}
+    _aturan_dasar = AturanSinyal.dari_file(path_aturan) if path_aturan else AturanSinyal.dari_file()
+    _opsi = {'horizon': horizon, 'hanya_sinyal_baru': hanya_sinyal_baru}
+
+def evaluasi_kombinasi(parameter):
+    """
+    Mengevaluasi satu kombinasi parameter di atas data bersama dan mengembalikan metriknya
+    """
+    parameter_aturan, target, stop = pisah_parameter(parameter)
+    aturan = _aturan_dasar.dengan_parameter(**parameter_aturan)
+    _, skor = aturan.evaluasi(_data)
+    sisa = _data['Sisa'].astype(np.int64)
+    arah = np.where(skor >= aturan.ambang_beli, 1, np.where(skor <= aturan.ambang_jual, -1, 0))
+    arah[np.isnan(_data['Close'])] = 0
+    hasil = resolusi_trade(arah, _data['Open'], _data['High'], _data['Low'], _data['Close'],
+                           target=target, stop=stop, sisa=sisa, **_opsi)
+    selesai = hasil['status'] != 'Terbuka'
+    ringkasan = dict(parameter)
+    if not selesai.any():
+        return {**ringkasan, 'Jumlah_Trade': 0}
+    jumlah_ticker = len(np.unique(_data['Ticker'][hasil['idx'][selesai]]))
+    ringkasan.update(metrik_trade(
+        hasil['return'][selesai], hasil['status'][selesai], hasil['arah'][selesai],
+        _data['Tanggal'][hasil['posisi_keluar'][selesai]], hasil['durasi'][selesai],
+        jumlah_ticker=jumlah_ticker, stop=stop
+    ))
+    return ringkasan
+
+def sweep_parameter(daftar_kode, grid, workers=None, periode='5y', horizon=HORIZON_DEFAULT,
+                    hanya_sinyal_baru=True, gunakan_cache=True, direktori_cache=DIREKTORI_CACHE_DEFAULT,
+                    offline=False, sumber=None, path_aturan=None, urut='Expectancy', min_trade=0):
+    """
+    Menjalankan sweep parameter untuk banyak ticker.
+    Mengembalikan (grid metrik terurut, tabel ticker gagal, statistik).
+    """
+    mulai = time.perf_counter()
+    workers = workers or os.cpu_count()
+    aturan = AturanSinyal.dari_file(path_aturan) if path_aturan else AturanSinyal.dari_file()
+    kombinasi = kombinasi_grid(grid)
+    dikenal = set(aturan.parameter) | set(PARAMETER_BACKTEST) | set(PARAMETER_AMBANG)
+    asing = [nama for nama in grid if nama not in dikenal]
+    if asing:
+        raise ValueError(f"Parameter grid tidak dikenal: {', '.join(asing)} (tersedia: {', '.join(sorted(dikenal))})")
+    # Kompilasi semua kombinasi di awal: memvalidasi grid dan menentukan riwayat terpanjang untuk geser()
+    riwayat = max(aturan.dengan_parameter(**pisah_parameter(p)[0]).riwayat for p in kombinasi)
+    kolom = list(dict.fromkeys(KOLOM_HARGA + aturan.kolom))
+
+    # Tahap 1: unduh dan hitung indikator sekali per ticker
+    data = scanner.unduh_massal(daftar_kode, periode=periode, gunakan_cache=gunakan_cache,
+                                direktori_cache=direktori_cache, offline=offline, sumber=sumber)
+    per_ticker, gagal = [], []
+    hasil = scanner.jalankan_paralel(
+        siapkan_ticker, daftar_kode, lambda kode: (periode, data.get(kode), kolom), workers=workers,
+        initargs=(gunakan_cache, direktori_cache, offline, sumber, path_aturan),
+        gagal=lambda kode, pesan: (kode, None, None, pesan))
+    for kode, nilai, tanggal, error in hasil:
+        if error:
+            gagal.append({'Kode': kode, 'Error': error})
+        else:
+            per_ticker.append((kode, nilai, tanggal))
+    # Urutan tetap agar hasil tidak bergantung pada urutan selesai worker
+    per_ticker.sort(key=lambda item: daftar_kode.index(item[0]))
+    waktu_persiapan = time.perf_counter() - mulai
+
+    # Tahap 2: evaluasi kombinasi di atas blok shared memory
+    mulai_sweep = time.perf_counter()
+    shm, meta = bangun_data_bersama(per_ticker, kolom, lebar_pemisah=max(horizon, riwayat - 1))
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_inisialisasi_sweep,
+                                 initargs=(meta, path_aturan, horizon, hanya_sinyal_baru)) as pool:
+            ukuran_chunk = max(1, len(kombinasi) // (workers * 4))
+            hasil = list(pool.map(evaluasi_kombinasi, kombinasi, chunksize=ukuran_chunk))
+    finally:
+        shm.close()
+        shm.unlink()
+    waktu_sweep = time.perf_counter() - mulai_sweep
+
+    tabel = pd.DataFrame(hasil)
+    if not tabel.empty:
+        tabel = tabel[tabel['Jumlah_Trade'] >= max(min_trade, 1)]
+        if urut in tabel.columns:
+            tabel = tabel.sort_values([urut, 'Jumlah_Trade'], ascending=[False, False])
+    tabel = tabel.reset_index(drop=True)
+    tabel.index = tabel.index + 1
+    statistik = {
+        'jumlah_ticker': len(daftar_kode),
+        'berhasil': len(per_ticker),
+        'gagal': len(gagal),
+        'jumlah_kombinasi': len(kombinasi),
+        'jumlah_bar': sum(len(tanggal) for _, _, tanggal in per_ticker),
+        'ukuran_shared_mb': meta['panjang'] * len(meta['kolom']) * 8 / 1024**2,
+        'waktu_persiapan': waktu_persiapan,
+        'waktu_sweep': waktu_sweep,
+        'kombinasi_per_detik': len(kombinasi) / waktu_sweep if waktu_sweep > 0 else 0.0,
+        'workers': workers,
+    }
+    return tabel, pd.DataFrame(gagal, columns=['Kode', 'Error']), statistik
+
+def tampilkan_hasil(tabel, grid, gagal, statistik, maks_baris=20):
+    """
+    Menampilkan kombinasi terbaik dan ringkasan waktu sweep
+    """
+    print(f"\n{'='*70}")
+    print(f"HASIL SWEEP PARAMETER ({statistik['jumlah_kombinasi']} kombinasi, "
+          f"{statistik['berhasil']} dari {statistik['jumlah_ticker']} ticker)")
+    print(f"{'='*70}")
+    if tabel.empty:
+        print("Tidak ada kombinasi dengan trade yang cukup")
+    else:
+        kolom = list(grid) + ['Jumlah_Trade', 'Hit_Rate', 'Win_Rate', 'Expectancy', 'Profit_Factor', 'Max_Drawdown']
+        with pd.option_context('display.width', 140, 'display.float_format', '{:,.4f}'.format):
+            print(tabel[kolom].head(maks_baris).to_string())
+    if not gagal.empty:
+        print(f"\n⚠️  {len(gagal)} ticker gagal disiapkan:")
+        for _, baris in gagal.head(maks_baris).iterrows():
+            print(f"   {baris['Kode']:6s} : {baris['Error']}")
+    print(f"\n⏱️  Persiapan indikator : {statistik['waktu_persiapan']:.2f} detik "
+          f"({statistik['jumlah_bar']:,} bar, {statistik['ukuran_shared_mb']:.1f} MB shared memory)")
+    print(f"   Sweep               : {statistik['waktu_sweep']:.2f} detik ({statistik['workers']} worker)")
+    print(f"   Kombinasi per detik : {statistik['kombinasi_per_detik']:.1f}")
+    print(f"{'='*70}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep parameter sinyal dengan backtest")
+    parser.add_argument('kode', nargs='*', help='Kode saham (default: daftar saham populer)')
+    parser.add_argument('--daftar', help='File teks berisi kode saham, satu per baris')
+    parser.add_argument('--grid', action='append', default=[], metavar='NAMA=V1,V2,...',
+                        help='Nilai parameter yang diuji; dapat diulang. Nama: parameter di file aturan, '
+                             'ambang (beli=+n, jual=-n), ambang_beli, ambang_jual, target, stop')
+    parser.add_argument('--workers', type=int, default=None, help='Jumlah proses (default: jumlah CPU)')
+    parser.add_argument('--periode', default='5y', help='Periode data (default: 5y)')
+    parser.add_argument('--horizon', type=int, default=HORIZON_DEFAULT,
+                        help='Maksimum bar sebuah posisi terbuka (default: 20)')
+    parser.add_argument('--semua-sinyal', action='store_true',
+                        help='Buka posisi di setiap bar sinyal, bukan hanya bar pertama rangkaian sinyal')
+    parser.add_argument('--urut', default='Expectancy', help='Metrik pengurutan (default: Expectancy)')
+    parser.add_argument('--min-trade', type=int, default=30, help='Minimum jumlah trade (default: 30)')
+    parser.add_argument('--offline', action='store_true', help='Gunakan data dari cache lokal saja')
+    parser.add_argument('--tanpa-cache', action='store_true', help='Selalu unduh data tanpa cache lokal')
+    parser.add_argument('--direktori-cache', default=DIREKTORI_CACHE_DEFAULT)
+    parser.add_argument('--sumber-csv', metavar='DIREKTORI',
+                        help='Gunakan file CSV lokal (mis. ekspor analisis_*.csv) sebagai sumber data')
+    parser.add_argument('--aturan', help='File JSON aturan sinyal (default: aturan_sinyal.json)')
+    parser.add_argument('--simpan', help='Simpan grid metrik ke file CSV')
+    parser.add_argument('--tampil', type=int, default=20, help='Jumlah baris yang ditampilkan')
+    args = parser.parse_args()
+
+    daftar_kode = [k.upper() for k in args.kode]
+    if args.daftar:
+        daftar_kode += scanner.baca_daftar_kode(args.daftar)
+    daftar_kode = list(dict.fromkeys(daftar_kode or SAHAM_POPULER))
+    grid = parse_grid(args.grid) if args.grid else GRID_DEFAULT
+
+    sumber = SumberCSV(args.sumber_csv) if args.sumber_csv else None
+    gunakan_cache = not args.tanpa_cache and sumber is None
+
+    print(f"Sweep {len(kombinasi_grid(grid))} kombinasi untuk {len(daftar_kode)} ticker...")
+    tabel, gagal, statistik = sweep_parameter(
+        daftar_kode, grid, workers=args.workers, periode=args.periode, horizon=args.horizon,
+        hanya_sinyal_baru=not args.semua_sinyal, gunakan_cache=gunakan_cache,
+        direktori_cache=args.direktori_cache, offline=args.offline, sumber=sumber,
+        path_aturan=args.aturan, urut=args.urut, min_trade=args.min_trade
+    )
+    tampilkan_hasil(tabel, grid, gagal, statistik, maks_baris=args.tampil)
+
+    if args.simpan:
+        tabel.to_csv(args.simpan, index_label='Peringkat')
+        print(f"Grid metrik disimpan sebagai {args.simpan}")
+
+if __name__ == "__main__":
+    main()